@@ -0,0 +1,311 @@
+# archive.py
+"""
+Compressed single-file archive for finished tests (``.hdaa``).
+
+Every channel is stored as float64 in fixed chunks of ``CHUNK_ROWS`` rows.
+DAQ values written with a fixed number of decimals become integer counts,
+which are delta encoded (small deltas have high bytes of all 0x00/0xff),
+byte-shuffled so equal bytes sit next to each other and compressed with
+zlib, bz2 or lzma from the standard library; other chunks fall back to
+deltas of the float bit pattern.  Every chunk decodes back bit for bit.
+
+A JSON footer holds the chunk offsets, the first/last time of every chunk and
+the analysis metadata, so opening an archive reads only the footer and a
+time window decodes just the chunks covering it.  ``ArchiveStore`` exposes
+an archive through the ``ooc.ChannelStore`` interface, which lets the
+out-of-core analysis path stream archived tests unchanged.
+"""
+
+import argparse
+import bz2
+import json
+import lzma
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from ooc import ChannelStore
+from utils import guess_columns
+import timestamps
+
+ARCHIVE_SUFFIX = ".hdaa"
+MAGIC = b"HDAAARC1"
+FOOTER = struct.Struct("<Q8s")  # JSON index length, magic
+CHUNK_ROWS = 1 << 16  # Rows per chunk: a few ms to decode, small enough for narrow windows
+CACHE_CHUNKS = 64  # Decoded chunks kept per open archive
+CSV_CHUNK_ROWS = 1_000_000
+MAX_DIGITS = 9  # Decimal places tried for the integer-count encoding
+CODECS = {  # name -> (compress(bytes, level), decompress, default level)
+    "zlib": (lambda b, lvl: zlib.compress(b, lvl), zlib.decompress, 6),
+    "bz2": (lambda b, lvl: bz2.compress(b, lvl), bz2.decompress, 9),
+    "lzma": (lambda b, lvl: lzma.compress(b, preset=lvl), lzma.decompress, 6),
+}
+
+
+def _shuffle(ints):
+    """Byte planes of an int64 array (all first bytes, then all second bytes, ...)."""
+    return ints.view(np.uint8).reshape(-1, 8).T.tobytes()
+
+
+def _unshuffle(data, n):
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(8, n)
+    return np.ascontiguousarray(planes.T).view(np.int64).ravel()
+
+
+def _decimal_digits(x):
+    """Smallest d <= MAX_DIGITS with round(x * 10**d) / 10**d == x bit for bit, else None."""
+    if not np.isfinite(x).all():
+        return None
+    for d in range(MAX_DIGITS + 1):
+        scale = 10.0 ** d
+        counts = np.round(x * scale)
+        if np.abs(counts).max(initial=0) < 2 ** 53 and np.array_equal(counts / scale, x):
+            return d
+    return None
+
+
+def encode(x, codec="zlib", level=None):
+    """
+    Compress one chunk of float64 values; returns (blob, mode, digits).
+
+    Values logged with a fixed number of decimals are stored as delta-encoded
+    integer counts ("dec"); anything else as deltas of the float bit pattern
+    ("delta") or unfiltered ("raw"), whichever compresses smaller.  Deltas
+    are byte-shuffled before compression.
+    """
+    compress, _, default = CODECS[codec]
+    level = default if level is None else level
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    digits = _decimal_digits(x)
+    if digits is not None:
+        counts = np.round(x * 10.0 ** digits).astype(np.int64)
+        return compress(_shuffle(np.diff(counts, prepend=np.int64(0))), level), "dec", digits
+    # Deltas wrap modulo 2**64; cumsum undoes them exactly
+    delta = compress(_shuffle(np.diff(x.view(np.int64), prepend=np.int64(0))), level)
+    raw = compress(x.tobytes(), level)  # Noisy full-precision mantissas: filtering does not pay
+    return (delta, "delta", 0) if len(delta) <= len(raw) else (raw, "raw", 0)
+
+
+def decode(blob, n, codec="zlib", mode="delta", digits=0):
+    """Inverse of ``encode`` for a chunk of ``n`` values."""
+    data = CODECS[codec][1](blob)
+    if mode == "raw":
+        return np.frombuffer(data, dtype=np.float64).copy()
+    values = np.cumsum(_unshuffle(data, n))
+    if mode == "dec":
+        return values / 10.0 ** digits
+    return values.view(np.float64)
+
+
+class ArchiveWriter:
+    """Streams DataFrame blocks into an archive; ``close`` writes the index footer."""
+    def __init__(self, path, time_col, codec="zlib", level=None, chunk_rows=CHUNK_ROWS):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}'")
+        self.path, self.time_col = path, time_col
+        self.codec, self.level, self.chunk_rows = codec, level, chunk_rows
+        self.columns = None
+        self._buffers = {}
+        self._chunks = {}  # col -> [[offset, nbytes, mode, digits], ...]
+        self._times = []  # [first, last] time per chunk
+        self._n_rows = 0  # Rows flushed to chunks
+        self._pending = 0  # Rows buffered for the next chunk
+        self._fh = open(path, "wb")
+        self._fh.write(MAGIC)
+
+    def append(self, frame):
+        if self.columns is None:
+            self.columns = list(frame.columns)
+            if self.time_col not in self.columns:
+                raise ValueError(f"Time column '{self.time_col}' not in the data")
+            self._buffers = {c: [] for c in self.columns}
+            self._chunks = {c: [] for c in self.columns}
+        for c in self.columns:
+            self._buffers[c].append(pd.to_numeric(frame[c], errors="coerce").to_numpy(dtype=np.float64))
+        self._pending += len(frame)
+        while self._pending >= self.chunk_rows:
+            self._flush(self.chunk_rows)
+
+    def _flush(self, n):
+        for c in self.columns:
+            data = np.concatenate(self._buffers[c]) if len(self._buffers[c]) > 1 else self._buffers[c][0]
+            blob, mode, digits = encode(data[:n], self.codec, self.level)
+            self._chunks[c].append([self._fh.tell(), len(blob), mode, digits])
+            self._fh.write(blob)
+            self._buffers[c] = [data[n:]]
+            if c == self.time_col:
+                t = data[:n]
+                finite = t[np.isfinite(t)]
+                self._times.append([float(finite[0]), float(finite[-1])] if len(finite) else [None, None])
+        self._pending -= n
+        self._n_rows += n
+
+    def close(self, metadata=None, time_origin=None, time_format=None):
+        if self.columns is None:
+            self._fh.close()
+            raise ValueError("No data written to the archive")
+        if self._pending:
+            self._flush(self._pending)
+        index = {"columns": self.columns, "n_rows": self._n_rows, "chunk_rows": self.chunk_rows,
+                 "codec": self.codec, "time_col": self.time_col, "chunks": self._chunks,
+                 "chunk_times": self._times, "metadata": metadata or {}}
+        if time_origin is not None:
+            index["time_origin"] = {self.time_col: int(time_origin)}  # Epoch ns of t = 0
+            index["time_format"] = time_format or "epoch"
+        footer = json.dumps(index).encode()
+        self._fh.write(footer)
+        self._fh.write(FOOTER.pack(len(footer), MAGIC))
+        self._fh.close()
+        return self.path
+
+
+def write_frame(df, path, time_col, codec="zlib", level=None, metadata=None, time_origin=None):
+    """Archive an in-memory DataFrame (already on relative seconds)."""
+    writer = ArchiveWriter(path, time_col, codec, level)
+    writer.append(df)
+    return writer.close(metadata, time_origin)
+
+
+def from_csv(csv_path, path=None, codec="zlib", level=None, metadata=None, progress=None):
+    """
+    Convert a CSV to an archive chunk by chunk (memory stays bounded).
+    A wall-clock time column is stored as seconds with its epoch in the index.
+    """
+    path = path or os.path.splitext(csv_path)[0] + ARCHIVE_SUFFIX
+    writer = None
+    origin, fmt = None, None
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=CSV_CHUNK_ROWS, low_memory=False):
+            if writer is None:
+                time_col = guess_columns(chunk.columns)["time"]
+                if time_col is None:
+                    raise ValueError(f"No time column found in {os.path.basename(csv_path)}")
+                fmt = timestamps.detect(chunk[time_col])
+                writer = ArchiveWriter(path, time_col, codec, level)
+            if fmt.absolute:
+                chunk[writer.time_col], origin = timestamps.to_relative(
+                    timestamps.to_epoch_ns(chunk[writer.time_col], fmt), origin)
+            writer.append(chunk)
+            if progress:
+                progress(writer._n_rows + writer._pending)
+    except BaseException:
+        if writer is not None:
+            writer._fh.close()
+            os.remove(path)
+        raise
+    if writer is None:
+        raise ValueError("CSV contains no data")
+    meta = {"source": os.path.abspath(csv_path), **(metadata or {})}
+    return writer.close(meta, origin, fmt.kind if origin is not None else None)
+
+
+class _Column:
+    """Lazy view of one archived channel; slicing decodes only the chunks it touches."""
+    def __init__(self, store, col):
+        self.store, self.col = store, col
+
+    def __len__(self):
+        return self.store.n_rows
+
+    def __getitem__(self, key):
+        n, cr = self.store.n_rows, self.store.chunk_rows
+        if isinstance(key, (int, np.integer)):
+            i = int(key) + n if key < 0 else int(key)
+            return self.store.chunk(self.col, i // cr)[i % cr]
+        start, stop, step = key.indices(n)
+        if step < 1:
+            raise ValueError("Archive columns only support forward slices")
+        parts = []
+        for k in range(start // cr, (stop - 1) // cr + 1 if stop > start else start // cr):
+            lo, hi = max(start, k * cr), min(stop, (k + 1) * cr)
+            first = start + -(-(lo - start) // step) * step  # First row on the stride in this chunk
+            if first < hi:
+                parts.append(self.store.chunk(self.col, k)[first - k * cr:hi - k * cr:step])
+        return np.concatenate(parts) if parts else np.empty(0)
+
+
+class ArchiveStore(ChannelStore):
+    """Read-only archive behind the ChannelStore interface (see module docstring)."""
+    def __init__(self, path):
+        self.path = self.directory = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{os.path.basename(path)} is not an HDAA archive")
+        size, magic = FOOTER.unpack(self._mm[-FOOTER.size:])
+        if magic != MAGIC:
+            raise ValueError(f"{os.path.basename(path)} is truncated")
+        end = len(self._mm) - FOOTER.size
+        self.meta = json.loads(self._mm[end - size:end])
+        self.columns = self.meta["columns"]
+        self.n_rows = self.meta["n_rows"]
+        self.chunk_rows = self.meta["chunk_rows"]
+        self.codec = self.meta["codec"]
+        self.time_col = self.meta["time_col"]
+        self._chunk_first = np.array([np.nan if a is None else a for a, _ in self.meta["chunk_times"]])
+        self._chunk_last = np.array([np.nan if b is None else b for _, b in self.meta["chunk_times"]])
+        self._arrays = {}
+        self._summaries = {}
+        self._decoded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def chunk(self, col, k):
+        """Decoded chunk ``k`` of ``col`` (LRU cached)."""
+        key = (col, k)
+        with self._lock:
+            if key in self._decoded:
+                self._decoded.move_to_end(key)
+                return self._decoded[key]
+        offset, nbytes, mode, digits = self.meta["chunks"][col][k]
+        n = min(self.chunk_rows, self.n_rows - k * self.chunk_rows)
+        values = decode(self._mm[offset:offset + nbytes], n, self.codec, mode, digits)
+        with self._lock:
+            self._decoded[key] = values
+            while len(self._decoded) > CACHE_CHUNKS:
+                self._decoded.popitem(last=False)
+        return values
+
+    def array(self, col):
+        if col not in self._arrays:
+            self._arrays[col] = _Column(self, col)
+        return self._arrays[col]
+
+    def index_range(self, t0, t1):
+        """Row range covering times [t0, t1] from the chunk time index (decodes at most two chunks)."""
+        def locate(t, side):
+            k = int(np.searchsorted(self._chunk_last, t, side="left"))  # First chunk ending at/after t
+            if k >= len(self._chunk_last):
+                return self.n_rows
+            times = self.chunk(self.time_col, k)
+            return k * self.chunk_rows + int(np.searchsorted(times, t, side=side))
+        return locate(t0, "left"), locate(t1, "right")
+
+    def read(self, t0=None, t1=None, cols=None):
+        """Rows with t0 <= time <= t1 as a DataFrame (whole test by default)."""
+        start, stop = self.index_range(-np.inf if t0 is None else t0, np.inf if t1 is None else t1)
+        return self.frame(start, stop, cols)
+
+
+def is_archive(path):
+    return str(path).lower().endswith(ARCHIVE_SUFFIX)
+
+
+def main(argv=None):
+    """Command line: archive one or more CSV logs next to the originals."""
+    parser = argparse.ArgumentParser(description="Convert test CSVs to compressed HDAA archives")
+    parser.add_argument("csv", nargs="+", help="CSV files to archive")
+    parser.add_argument("--codec", choices=sorted(CODECS), default="zlib")
+    parser.add_argument("--level", type=int, default=None, help="Compression level (codec default)")
+    args = parser.parse_args(argv)
+    for path in args.csv:
+        out = from_csv(path, codec=args.codec, level=args.level)
+        ratio = os.path.getsize(path) / max(1, os.path.getsize(out))
+        print(f"{path} -> {out} ({ratio:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
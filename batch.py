@@ -0,0 +1,168 @@
+# batch.py
+"""
+Headless analysis of one CSV through the same pipeline the GUI uses.
+
+``HeadlessApp`` stands in for the Tk window: it carries an AnalyzerContext
+and fixed values for the slider/splice widgets that ``utils.compute_metrics``
+and ``utils.apply_extra_data`` read, so batch jobs reuse that logic as-is.
+"""
+
+import json
+import os
+import numpy as np
+from matplotlib.figure import Figure
+from context import AnalyzerContext
+from utils import guess_columns, compute_metrics, file_hash
+import csv_parser
+import archive
+import render_cache
+import calibration
+import quality
+import target_estimate
+import timestamps
+
+OUTPUT_SUFFIX = "_hdaa"  # <stem>_hdaa/ folder written next to each CSV
+METRICS_FILE = "metrics.json"
+
+
+class _Setting:
+    """Read-only stand-in for a Tk variable, Scale or Entry."""
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class HeadlessApp:
+    """Minimal replacement for HotfireAnalyzerApp when no GUI is running."""
+    def __init__(self, extra_data=0.0, downsample=1, splice=None):
+        self.ctx = AnalyzerContext()
+        self.custom_splice_var = _Setting(splice is not None)
+        self.custom_splice_start = _Setting(str(splice[0]) if splice else "")
+        self.custom_splice_end = _Setting(str(splice[1]) if splice else "")
+        self.extra_data_slider = _Setting(extra_data)
+        self.downsampling_slider = _Setting(downsample)
+
+
+def load(app, path, cal_set=None, repair=False):
+    """
+    Parse ``path`` (CSV or ``.hdaa`` archive) into the context, infer column
+    roles, run the quality scan (repairing when asked) and apply ``cal_set``
+    if given.
+    """
+    ctx = app.ctx
+    store = archive.ArchiveStore(path) if archive.is_archive(path) else None
+    ctx.df = store.frame(0, store.n_rows) if store else csv_parser.read_csv(path)[0]
+    ctx.store = None
+    ctx.source_paths, ctx.source_hash = [path], None
+    roles = guess_columns(ctx.df.columns)
+    ctx.time_col, ctx.thrust_cols = roles["time"], roles["thrust"]
+    ctx.chamber_col, ctx.fuel_col, ctx.oxidizer_col = roles["chamber"], roles["fuel"], roles["oxidizer"]
+    ctx.command_col = roles["command"]
+    if ctx.time_col is None or not ctx.thrust_cols:
+        raise ValueError("Could not infer time and thrust columns from the header")
+    timestamps.normalize(ctx)
+    if store is not None:  # Archived time is already relative; its clock is in the index
+        ctx.time_origin = store.meta.get("time_origin", {}).get(ctx.time_col)
+    ctx.quality = quality.scan(ctx.df, ctx.time_col)
+    ctx.raw_columns.clear()
+    if repair and ctx.quality.repairable:
+        quality.repair_context(ctx)
+    if cal_set is not None:
+        calibration.apply(ctx, cal_set)
+
+
+def auto_target(ctx):
+    """Target thrust when none is configured: (value, source) from the plateau estimator."""
+    est = target_estimate.estimate_target(ctx)
+    if not np.isfinite(est.value):
+        raise ValueError(f"Could not estimate target thrust: {est.reason}")
+    return est.value, f"estimated (ambiguous: {est.reason})" if est.ambiguous else "estimated"
+
+
+def output_dir(path):
+    stem = os.path.splitext(path)[0]
+    return stem + OUTPUT_SUFFIX
+
+
+def already_processed(path, digest):
+    """True when the output folder holds metrics for exactly this file content."""
+    meta = os.path.join(output_dir(path), METRICS_FILE)
+    try:
+        with open(meta) as fh:
+            return json.load(fh).get("file_hash") == digest
+    except (OSError, ValueError):
+        return False
+
+
+def _save_plot(path, key, time, values, mask, title, ylabel, color):
+    fig = Figure(figsize=(10, 5), dpi=100)
+    ax = fig.subplots()
+    ax.plot(time, values, color=color, linewidth=1)
+    if mask is not None and np.any(mask):
+        ax.axvspan(time[np.argmax(mask)], time[len(mask) - 1 - np.argmax(mask[::-1])],
+                   color=color, alpha=0.1, label="Burn window")
+        ax.legend()
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(True)
+    fig.tight_layout()
+    render_cache.save_png(key, fig, path)
+
+
+def analyze_file(path, target_thrust=None, params=None, out_dir=None, digest=None, cal_set=None,
+                 despike=None, repair=False):
+    """
+    Load, compute metrics and write metrics.json + PNG plots for one CSV.
+    Returns the metrics record (also written to ``metrics.json``).
+    """
+    app = HeadlessApp()
+    ctx = app.ctx
+    ctx.params.update(params or {})
+    ctx.despike = despike  # {"window", "threshold"} or None
+    load(app, path, cal_set, repair)
+    ctx.source_hash = digest or file_hash(path)
+
+    target, source = (target_thrust, "configured") if target_thrust is not None else auto_target(ctx)
+    ctx.last_target_thrust = target
+    compute_metrics(app, target)
+    if "Error" in ctx.metrics:
+        raise ValueError(ctx.metrics["Error"])
+
+    out_dir = out_dir or output_dir(path)
+    os.makedirs(out_dir, exist_ok=True)
+    time = ctx.df[ctx.time_col].to_numpy(dtype=float)
+    thrust = ctx.df[ctx.thrust_cols].sum(axis=1).to_numpy(dtype=float)
+    window = render_cache.window_key(ctx, ctx.initial_mask)
+    _save_plot(os.path.join(out_dir, "thrust.png"), ("batch", render_cache.dataset_key(ctx), "thrust", window),
+               time, thrust, ctx.initial_mask, "Total Thrust", "Thrust (lbf)", "blue")
+    if ctx.chamber_col:
+        _save_plot(os.path.join(out_dir, "chamber_pressure.png"),
+                   ("batch", render_cache.dataset_key(ctx), ctx.chamber_col, window), time,
+                   ctx.df[ctx.chamber_col].to_numpy(dtype=float), ctx.initial_mask,
+                   "Chamber Pressure", "Pressure (psi)", "red")
+
+    ignition = ctx.metric_values.get("ignition_time")
+    record = {
+        "file": os.path.abspath(path),
+        "file_hash": ctx.source_hash,
+        "target_thrust": target,
+        "target_source": source,
+        "columns": {"time": ctx.time_col, "thrust": ctx.thrust_cols, "chamber": ctx.chamber_col,
+                    "fuel": ctx.fuel_col, "oxidizer": ctx.oxidizer_col, "command": ctx.command_col},
+        "params": ctx.params,
+        "calibration": ctx.calibration_report,
+        "despike": ctx.despike_report,
+        "quality": {"sample_rate": ctx.quality.sample_rate, "issues": ctx.quality.issues(),
+                    "repairs": ctx.quality.repairs},
+        # Wall-clock times (None for files logged in relative seconds) for cross-file alignment
+        "clock": {"start": timestamps.clock(ctx.time_origin),
+                  "ignition": timestamps.clock(ctx.time_origin, ignition) if ignition is not None else None},
+        "metrics": ctx.metrics,
+        "values": ctx.metric_values,
+    }
+    with open(os.path.join(out_dir, METRICS_FILE), "w") as fh:
+        json.dump(record, fh, indent=2)
+    return record
@@ -0,0 +1,73 @@
+# benchmarks/bench_csv_parsers.py
+"""
+Compare the CSV engines in csv_parser on synthetic hotfire logs.
+
+    python benchmarks/bench_csv_parsers.py --rows 2000000 --channels 32
+
+Writes the synthetic file once to a temp directory, then times every
+available engine (best of ``--repeat`` runs) with and without role-based
+dtype pinning.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import csv_parser  # noqa: E402
+
+
+def make_log(path, rows, channels, rate=1000.0, seed=0):
+    """Synthetic log: time, thrust load cells, chamber pressure, tank weights, extra channels."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(rows) / rate
+    burn = (t > t[-1] * 0.3) & (t < t[-1] * 0.7)
+    cols = {"Time": t}
+    for i in range(3):
+        cols[f"Thrust {i + 1} (lbf)"] = np.where(burn, 300.0, 0.0) + rng.normal(0, 2, rows)
+    cols["Chamber Pressure (psi)"] = np.where(burn, 350.0, 14.7) + rng.normal(0, 1, rows)
+    cols["Fuel Weight (lbf)"] = 40 - 0.1 * t + rng.normal(0, 0.05, rows)
+    cols["Ox Weight (lbf)"] = 90 - 0.25 * t + rng.normal(0, 0.05, rows)
+    for i in range(max(0, channels - len(cols) + 1)):
+        cols[f"Aux {i} (V)"] = rng.normal(0, 1, rows)
+    pd.DataFrame(cols).to_csv(path, index=False, float_format="%.6f")
+
+
+def bench(path, engine, pinned, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df, used = csv_parser.read_csv(path, engine=engine, dtypes=None if pinned else {})
+        best = min(best, time.perf_counter() - start)
+    return best, used, df.shape
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--channels", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic_hotfire.csv")
+        make_log(path, args.rows, args.channels)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"{args.rows:,} rows x {args.channels} channels, {size_mb:.1f} MB, {os.cpu_count()} cores")
+        print(f"{'engine':<16}{'dtypes':<10}{'seconds':>10}{'MB/s':>10}")
+        baseline = None
+        for engine in csv_parser.available_engines():
+            for pinned in (False, True):
+                secs, used, shape = bench(path, engine, pinned, args.repeat)
+                baseline = baseline or secs
+                print(f"{used:<16}{'pinned' if pinned else 'inferred':<10}{secs:>10.3f}"
+                      f"{size_mb / secs:>10.1f}   x{baseline / secs:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# calibration.py
+"""
+Per-channel load cell / transducer calibration applied once at ingest.
+
+A calibration set maps channel names to either a linear ``scale``/``offset``
+pair or ascending polynomial coefficients (``poly``: c0 + c1·x + c2·x² …),
+plus an optional automatic tare.  The tare is the median of the calibrated
+signal in a pre-ignition window found from the summed thrust, so zero drift
+between tests needs no hand editing.
+
+Each calibrated column is evaluated vectorised once and written back into
+``ctx.df`` as float64; the raw column is kept so re-applying a different set
+never calibrates twice.  Sets are saved as JSON per test stand under
+``~/.hdaa/calibrations/<stand>.json``.
+"""
+
+import json
+import os
+import numpy as np
+from numpy.polynomial import polynomial as P
+
+CAL_DIR = os.path.join(os.path.expanduser("~"), ".hdaa", "calibrations")
+TARE_SECONDS = 1.0  # Length of the pre-ignition tare window
+TARE_GUARD = 0.1  # Seconds left out just before ignition
+IGNITION_FRACTION = 0.05  # Fraction of the thrust rise that marks ignition
+
+
+class CalibrationSet:
+    """Named collection of channel calibrations for one test stand."""
+    def __init__(self, name="default", channels=None, tare_seconds=TARE_SECONDS, tare_window=None):
+        self.name = name
+        # col -> {"scale": float, "offset": float, "poly": [c0, c1, ...] or None, "tare": bool}
+        self.channels = dict(channels or {})
+        self.tare_seconds = tare_seconds
+        self.tare_window = tare_window  # Explicit (t0, t1) in seconds; None = automatic
+
+    def set_channel(self, col, scale=1.0, offset=0.0, poly=None, tare=True):
+        self.channels[col] = {"scale": float(scale), "offset": float(offset),
+                              "poly": [float(c) for c in poly] if poly else None, "tare": bool(tare)}
+
+    def coefficients(self, col):
+        """Ascending polynomial coefficients for ``col`` (linear sets become [offset, scale])."""
+        spec = self.channels[col]
+        return np.asarray(spec["poly"] if spec.get("poly") else [spec.get("offset", 0.0), spec.get("scale", 1.0)],
+                          dtype=float)
+
+    def to_dict(self):
+        return {"name": self.name, "channels": self.channels,
+                "tare_seconds": self.tare_seconds, "tare_window": self.tare_window}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("name", "default"), data.get("channels"),
+                   data.get("tare_seconds", TARE_SECONDS), data.get("tare_window"))
+
+    def save(self, path=None):
+        path = path or stand_path(self.name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as fh:
+            json.dump(self.to_dict(), fh, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as fh:
+            return cls.from_dict(json.load(fh))
+
+
+def stand_path(name):
+    return os.path.join(CAL_DIR, f"{name}.json")
+
+
+def list_stands():
+    """Names of the calibration sets saved under CAL_DIR."""
+    if not os.path.isdir(CAL_DIR):
+        return []
+    return sorted(f[:-5] for f in os.listdir(CAL_DIR) if f.endswith(".json"))
+
+
+def resolve(name_or_path):
+    """Load a set from a JSON path or a saved stand name."""
+    path = name_or_path if os.path.isfile(name_or_path) else stand_path(name_or_path)
+    return CalibrationSet.load(path)
+
+
+def pre_ignition_window(time, thrust, tare_seconds=TARE_SECONDS, guard=TARE_GUARD,
+                        fraction=IGNITION_FRACTION):
+    """
+    Row range [start, stop) just before ignition, or None if there is no quiet
+    lead-in.  Ignition is the first sample where the summed thrust rises more
+    than ``fraction`` of its full swing above the initial baseline.
+    """
+    thrust = np.asarray(thrust, dtype=float)
+    if len(thrust) < 2:
+        return None
+    lead = thrust[:max(10, len(thrust) // 50)]
+    baseline = np.nanmedian(lead)
+    swing = np.nanmax(thrust) - baseline
+    if not np.isfinite(swing) or swing <= 0:
+        return None
+    ignition = int(np.argmax(thrust - baseline > fraction * swing))
+    t_ign = time[ignition]
+    stop = int(np.searchsorted(time, t_ign - guard, side="left"))
+    start = int(np.searchsorted(time, t_ign - guard - tare_seconds, side="left"))
+    return (start, stop) if stop > start else None
+
+
+def _raw(ctx, col):
+    """Uncalibrated values for ``col``; the first call stashes them on ctx."""
+    raw = ctx.raw_columns.get(col)
+    if raw is None:
+        raw = ctx.raw_columns[col] = ctx.df[col].to_numpy(dtype=float)
+    return raw
+
+
+def _store_tare_rows(ctx, cal_set, cols):
+    """
+    Out-of-core tare rows: ignition is located on the store's min/max envelope
+    of the calibrated summed thrust, then the pre-ignition rows are read from
+    the store.  Returns (time, {col: calibrated values}), empty when none.
+    """
+    store = ctx.store
+    store.time_col = ctx.time_col
+    if cal_set.tare_window:
+        t0, t1 = cal_set.tare_window
+    else:
+        if not ctx.thrust_cols:
+            return np.empty(0), {}
+
+        def calibrate(arrs):
+            return {c: P.polyval(v, cal_set.coefficients(c)) if c in cols else v for c, v in arrs.items()}
+        time, thrust = store.summary(ctx.thrust_cols, transform=calibrate)
+        window = pre_ignition_window(time, thrust, cal_set.tare_seconds)
+        if window is None:
+            return np.empty(0), {}
+        t0, t1 = time[window[0]], time[window[1] - 1]
+    start, stop = store.index_range(t0, t1)
+    if stop <= start:
+        return np.empty(0), {}
+    frame = store.frame(start, stop, [ctx.time_col, *cols])
+    return (frame[ctx.time_col].to_numpy(dtype=float),
+            {c: P.polyval(frame[c].to_numpy(dtype=float), cal_set.coefficients(c)) for c in cols})
+
+
+def apply(ctx, cal_set):
+    """
+    Calibrate ``ctx.df`` in place with ``cal_set`` and return a report
+    {col: {"tare": offset removed, "coefficients": [...]}, "tare_window": (t0, t1)}.
+    Channels missing from the file are skipped.
+    """
+    cols = [c for c in cal_set.channels if c in ctx.df.columns and c != ctx.time_col]
+    time = ctx.df[ctx.time_col].to_numpy(dtype=float)
+    calibrated = {c: P.polyval(_raw(ctx, c), cal_set.coefficients(c)) for c in cols}
+
+    # Tare window from the calibrated summed thrust (or the explicit one on the set)
+    window = None
+    tare_time, tare_values = time, calibrated
+    if ctx.store is not None:  # Only a head frame is resident: read the pre-ignition rows from the store
+        tare_time, tare_values = _store_tare_rows(ctx, cal_set, cols)
+        window = (0, len(tare_time)) if len(tare_time) else None
+    elif cal_set.tare_window:
+        window = (int(np.searchsorted(time, cal_set.tare_window[0])),
+                  int(np.searchsorted(time, cal_set.tare_window[1])))
+    elif ctx.thrust_cols:
+        thrust = sum(calibrated[c] if c in calibrated else ctx.df[c].to_numpy(dtype=float)
+                     for c in ctx.thrust_cols)
+        window = pre_ignition_window(time, thrust, cal_set.tare_seconds)
+
+    report = {"name": cal_set.name, "channels": {},
+              "tare_window": (float(tare_time[window[0]]), float(tare_time[window[1] - 1])) if window else None}
+    for c in cols:
+        values = calibrated[c]
+        tare = 0.0
+        if cal_set.channels[c].get("tare") and window:
+            tare = float(np.nanmedian(tare_values[c][window[0]:window[1]]))
+            values -= tare
+        ctx.df[c] = values
+        report["channels"][c] = {"tare": tare, "coefficients": cal_set.coefficients(c).tolist()}
+
+    ctx.calibration, ctx.calibration_report = cal_set, report
+    ctx.revision += 1  # Cached plot arrays and stats no longer match the data
+    ctx.column_stats.clear()
+    return report
+
+
+def apply_frame(ctx, frame):
+    """
+    Re-apply the active calibration (with its fixed tares) to a freshly read
+    frame that is about to replace ``ctx.df`` (out-of-core window refresh).
+    """
+    ctx.raw_columns.clear()
+    return calibrate_frame(ctx, frame, stash=True)
+
+
+def _calibrated(raw, spec):
+    return P.polyval(raw, np.asarray(spec["coefficients"])) - spec["tare"]
+
+
+def calibrate_frame(ctx, frame, stash=False):
+    """Calibrate the columns of ``frame`` covered by the active report (e.g. store chunks)."""
+    report = ctx.calibration_report
+    if not report:
+        return frame
+    for c, spec in report["channels"].items():
+        if c in frame.columns:
+            raw = frame[c].to_numpy(dtype=float)
+            if stash:
+                ctx.raw_columns[c] = raw
+            frame[c] = _calibrated(raw, spec)
+    return frame
+
+
+def calibrate_arrays(ctx, arrays):
+    """``calibrate_frame`` for a {col: ndarray} chunk streamed from a store (returns a new dict)."""
+    report = ctx.calibration_report
+    if not report:
+        return arrays
+    out = dict(arrays)
+    for c, spec in report["channels"].items():
+        if c in out:
+            out[c] = _calibrated(np.asarray(out[c], dtype=float), spec)
+    return out
+
+
+def reset(ctx):
+    """Restore the raw columns and drop the active calibration."""
+    for c, raw in ctx.raw_columns.items():
+        if ctx.df is not None and c in ctx.df.columns and len(raw) == len(ctx.df):
+            ctx.df[c] = raw
+    ctx.raw_columns.clear()
+    ctx.calibration, ctx.calibration_report = None, None
+    ctx.revision += 1
+    ctx.column_stats.clear()
@@ -0,0 +1,184 @@
+# campaign_db.py
+"""
+Local SQLite index of per-test metrics for campaign trend queries.
+
+One row per analysed file, keyed by the file's SHA-256 so re-analysing the
+same data updates the row instead of duplicating it.  Indexed on test date
+and file name so season-wide queries never touch the CSVs again.
+
+Hashing a multi-GB source takes seconds, so the GUI hashes on a worker
+thread and records the latest metrics once the digest is known.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import pandas as pd
+
+DEFAULT_DB = os.path.join(os.path.expanduser("~"), ".hdaa", "campaign.sqlite")
+G_FT_S2 = 32.174
+
+# Numeric metric columns, in display order, with their labels
+METRICS = {
+    "burn_time": "Burn Time (s)",
+    "total_impulse": "Total Impulse (lbf·s)",
+    "avg_thrust": "Average Thrust (lbf)",
+    "peak_pressure": "Peak Chamber Pressure (psi)",
+    "avg_isp": "Average ISP (s)",
+    "avg_c_star": "Average c* (m/s)",
+    "avg_of": "Average O/F",
+}
+_pending = {}  # tuple(source paths) -> latest (values, params, target) waiting for its hash
+_lock = threading.Lock()
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    file_hash TEXT NOT NULL UNIQUE,
+    file_name TEXT NOT NULL,
+    file_path TEXT,
+    test_date TEXT,
+    recorded_at TEXT NOT NULL,
+    target_thrust REAL,
+    {", ".join(f"{m} REAL" for m in METRICS)},
+    params_json TEXT,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tests_date ON tests (test_date);
+CREATE INDEX IF NOT EXISTS idx_tests_name ON tests (file_name);
+"""
+
+
+def connect(path=DEFAULT_DB):
+    """Open (and create if needed) the campaign database."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    con = sqlite3.connect(path, timeout=30)
+    con.execute("PRAGMA journal_mode=WAL")  # Lets the GUI read while a batch writer records
+    con.executescript(SCHEMA)
+    if "source" not in {r[1] for r in con.execute("PRAGMA table_info(tests)")}:  # Databases from before the column
+        with con:
+            con.execute("ALTER TABLE tests ADD COLUMN source TEXT")
+    return con
+
+
+def derived_averages(values, params):
+    """Average ISP and c* from burn averages when mdot / throat area are known."""
+    out = {"avg_isp": None, "avg_c_star": None}
+    if "fuel_mdot" not in params or "oxidizer_mdot" not in params:
+        return out
+    mdot_lbs = params["fuel_mdot"] + params["oxidizer_mdot"]
+    if mdot_lbs <= 0:
+        return out
+    if values.get("avg_thrust") is not None:
+        out["avg_isp"] = values["avg_thrust"] / mdot_lbs  # F / (mdot_slug * g)
+    if values.get("avg_pressure") is not None and params.get("throat_area"):
+        out["avg_c_star"] = values["avg_pressure"] * 144 * params["throat_area"] / (mdot_lbs / G_FT_S2) * 0.3048
+    return out
+
+
+def record_test(con, file_hash, file_name, values, params=None, target_thrust=None,
+                file_path=None, test_date=None, source="gui"):
+    """Insert or update one test row (keyed by file hash); ``source`` is "gui" or "batch"."""
+    params = params or {}
+    row = {m: values.get(m) for m in METRICS}
+    row.update({k: v for k, v in derived_averages(values, params).items() if v is not None})
+    if test_date is None and file_path and os.path.exists(file_path):
+        test_date = datetime.datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(timespec="seconds")
+    record = {
+        "file_hash": file_hash, "file_name": file_name, "file_path": file_path,
+        "test_date": test_date, "recorded_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "target_thrust": target_thrust, **row, "params_json": json.dumps(params),
+        "source": source,
+    }
+    cols = list(record)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in cols if c != "file_hash")
+    with con:
+        con.execute(
+            f"INSERT INTO tests ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)}) "
+            f"ON CONFLICT(file_hash) DO UPDATE SET {updates}",
+            [record[c] for c in cols],
+        )
+
+
+def is_recorded(con, file_hash, source=None):
+    """True when a row for ``file_hash`` exists (recorded by ``source`` if given)."""
+    sql, args = "SELECT 1 FROM tests WHERE file_hash = ?", [file_hash]
+    if source:
+        sql += " AND source = ?"
+        args.append(source)
+    return con.execute(sql, args).fetchone() is not None
+
+
+def query_tests(con, since=None, until=None, name_like=None):
+    """Tests ordered by date as a DataFrame; dates are ISO strings (prefixes work)."""
+    sql, args = "SELECT * FROM tests WHERE 1=1", []
+    if since:
+        sql += " AND test_date >= ?"
+        args.append(since)
+    if until:
+        sql += " AND test_date <= ?"
+        args.append(until + "~")  # "~" sorts after any time suffix, so date-only bounds are inclusive
+    if name_like:
+        sql += " AND file_name LIKE ?"
+        args.append(f"%{name_like}%")
+    sql += " ORDER BY test_date, id"
+    return pd.read_sql_query(sql, con, params=args)
+
+
+def _record_snapshot(con, digest, paths, snapshot):
+    values, params, target = snapshot
+    close = con is None
+    try:
+        con = con or connect()
+        name = " + ".join(os.path.basename(p) for p in paths)
+        record_test(con, digest, name, values, params, target, paths[0])
+    except (OSError, sqlite3.Error) as e:
+        print("Campaign index not updated:", e)
+    finally:
+        if close and con is not None:
+            con.close()
+
+
+def _hash_and_record(ctx, paths):
+    from utils import file_hash
+    try:
+        digest = file_hash(paths)
+    except OSError as e:
+        print("Campaign index not updated:", e)
+        digest = None
+    with _lock:  # Record and publish the hash together, so later calls record synchronously after us
+        snapshot = _pending.pop(tuple(paths))
+        if digest is not None:
+            _record_snapshot(None, digest, paths, snapshot)
+            if ctx.source_paths == paths and ctx.source_hash is None:
+                ctx.source_hash = digest
+
+
+def record_context(app, con=None):
+    """
+    Record the currently loaded test from the app context; silently skips if
+    not possible.  Without ``con`` and before the source hash is known, the
+    file is hashed on a worker thread (the Tk thread never blocks on it).
+    """
+    ctx = app.ctx
+    if not ctx.metric_values or not ctx.source_paths:
+        return
+    paths = list(ctx.source_paths)
+    snapshot = (dict(ctx.metric_values), dict(ctx.params), getattr(ctx, "last_target_thrust", None))
+    with _lock:
+        digest = ctx.source_hash
+        if digest is None and con is None:
+            if tuple(paths) not in _pending:
+                threading.Thread(target=_hash_and_record, args=(ctx, paths), daemon=True).start()
+            _pending[tuple(paths)] = snapshot  # A hash in progress records the newest metrics
+            return
+    if digest is None:  # Explicit record on the caller's connection
+        from utils import file_hash
+        try:
+            digest = ctx.source_hash = file_hash(paths)
+        except OSError as e:
+            print("Campaign index not updated:", e)
+            return
+    _record_snapshot(con, digest, paths, snapshot)
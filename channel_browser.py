@@ -0,0 +1,129 @@
+# channel_browser.py
+"""
+Searchable channel list for DAQ files with hundreds of columns.
+
+A single ``tk.Listbox`` holds the (filtered) names, so building the widget
+costs one string list instead of one Checkbutton per column.  Typing in the
+search box filters as you type, the unit box narrows to one unit group, and
+quick stats for the highlighted channel are computed only when asked for.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from utils import extract_unit
+
+ALL_UNITS = "All units"
+NO_UNIT = "(no unit)"
+
+
+class ChannelBrowser(tk.Frame):
+    """
+    Filterable channel list; ``selected()`` returns picks in column order.
+    Multi-select by default, one channel with ``single=True``.
+    """
+    def __init__(self, master, columns, selected=(), stats_fn=None, height=15, font=None, single=False):
+        super().__init__(master)
+        self.columns = list(columns)
+        self.single = single
+        self.stats_fn = stats_fn  # col -> str, called lazily for the active channel
+        self._selected = set(selected)
+        self._shown = []
+        self._after_id = None
+        self._units = {c: extract_unit(c) or NO_UNIT for c in self.columns}
+
+        # Search and unit filter row
+        bar = tk.Frame(self)
+        bar.pack(fill=tk.X)
+        tk.Label(bar, text="Search:", font=font).pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        tk.Entry(bar, textvariable=self.search_var, font=font).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        units = sorted(set(self._units.values()))
+        self.unit_var = tk.StringVar(value=ALL_UNITS)
+        ttk.Combobox(bar, textvariable=self.unit_var, values=[ALL_UNITS, *units],
+                     state="readonly", width=14).pack(side=tk.LEFT, padx=4)
+
+        # The list itself
+        body = tk.Frame(self)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.listbox = tk.Listbox(body, selectmode=tk.BROWSE if single else tk.MULTIPLE, height=height,
+                                  exportselection=False, font=font)
+        scroll = tk.Scrollbar(body, command=self.listbox.yview)
+        self.listbox.config(yscrollcommand=scroll.set)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Count + lazy stats line
+        self.info = tk.Label(self, text="", anchor="w", font=font)
+        self.info.pack(fill=tk.X)
+
+        self.search_var.trace_add("write", self._schedule_filter)
+        self.unit_var.trace_add("write", self._schedule_filter)
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self._apply_filter()
+
+    def _schedule_filter(self, *_):
+        # Debounce keystrokes so very wide files refilter once per pause
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+        self._after_id = self.after(80, self._apply_filter)
+
+    def _apply_filter(self):
+        self._after_id = None
+        needle = self.search_var.get().strip().lower()
+        unit = self.unit_var.get()
+        self._shown = [c for c in self.columns
+                       if (not needle or needle in c.lower())
+                       and (unit == ALL_UNITS or self._units[c] == unit)]
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *self._shown)
+        for i, c in enumerate(self._shown):
+            if c in self._selected:
+                self.listbox.selection_set(i)
+        self._update_info()
+
+    def _on_select(self, _event=None):
+        picked = set(self.listbox.curselection())
+        before = {i for i, c in enumerate(self._shown) if c in self._selected}
+        # The clicked row is the one whose state changed (tk.ACTIVE only moves on button release)
+        changed = (picked - before) or (before - picked)
+        if self.single and picked:
+            self._selected = {self._shown[i] for i in picked}
+        else:  # Keep selections made while filtered when the filter changes again
+            for i, c in enumerate(self._shown):
+                if i in picked:
+                    self._selected.add(c)
+                else:
+                    self._selected.discard(c)
+        self._update_info(self._shown[min(changed)] if changed else None)
+
+    def _update_info(self, active=None):
+        text = f"{len(self._shown)} of {len(self.columns)} channels, {len(self._selected)} selected"
+        if active is not None and self.stats_fn is not None:
+            text += f"  |  {active}: {self.stats_fn(active)}"
+        self.info.config(text=text)
+
+    def selected(self):
+        return [c for c in self.columns if c in self._selected]
+
+
+def pick_one(master, title, columns, current=None, stats_fn=None):
+    """Modal single-channel picker → the chosen column, or None when cancelled."""
+    result = []
+    win = tk.Toplevel(master)
+    win.title(title)
+    win.geometry("520x560")
+    browser = ChannelBrowser(win, columns, selected=[current] if current else (),
+                             stats_fn=stats_fn, height=20, single=True)
+    browser.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
+
+    def confirm():
+        result.extend(browser.selected())
+        win.destroy()
+
+    tk.Button(win, text="OK", command=confirm).pack(pady=8)
+    browser.listbox.bind("<Double-Button-1>", lambda e: confirm())
+    win.transient(master)
+    win.grab_set()
+    master.wait_window(win)
+    return result[0] if result else None
+
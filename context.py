@@ -4,16 +4,47 @@ class AnalyzerContext:
     """Holds shared data so every handler sees the same state."""
     def __init__(self):
         # Raw data
+        self.generation = 0  # Bumped by every ctx.df assignment (render_cache keys)
         self.df = None
+        self.source_paths = []  # File(s) ctx.df was loaded from
+        self.source_hash = None  # SHA-256 of source_paths, computed on first use
+        self.store = None  # ooc.ChannelStore when a file is opened out-of-core
+        self.revision = 0  # Bumped whenever ctx.df values are transformed in place (render_cache keys)
         # Column names
         self.time_col = None
         self.thrust_cols = []
         self.chamber_col = None
         self.fuel_col = None
         self.oxidizer_col = None
+        self.command_col = None  # Valve / fire command channel for ignition delay
         # Derived data
         self.of_ratio = None
         self.initial_mask = None
         self.data_mask = None
+        # Calibration (calibration.py): active set, last report, raw copies of calibrated columns
+        self.calibration = None
+        self.calibration_report = None
+        self.raw_columns = {}
+        # Spike/dropout rejection (despike.py): settings dict or None, counts per channel
+        self.despike = None
+        self.despike_report = {}
+        self.quality = None  # quality.QualityReport from the load-time scan
+        # Absolute clock (timestamps.py): epoch ns of t = 0, detected format, what t = 0 marks
+        self.time_origin = None
+        self.time_format = None
+        self.time_reference = "start"
         # Metrics & misc
         self.metrics = {}
+        self.metric_values = {}  # Numeric metrics (see utils.compute_metrics)
+        self.column_stats = {}  # Lazily computed quick stats per column (utils.quick_stats)
+        self.params = {}  # Last user-entered test parameters (mdot, throat area, ...)
+
+    @property
+    def df(self):
+        return self._df
+
+    @df.setter
+    def df(self, value):
+        # A new frame (load, merge, repair, out-of-core window): arrays cached for the old one are stale
+        self._df = value
+        self.generation += 1
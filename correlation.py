@@ -0,0 +1,263 @@
+# correlation.py
+"""
+Cross-correlation, lag and coherence between channels.
+
+The lag is found coarse-to-fine over the burn window.  Each channel is
+standardised and reduced to a pyramid of pairwise block means; the top level
+(at most ``COARSE_POINTS`` samples) is correlated with one zero-padded FFT
+over the whole lag range, and the peak is then refined level by level down
+to full resolution, evaluating only a few lags around the previous estimate
+(one dot product each) before a parabolic fit gives a sub-sample lag.
+Magnitude-squared coherence comes from Welch-averaged cross spectra.
+
+``lag_matrix`` prepares (and FFTs) every channel once and correlates the
+pairs on a thread pool; numpy's FFT and dot products release the GIL.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from matplotlib.figure import Figure
+from despike import bridge_dropouts
+from spectral import sample_rate
+
+COARSE_POINTS = 1 << 16  # Samples per channel at the coarse search level
+MAX_LAG_FRACTION = 0.25  # Default lag range as a fraction of the window length
+REFINE_RADIUS = 3  # Lags checked either side of the estimate at each finer level
+NPERSEG = 1024  # Coherence segment length (samples)
+MAX_FRAMES = 2000  # Coherence segments used at most (hop widens on long windows)
+FRAME_BATCH = 64
+CACHE_SIZE = 16
+_cache = OrderedDict()
+
+
+def _fast_len(n):
+    """Smallest 2^a 3^b 5^c >= n (an FFT size numpy transforms quickly)."""
+    best = 1 << int(np.ceil(np.log2(max(n, 1))))
+    f5 = 1
+    while f5 < best:
+        f35 = f5
+        while f35 < best:
+            f = f35
+            while f < n:
+                f *= 2
+            best = min(best, f)
+            f35 *= 3
+        f5 *= 5
+    return best
+
+
+class Channel:
+    """A standardised channel with its block-mean pyramid and cached coarse spectra."""
+    def __init__(self, x, coarse_points=COARSE_POINTS):
+        x, _ = bridge_dropouts(None, x)
+        std = x.std()
+        x = (x - x.mean()) / std if std > 0 else np.zeros(len(x))
+        self.levels = [x]  # levels[k] is decimated by 2**k
+        while len(self.levels[-1]) > coarse_points:
+            y = self.levels[-1]
+            n = len(y) // 2 * 2
+            self.levels.append(0.5 * (y[:n:2] + y[1:n:2]))
+        self._spectra = {}
+
+    @property
+    def factor(self):
+        return 1 << (len(self.levels) - 1)
+
+    def spectrum(self, nfft):
+        if nfft not in self._spectra:
+            self._spectra[nfft] = np.fft.rfft(self.levels[-1], nfft)
+        return self._spectra[nfft]
+
+
+def _corr_at(a, b, k):
+    """Correlation coefficient of a[n] with b[n + k] over their overlap."""
+    n = min(len(a), len(b))
+    if abs(k) >= n - 1:
+        return 0.0
+    if k >= 0:
+        x, y = a[:n - k], b[k:n]
+    else:
+        x, y = a[-k:n], b[:n + k]
+    return float(np.dot(x, y)) / len(x)
+
+
+def _coarse(ca, cb, max_lag):
+    """FFT correlation of the top pyramid levels: (lags, r) for |lag| <= max_lag (coarse samples)."""
+    n = min(len(ca.levels[-1]), len(cb.levels[-1]))
+    max_lag = int(min(max_lag, n - 2))
+    nfft = _fast_len(len(ca.levels[-1]) + max_lag)
+    raw = np.fft.irfft(np.conj(ca.spectrum(nfft)) * cb.spectrum(nfft), nfft)
+    lags = np.arange(-max_lag, max_lag + 1)
+    r = np.concatenate((raw[nfft - max_lag:], raw[:max_lag + 1])) / (n - np.abs(lags))  # Overlap-normalised
+    return lags, r
+
+
+def _refine(ca, cb, k, max_lag):
+    """Walk the lag ``k`` (top-level samples) down the pyramid; returns (lag samples, r)."""
+    r = None
+    for level in range(len(ca.levels) - 2, -1, -1):
+        a, b = ca.levels[level], cb.levels[level]
+        limit = max_lag >> level
+        cands = np.clip(np.arange(2 * k - REFINE_RADIUS, 2 * k + REFINE_RADIUS + 1), -limit, limit)
+        scores = [_corr_at(a, b, c) for c in cands]
+        best = int(np.argmax(np.abs(scores)))
+        k, r = int(cands[best]), scores[best]
+    a, b = ca.levels[0], cb.levels[0]
+    if r is None:
+        r = _corr_at(a, b, k)
+    # Parabolic interpolation of |r| around the full-resolution peak
+    r0, r1 = abs(_corr_at(a, b, k - 1)), abs(_corr_at(a, b, k + 1))
+    denom = r0 - 2 * abs(r) + r1
+    frac = 0.5 * (r0 - r1) / denom if denom < 0 else 0.0
+    return k + float(np.clip(frac, -0.5, 0.5)), r
+
+
+def coherence(a, b, fs, nperseg=NPERSEG, overlap=0.5, max_frames=MAX_FRAMES):
+    """
+    Magnitude-squared coherence from Welch-averaged cross spectra.
+    Returns (freqs, Cxy, |cross spectrum|).
+    """
+    a, _ = bridge_dropouts(None, a)
+    b, _ = bridge_dropouts(None, b)
+    n = min(len(a), len(b))
+    nperseg = min(nperseg, n)
+    hop = max(1, int(nperseg * (1 - overlap)))
+    if (n - nperseg) // hop + 1 > max_frames:
+        hop = int(np.ceil((n - nperseg) / (max_frames - 1)))
+    window = np.hanning(nperseg)
+    fa = sliding_window_view(a[:n], nperseg)[::hop]
+    fb = sliding_window_view(b[:n], nperseg)[::hop]
+    n_freq = nperseg // 2 + 1
+    saa, sbb, sab = np.zeros(n_freq), np.zeros(n_freq), np.zeros(n_freq, dtype=complex)
+    for i in range(0, len(fa), FRAME_BATCH):
+        sa, sb = fa[i:i + FRAME_BATCH], fb[i:i + FRAME_BATCH]
+        xa = np.fft.rfft((sa - sa.mean(axis=1, keepdims=True)) * window, axis=1)
+        xb = np.fft.rfft((sb - sb.mean(axis=1, keepdims=True)) * window, axis=1)
+        saa += (xa.real ** 2 + xa.imag ** 2).sum(axis=0)
+        sbb += (xb.real ** 2 + xb.imag ** 2).sum(axis=0)
+        sab += (np.conj(xa) * xb).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cxy = np.where(saa * sbb > 0, np.abs(sab) ** 2 / (saa * sbb), 0.0)
+    return np.fft.rfftfreq(nperseg, 1.0 / fs), cxy, np.abs(sab)
+
+
+def _shift(a, b, k):
+    """a and b trimmed so that a[i] lines up with b[i + k]."""
+    k = int(round(k))
+    n = min(len(a), len(b))
+    return (a[:n - k], b[k:n]) if k >= 0 else (a[-k:n], b[:n + k])
+
+
+def _pair(ca, cb, raw_a, raw_b, fs, max_lag, nperseg):
+    lags, r = _coarse(ca, cb, int(np.ceil(max_lag / ca.factor)))
+    k_coarse = int(lags[np.argmax(np.abs(r))])
+    k, peak = _refine(ca, cb, k_coarse, max_lag)
+    # Coherence on the lag-aligned raw channels, summarised where the cross power is
+    freqs, cxy, cross = coherence(*_shift(raw_a, raw_b, k), fs, nperseg)
+    weight = cross[1:]
+    mean_coh = float(np.sum(cxy[1:] * weight) / np.sum(weight)) if np.sum(weight) > 0 else 0.0
+    return {"lag": k / fs, "lag_samples": k, "r": peak, "coherence": mean_coh,
+            "lags": lags * ca.factor / fs, "xcorr": r, "freqs": freqs, "cxy": cxy}
+
+
+def _max_lag_samples(n, fs, max_lag):
+    return int(min(n - 2, round(max_lag * fs) if max_lag else MAX_LAG_FRACTION * n))
+
+
+def lag(time, a, b, max_lag=None, nperseg=NPERSEG, key=None):
+    """
+    Lag of ``b`` behind ``a`` over one window.  ``max_lag`` (s) bounds the
+    search (default a quarter of the window).  Returns {"lag" (s, positive
+    when b lags a), "lag_samples", "r" (correlation at the lag), "coherence"
+    (cross-power-weighted mean Cxy), "lags"/"xcorr" (coarse curve),
+    "freqs"/"cxy" (coherence spectrum)}.  ``key`` enables caching.
+    """
+    cache_key = None if key is None else (key, max_lag, nperseg)
+    if cache_key is not None and cache_key in _cache:
+        _cache.move_to_end(cache_key)
+        return _cache[cache_key]
+    fs = sample_rate(time)
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if min(len(a), len(b)) < 16:
+        raise ValueError("Not enough samples to correlate")
+    result = _pair(Channel(a), Channel(b), a, b, fs, _max_lag_samples(len(a), fs, max_lag), nperseg)
+    if cache_key is not None:
+        _cache[cache_key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def lag_matrix(time, channels, max_lag=None, nperseg=NPERSEG, workers=None):
+    """
+    Pairwise lags across ``channels`` ({name: array}, same time base).
+    Returns (names, lag s, r, coherence) with matrices indexed [row, col]
+    meaning "col lags row by lag[row, col]"; the pairs run on ``workers``
+    threads (default: one per CPU).
+    """
+    names = list(channels)
+    fs = sample_rate(time)
+    raw = {c: np.asarray(channels[c], dtype=float) for c in names}
+    n = min(len(x) for x in raw.values())
+    if n < 16:
+        raise ValueError("Not enough samples to correlate")
+    limit = _max_lag_samples(n, fs, max_lag)
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        prepared = dict(zip(names, pool.map(lambda c: Channel(raw[c]), names)))
+        pairs = [(i, j) for i in range(len(names)) for j in range(i + 1, len(names))]
+        results = pool.map(lambda p: _pair(prepared[names[p[0]]], prepared[names[p[1]]],
+                                           raw[names[p[0]]], raw[names[p[1]]], fs, limit, nperseg), pairs)
+        size = len(names)
+        lags, r, coh = np.zeros((size, size)), np.eye(size), np.eye(size)
+        for (i, j), res in zip(pairs, results):
+            lags[i, j], lags[j, i] = res["lag"], -res["lag"]
+            r[i, j] = r[j, i] = res["r"]
+            coh[i, j] = coh[j, i] = res["coherence"]
+    return names, lags, r, coh
+
+
+def render_pair(result, name_a, name_b):
+    """Two-panel Figure: coarse cross-correlation curve and coherence spectrum."""
+    fig = Figure(figsize=(12, 8), dpi=100)
+    ax_r, ax_c = fig.subplots(2, 1)
+    ax_r.plot(result["lags"] * 1000, result["xcorr"], color="blue", linewidth=1)
+    ax_r.axvline(result["lag"] * 1000, color="red", linestyle="--",
+                 label=f"lag {result['lag'] * 1000:.3f} ms, r = {result['r']:.3f}")
+    ax_r.set_xlabel(f"Lag of {name_b} behind {name_a} (ms)")
+    ax_r.set_ylabel("Correlation")
+    ax_r.set_title(f"Cross-correlation: {name_a} → {name_b}")
+    ax_r.legend()
+    ax_r.grid(True)
+
+    ax_c.plot(result["freqs"], result["cxy"], color="black", linewidth=1)
+    ax_c.set_ylim(0, 1.05)
+    ax_c.set_xlabel("Frequency (Hz)")
+    ax_c.set_ylabel("Coherence")
+    ax_c.set_title(f"Magnitude-squared coherence (weighted mean {result['coherence']:.3f})")
+    ax_c.grid(True)
+    fig.tight_layout()
+    return fig
+
+
+def render_matrix(names, lags, r, coh):
+    """Heatmap Figure of the lag matrix (ms), each cell annotated with r and coherence."""
+    fig = Figure(figsize=(12, 9), dpi=100)
+    ax = fig.subplots()
+    ms = lags * 1000
+    limit = float(np.max(np.abs(ms))) or 1.0
+    mesh = ax.imshow(ms, cmap="coolwarm", vmin=-limit, vmax=limit)
+    fig.colorbar(mesh, ax=ax, label="Lag of column behind row (ms)")
+    ax.set_xticks(range(len(names)), names, rotation=45, ha="right")
+    ax.set_yticks(range(len(names)), names)
+    for i in range(len(names)):
+        for j in range(len(names)):
+            if i != j:
+                ax.text(j, i, f"{ms[i, j]:.2f} ms\nr {r[i, j]:.2f}\nγ² {coh[i, j]:.2f}",
+                        ha="center", va="center", fontsize=8)
+    ax.set_title("Channel lag matrix")
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,224 @@
+# csv_index.py
+"""
+Sparse row-offset index for reading time windows out of huge CSVs.
+
+One pass over the file in large binary blocks finds the line breaks with
+numpy and keeps the byte offset of every ``STEP``-th data row.  Those rows
+are then parsed together, giving the time (and a coarse sample of every
+channel) at each index point.  The index is saved next to the CSV
+(``<file>.hdaa_index.npz``) and reused while the file is unchanged.
+
+``IndexedCSV`` exposes the file through the ``ooc.ChannelStore`` interface.
+A burn scan finds the burn on the indexed sample rows first and then parses
+only the byte range around it; any row or time window is read by seeking to
+the enclosing index points.  Quoted fields containing line breaks are not
+supported (DAQ logs do not write them).
+"""
+
+import json
+import mmap
+import os
+import numpy as np
+import pandas as pd
+from ooc import ChannelStore
+from utils import guess_columns
+import csv_parser
+import timestamps
+
+INDEX_SUFFIX = ".hdaa_index.npz"
+STEP = 1000  # Data rows between index points
+VERSION = 2  # Bumped when the index layout or row counting changes (older sidecars are rebuilt)
+BLOCK_BYTES = 64 << 20  # Bytes scanned per read while building
+
+
+def _scan_offsets(fh, step, progress=None):
+    """(byte offset of every step-th data row, number of data rows, file size)."""
+    fh.readline()  # Header
+    pos = fh.tell()
+    offsets = [np.array([pos], dtype=np.int64)]
+    row = 0  # Index of the row that starts at the next line break + 1, minus one
+    last = b""
+    while True:
+        block = fh.read(BLOCK_BYTES)
+        if not block:
+            break
+        starts = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10) + (pos + 1)
+        first = (-(row + 1)) % step  # First break in this block that starts a kept row
+        offsets.append(starts[first::step].astype(np.int64))
+        row += len(starts)
+        pos += len(block)
+        last = block[-1:]
+        if progress:
+            progress(pos)
+    offsets = np.concatenate(offsets)
+    offsets = offsets[offsets < pos]  # A trailing line break does not start a row
+    # The last line is a row of its own unless the file ends in a line break
+    return offsets, row if last == b"\n" else row + 1, pos
+
+
+def build_index(csv_path, step=STEP, progress=None):
+    """Scan ``csv_path`` and write its sidecar index; returns the index path."""
+    st = os.stat(csv_path)
+    with open(csv_path, "rb") as fh:
+        offsets, n_rows, size = _scan_offsets(fh, step, progress)
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header = mm[:offsets[0]]
+            # Every indexed row, parsed in one go
+            lines = []
+            for off in offsets:
+                end = mm.find(b"\n", int(off))
+                lines.append(mm[off:size if end < 0 else end + 1])
+        finally:
+            mm.close()
+    if lines and not lines[-1].endswith(b"\n"):
+        lines[-1] += b"\n"
+    samples = csv_parser.parse_bytes(header + b"".join(lines), dtypes={})
+
+    meta = {"version": VERSION, "columns": list(samples.columns), "n_rows": int(n_rows), "step": step,
+            "source": os.path.abspath(csv_path), "source_size": st.st_size, "source_mtime": st.st_mtime}
+    time_col = guess_columns(samples.columns)["time"]
+    if time_col is not None:
+        fmt = timestamps.detect(samples[time_col])
+        if fmt.absolute:
+            samples[time_col], origin = timestamps.to_relative(timestamps.to_epoch_ns(samples[time_col], fmt))
+            meta["time_origin"] = {time_col: origin}  # Epoch ns of t = 0 (the first row)
+            meta["time_format"] = fmt.kind
+    values = np.column_stack([pd.to_numeric(samples[c], errors="coerce").to_numpy(dtype=float)
+                              for c in samples.columns])
+    path = csv_path + INDEX_SUFFIX
+    np.savez(path, offsets=offsets, samples=values, meta=np.array(json.dumps(meta)))
+    return path
+
+
+class _RowView:
+    """Lazy column of an IndexedCSV; slicing parses only the rows it covers."""
+    def __init__(self, store, col):
+        self.store, self.col = store, col
+
+    def __len__(self):
+        return self.store.n_rows
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            i = int(key) + self.store.n_rows if key < 0 else int(key)
+            return self.store.frame(i, i + 1, [self.col])[self.col].iloc[0]
+        start, stop, step = key.indices(self.store.n_rows)
+        values = self.store.frame(start, stop, [self.col])[self.col].to_numpy(dtype=float)
+        return values[::step]
+
+
+class IndexedCSV(ChannelStore):
+    """A CSV read lazily through its sparse row index (see module docstring)."""
+    def __init__(self, csv_path, index_path=None):
+        with np.load(index_path or csv_path + INDEX_SUFFIX, allow_pickle=False) as data:
+            self.meta = json.loads(str(data["meta"]))
+            self.offsets = data["offsets"]
+            self._samples = data["samples"]
+        self.path = self.directory = csv_path
+        self.columns = self.meta["columns"]
+        self.n_rows = self.meta["n_rows"]
+        self.step = self.meta["step"]
+        self.time_col = None  # Set by the loader once columns are inferred
+        self._arrays = {}
+        self._summaries = {}
+        with open(csv_path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._header = self._mm[:int(self.offsets[0])]
+
+    @classmethod
+    def build(cls, csv_path, step=STEP, progress=None):
+        """Open ``csv_path`` through its index, (re)building the index when stale."""
+        path = csv_path + INDEX_SUFFIX
+        st = os.stat(csv_path)
+        if os.path.exists(path):
+            try:
+                store = cls(csv_path, path)
+                m = store.meta
+                if (m.get("version"), m.get("source_size"), m.get("source_mtime"), m.get("step")) \
+                        == (VERSION, st.st_size, st.st_mtime, step):
+                    return store
+            except (OSError, ValueError, KeyError):
+                pass  # Unreadable index: rebuild it
+        return cls(csv_path, build_index(csv_path, step, progress))
+
+    def sample(self, col):
+        """``col`` at every indexed row (rows 0, step, 2*step, ...)."""
+        return self._samples[:, self.columns.index(col)]
+
+    def frame(self, start, stop, cols=None):
+        """Parse rows [start, stop) only, seeking to the enclosing index points."""
+        cols = list(cols or self.columns)
+        start, stop = max(0, start), min(stop, self.n_rows)
+        if stop <= start:
+            return pd.DataFrame({c: np.empty(0) for c in cols}, index=pd.RangeIndex(start, start))
+        k0, k1 = start // self.step, -(-stop // self.step)
+        lo = int(self.offsets[k0])
+        hi = int(self.offsets[k1]) if k1 < len(self.offsets) else len(self._mm)
+        block = csv_parser.parse_bytes(self._header + self._mm[lo:hi], dtypes={}, usecols=cols)
+        block = block.iloc[start - k0 * self.step:stop - k0 * self.step]
+        out = {}
+        origin = self.meta.get("time_origin", {})
+        for c in cols:
+            if c in origin:
+                out[c] = timestamps.to_relative(timestamps.to_epoch_ns(block[c]), origin[c])[0]
+            else:
+                out[c] = pd.to_numeric(block[c], errors="coerce").to_numpy(dtype=float)
+        return pd.DataFrame(out, index=pd.RangeIndex(start, start + len(block)))
+
+    def iter_chunks(self, cols, start=0, stop=None, chunksize=None):
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        chunksize = chunksize or 1_000_000
+        for i in range(start, stop, chunksize):
+            block = self.frame(i, min(i + chunksize, stop), cols)
+            yield i, {c: block[c].to_numpy() for c in cols}
+
+    def array(self, col):
+        if col not in self._arrays:
+            self._arrays[col] = _RowView(self, col)
+        return self._arrays[col]
+
+    def coarse(self, cols, max_points, transform=None):
+        step = max(1, len(self.offsets) // max_points)
+        arrs = {c: self.sample(c)[::step] for c in cols}
+        return sum((transform(arrs) if transform else arrs).values())
+
+    def index_range(self, t0, t1):
+        """Row range covering times [t0, t1]: index lookup plus one parsed block per end."""
+        times = self.sample(self.time_col)
+
+        def locate(t, side):
+            k = max(int(np.searchsorted(times, t, side="right")) - 1, 0)
+            block = self.frame(k * self.step, (k + 1) * self.step, [self.time_col])[self.time_col]
+            return k * self.step + int(np.searchsorted(block.to_numpy(), t, side=side))
+        return locate(t0, "left"), locate(t1, "right")
+
+    def summary(self, cols, start=0, stop=None, n_bins=4000, transform=None):
+        """
+        Overview of the sum of ``cols``: the indexed rows when the range holds at
+        least ``n_bins`` of them (no parsing, calibrated only), else the parsed
+        min/max envelope.
+        """
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        if (stop - start) // self.step >= n_bins:
+            sel = slice(-(-start // self.step), -(-stop // self.step))
+            arrs = {c: self.sample(c)[sel] for c in cols}
+            calibrate = getattr(transform, "calibrate", transform)
+            return self.sample(self.time_col)[sel], sum((calibrate(arrs) if calibrate else arrs).values())
+        return super().summary(cols, start, stop, n_bins, transform)
+
+    def burn_scan(self, thrust_cols, lower, upper, chamber_col=None, start=0, stop=None, transform=None):
+        """
+        Locate the burn on the indexed rows, then run the exact streaming scan
+        over just the rows between the index points around it.
+        """
+        stop = self.n_rows if stop is None else stop
+        # Index samples are not contiguous: calibrate them, but no neighbourhood filtering
+        f = self.coarse(thrust_cols, len(self.offsets), getattr(transform, "calibrate", transform))
+        hits = np.flatnonzero((f >= lower) & (f <= upper))
+        if not len(hits):
+            # Burn shorter than the index spacing: fall back to streaming the file
+            return super().burn_scan(thrust_cols, lower, upper, chamber_col, start, stop, transform)
+        lo = max(start, (int(hits[0]) - 1) * self.step)
+        hi = min(stop, (int(hits[-1]) + 2) * self.step)
+        return super().burn_scan(thrust_cols, lower, upper, chamber_col, lo, hi, transform)
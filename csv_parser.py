@@ -0,0 +1,120 @@
+# csv_parser.py
+"""
+Pluggable CSV parsing for test logs.
+
+``read_csv`` uses the multi-threaded Arrow reader when pyarrow is installed
+and falls back cleanly to the pandas C parser otherwise (or when Arrow
+rejects the file).  Columns whose role can be guessed from the header (time,
+thrust, chamber pressure, tank weights) are pinned to float64 so neither
+parser has to infer their types.
+"""
+
+import io
+import os
+import pandas as pd
+from utils import guess_columns
+import timestamps
+
+try:  # Optional dependency
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+ENGINES = ("auto", "arrow", "pandas-pyarrow", "pandas")
+ARROW_BLOCK_SIZE = 16 << 20  # Bytes per Arrow parse block (one per thread at a time)
+
+
+def available_engines():
+    """Engines usable in this environment, fastest first."""
+    return ["arrow", "pandas-pyarrow", "pandas"] if pa is not None else ["pandas"]
+
+
+def read_header(path):
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _numeric_time(path, col):
+    """True when the first rows of ``col`` are numbers (not ISO / wall-clock text)."""
+    try:
+        sample = pd.read_csv(path, usecols=[col], nrows=timestamps.SAMPLE, dtype=str)[col]
+        return timestamps.detect(sample).kind in ("relative", "epoch")
+    except (OSError, ValueError):
+        return False  # Let the parser infer it; timestamps.normalize reports a bad column
+
+
+def role_dtypes(columns, path=None):
+    """
+    float64 for every column whose role is recognised from the header.  With
+    ``path`` the time column's first rows are sniffed too, so a column named
+    plain "time" that holds ISO text is not pinned.
+    """
+    roles = guess_columns(columns)
+    # A wall-clock time column may hold ISO text; timestamps.normalize converts it after parsing
+    time_col = roles["time"] if roles["time"] and not timestamps.is_absolute_name(roles["time"]) else None
+    if time_col and path is not None and not _numeric_time(path, time_col):
+        time_col = None
+    cols = [time_col, *roles["thrust"], roles["chamber"], roles["fuel"], roles["oxidizer"]]
+    return {c: "float64" for c in cols if c}
+
+
+def _read_arrow(path, dtypes, usecols):
+    read_opts = pa_csv.ReadOptions(use_threads=True, block_size=ARROW_BLOCK_SIZE)
+    convert_opts = pa_csv.ConvertOptions(
+        column_types={c: pa.float64() for c in dtypes},
+        include_columns=usecols,
+    )
+    table = pa_csv.read_csv(path, read_options=read_opts, convert_options=convert_opts)
+    return table.to_pandas(use_threads=True)
+
+
+def _read_pandas(path, dtypes, usecols, engine=None):
+    kwargs = {"dtype": dtypes or None, "usecols": usecols}
+    if engine == "pyarrow":
+        return pd.read_csv(path, engine="pyarrow", **kwargs)
+    return pd.read_csv(path, low_memory=False, **kwargs)
+
+
+def read_csv(path, engine="auto", dtypes=None, usecols=None):
+    """
+    Parse ``path`` into a DataFrame with the chosen engine.
+
+    ``dtypes`` defaults to the role-based float64 pins; pass ``{}`` to let the
+    parser infer everything.  Returns (DataFrame, engine actually used).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown CSV engine '{engine}'")
+    if dtypes is None:
+        dtypes = role_dtypes(read_header(path), path)
+    if usecols is not None:
+        dtypes = {c: t for c, t in dtypes.items() if c in usecols}
+
+    if engine == "auto":
+        engine = available_engines()[0]
+    if engine in ("arrow", "pandas-pyarrow") and pa is None:
+        raise ImportError("pyarrow is required for the Arrow CSV engines")
+
+    try:
+        if engine == "arrow":
+            return _read_arrow(path, dtypes, usecols), engine
+        return _read_pandas(path, dtypes, usecols, "pyarrow" if engine == "pandas-pyarrow" else None), engine
+    except (ValueError, TypeError) as e:  # pyarrow.ArrowInvalid is a ValueError
+        if engine == "pandas" and not dtypes:
+            raise  # Nothing left to fall back to
+        # A pinned column held non-numeric text or Arrow rejected the file:
+        # fall back to the plain pandas path with full type inference.
+        print(f"{engine} parser failed on {os.path.basename(path)} ({e}); using pandas")
+        return _read_pandas(path, None, usecols), "pandas"
+
+
+def parse_bytes(data, dtypes=None, usecols=None):
+    """
+    Parse an in-memory CSV block (header line included), e.g. a byte range cut
+    from a large log.  Arrow when available, else the pandas C parser.
+    """
+    if pa is not None:
+        try:
+            return _read_arrow(pa.BufferReader(data), dtypes or {}, usecols)
+        except (ValueError, TypeError):
+            pass  # Same fallback as read_csv: full pandas type inference
+    return _read_pandas(io.BytesIO(data), None, usecols)
@@ -0,0 +1,216 @@
+# export.py
+"""
+Columnar export of the analysed window: raw channels plus derived ones.
+
+Rows are written chunk by chunk (Parquet row groups, Feather record batches
+or appended CSV blocks) so memory stays constant however long the burn is.
+Derived channels are computed per chunk from the same formulas the quick
+plots use.  Analysis parameters travel as file metadata (Parquet/Feather
+schema metadata, a ``.json`` sidecar for CSV).  Repeating an export with
+unchanged options is served from ``render_cache``.
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+import render_cache
+import calibration
+import formulas
+
+try:  # Optional dependency for Parquet / Feather
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.ipc as pa_ipc
+except ImportError:
+    pa = pq = pa_ipc = None
+
+FORMATS = ("parquet", "feather", "csv")
+COMPRESSIONS = {
+    "parquet": ("zstd", "snappy", "gzip", "none"),
+    "feather": ("zstd", "lz4", "none"),
+    "csv": ("none", "gzip", "bz2", "xz"),
+}
+CHUNK_ROWS = 500_000
+G_FT_S2 = 32.174
+
+# Derived channel name → builder(chunk, ctx, params) returning a float array
+DERIVED = {
+    "Thrust (lbf)": lambda c, ctx, p: c[ctx.thrust_cols].sum(axis=1).to_numpy(dtype=float),
+    "O/F Ratio": lambda c, ctx, p: (c[ctx.oxidizer_col] / (c[ctx.fuel_col] + 1e-6)).to_numpy(dtype=float),
+    "ISP (s)": lambda c, ctx, p: c[ctx.thrust_cols].sum(axis=1).to_numpy(dtype=float) / _mdot_lbs(p),
+    "Ve (m/s)": lambda c, ctx, p: c[ctx.thrust_cols].sum(axis=1).to_numpy(dtype=float) / _mdot_lbs(p) * 9.80665,
+    "c* (m/s)": lambda c, ctx, p: (c[ctx.chamber_col].to_numpy(dtype=float) * 144 * p["throat_area"]
+                                   / (_mdot_lbs(p) / G_FT_S2) * 0.3048),
+}
+
+
+def _mdot_lbs(params):
+    return params["fuel_mdot"] + params["oxidizer_mdot"]
+
+
+def available_derived(ctx):
+    """Derived channels that can be computed with the current columns and parameters."""
+    p = ctx.params
+    has_mdot = "fuel_mdot" in p and "oxidizer_mdot" in p
+    names = []
+    if ctx.thrust_cols:
+        names.append("Thrust (lbf)")
+    if ctx.fuel_col and ctx.oxidizer_col:
+        names.append("O/F Ratio")
+    if ctx.thrust_cols and has_mdot:
+        names += ["ISP (s)", "Ve (m/s)"]
+    if ctx.chamber_col and has_mdot and "throat_area" in p:
+        names.append("c* (m/s)")
+    for label, name in formulas.channels(ctx).items():
+        try:
+            formulas.required_columns(ctx, name)
+        except ValueError:
+            continue  # Formula channel that cannot be evaluated on this data
+        names.append(label)
+    return names
+
+
+def _smooth(values, window, carry, n_out):
+    """
+    Centred moving average (aligned like ``render_cache.smoothed``) of the
+    first ``n_out`` samples, ignoring NaNs.  ``values`` runs half a window
+    past them; ``carry`` holds the samples before, returned for the next chunk.
+    """
+    lead = (window - 1) // 2
+    lag = window - 1 - lead
+    joined = np.concatenate([carry, values])
+    finite = np.isfinite(joined)
+    csum = np.concatenate([[0.0], np.cumsum(np.where(finite, joined, 0.0))])
+    count = np.concatenate([[0], np.cumsum(finite)])
+    pos = len(carry) + np.arange(n_out)
+    lo = np.maximum(pos - lag, 0)
+    hi = np.minimum(pos + lead + 1, len(joined))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (csum[hi] - csum[lo]) / (count[hi] - count[lo])  # NaN where the window holds no samples
+    end = len(carry) + n_out
+    return out, joined[max(end - lag, 0):end]
+
+
+class _Writer:
+    """Format-specific sink accepting DataFrame chunks."""
+    def __init__(self, path, fmt, compression, metadata):
+        self.path, self.fmt, self.metadata = path, fmt, metadata
+        self.compression = None if compression == "none" else compression
+        self._sink = None
+        self._header = True
+        if fmt in ("parquet", "feather") and pa is None:
+            raise ImportError("pyarrow is required for Parquet and Feather export")
+        if fmt == "csv":
+            # Each chunk becomes its own compressed member; gzip/bz2/xz readers concatenate them
+            self._sink = open(path, "wb")
+
+    def write(self, frame):
+        if self.fmt == "csv":
+            frame.to_csv(self._sink, index=False, header=self._header,
+                         compression=self.compression or None, mode="ab")
+            self._header = False
+            return
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._sink is None:
+            # The first chunk fixes the schema; the analysis metadata rides along with it
+            self._schema = table.schema.with_metadata({b"hdaa": json.dumps(self.metadata).encode()})
+            if self.fmt == "parquet":
+                self._sink = pq.ParquetWriter(self.path, self._schema, compression=self.compression or "none")
+            else:
+                opts = pa_ipc.IpcWriteOptions(compression=self.compression)
+                self._sink = pa_ipc.new_file(self.path, self._schema, options=opts)
+        self._sink.write_table(table.cast(self._schema))
+
+    def close(self):
+        if self._sink is not None:
+            self._sink.close()
+        if self.fmt == "csv":
+            with open(self.path + ".json", "w") as fh:
+                json.dump(self.metadata, fh, indent=2)
+
+
+def export_window(ctx, path, fmt="parquet", raw_cols=(), derived=(), start=0, stop=None,
+                  downsample=1, smoothing=1, compression=None, metadata=None, chunk_rows=CHUNK_ROWS):
+    """
+    Stream rows [start, stop) of the analysed data to ``path``.
+
+    ``raw_cols`` are copied as-is; ``derived`` names come from ``DERIVED`` or
+    the formula channels (see ``available_derived``).  ``smoothing`` > 1 adds a "<name> smoothed"
+    column per derived channel.  Works from ``ctx.store`` in out-of-core mode
+    so the full window never needs to be resident.  Returns rows written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    compression = compression or COMPRESSIONS[fmt][0]
+    raw_cols = [c for c in raw_cols if c != ctx.time_col]
+    needed = set(raw_cols)
+    for name in derived:
+        needed.update(ctx.thrust_cols if name in ("Thrust (lbf)", "ISP (s)", "Ve (m/s)") else [])
+        if name == "O/F Ratio":
+            needed.update([ctx.fuel_col, ctx.oxidizer_col])
+        if name == "c* (m/s)":
+            needed.add(ctx.chamber_col)
+        if name not in DERIVED:
+            needed.update(formulas.required_columns(ctx, formulas.channels(ctx)[name]))
+    needed = [ctx.time_col] + sorted(needed)
+
+    if ctx.store is not None:
+        # Out-of-core: positions are relative to the resident window in ctx.df
+        base = int(ctx.df.index[0])
+        read = lambda i, j: calibration.calibrate_frame(ctx, ctx.store.frame(i, j, needed))
+        start += base
+        stop = ctx.store.n_rows if stop is None else stop + base
+    else:
+        stop = len(ctx.df) if stop is None else stop
+        read = lambda i, j: ctx.df.iloc[i:j][needed]
+
+    meta = dict(metadata or {})
+    meta.update(start_row=start, stop_row=stop, downsample=downsample, smoothing=smoothing,
+                raw_channels=raw_cols, derived_channels=list(derived))
+
+    # An identical earlier export (same data, window, options and metadata) is copied byte for byte
+    key = render_cache.export_key(ctx, fmt, raw_cols, list(derived), start, stop, downsample,
+                                  smoothing, compression, ctx.params, meta)
+    cached = render_cache.cache.get(key)
+    if cached is not None:
+        data, written = cached
+        with open(path, "wb") as fh:
+            fh.write(data)
+        if fmt == "csv":
+            with open(path + ".json", "w") as fh:
+                json.dump(meta, fh, indent=2)
+        return written
+
+    writer = _Writer(path, fmt, compression, meta)
+    carries = {name: np.empty(0) for name in derived}
+    step = max(downsample, (chunk_rows // downsample) * downsample)  # Keep the decimation phase across chunks
+    # Rows read past each chunk so the centred smoothing window is complete at its end
+    halo = (smoothing - 1) // 2 * downsample if smoothing > 1 and derived else 0
+    written = 0
+    try:
+        for i in range(start, stop, step):
+            j = min(i + step, stop)
+            ahead = read(i, min(j + halo, stop)).iloc[::downsample]
+            n = -(-(j - i) // downsample)
+            chunk = ahead.iloc[:n]
+            out = {ctx.time_col: chunk[ctx.time_col].to_numpy(dtype=float)}
+            for c in raw_cols:
+                out[c] = chunk[c].to_numpy()
+            for name in derived:
+                if name in DERIVED:
+                    values = DERIVED[name](ahead, ctx, ctx.params)
+                else:  # Formula channel, evaluated on the same chunk
+                    values = formulas.evaluate_frame(ctx, formulas.channels(ctx)[name], ahead)
+                out[name] = values[:n]
+                if smoothing > 1:
+                    out[f"{name} smoothed"], carries[name] = _smooth(values, smoothing, carries[name], n)
+            frame = pd.DataFrame(out)
+            writer.write(frame)
+            written += len(frame)
+    finally:
+        writer.close()
+    if os.path.getsize(path) <= render_cache.cache.max_item_bytes:
+        with open(path, "rb") as fh:
+            render_cache.cache.put(key, (fh.read(), written))
+    return written
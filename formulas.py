@@ -0,0 +1,230 @@
+# formulas.py
+"""
+User-defined formula channels, e.g. ``F / (Pc * At)`` for the thrust coefficient.
+
+An expression is parsed and checked once against a whitelist of AST nodes
+(arithmetic, comparisons, numbers, names and a few NumPy functions), then
+compiled to a code object that is evaluated with NumPy arrays bound to its
+names.  Evaluation runs over ``CHUNK_ROWS`` rows at a time, so temporaries
+stay bounded however long the window is, and the result is cached in
+``render_cache`` by expression, constants and rows.
+
+Names available in an expression:
+    t, F, Pc, OF, fuel, ox    time, total thrust, chamber pressure, O/F and the
+                              tank channels (the roles chosen at load time)
+    [Any Column (unit)]       any loaded column, written in square brackets
+    mdot, fuel_mdot, oxidizer_mdot, throat_area, g0
+                              the test parameters entered in the ISP / c* plots
+    user constants            defined next to the formulas (e.g. At = 0.785)
+    other formula channels    by name
+
+Definitions live in ``ctx.params["formulas"]`` ({name: {"expression",
+"unit"}}) and ``ctx.params["formula_constants"]`` so they travel with the
+exported metadata.
+"""
+
+import ast
+import hashlib
+import re
+import numpy as np
+import render_cache
+
+CHUNK_ROWS = 1 << 20  # Rows evaluated per pass
+G0_FT_S2 = 32.174
+FUNCTIONS = {
+    "sqrt": np.sqrt, "abs": np.abs, "exp": np.exp, "log": np.log, "log10": np.log10,
+    "sin": np.sin, "cos": np.cos, "tan": np.tan, "arctan2": np.arctan2,
+    "minimum": np.minimum, "maximum": np.maximum, "where": np.where, "clip": np.clip,
+}
+CHANNELS = ("t", "F", "Pc", "OF", "fuel", "ox")
+PARAMETERS = ("mdot", "fuel_mdot", "oxidizer_mdot", "throat_area", "g0")
+_ALLOWED = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.USub, ast.UAdd,
+    ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq,
+)
+_COLUMN = re.compile(r"\[([^\[\]]+)\]")
+_compiled = {}  # Expression text -> Formula
+
+
+class Formula:
+    """A validated, compiled expression and the names it reads."""
+    def __init__(self, expression):
+        self.expression = expression
+        self.columns = []  # Bracketed column names, bound as _c0, _c1, ...
+
+        def bind(m):
+            name = m.group(1).strip()
+            if name not in self.columns:
+                self.columns.append(name)
+            return f"_c{self.columns.index(name)}"
+
+        try:
+            tree = ast.parse(_COLUMN.sub(bind, expression).strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid formula: {e.msg}") from None
+        calls = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED):
+                raise ValueError(f"Not allowed in a formula: {type(node).__name__}")
+            if isinstance(node, ast.Constant):
+                if not isinstance(node.value, (int, float)):
+                    raise ValueError(f"Only numbers are allowed as constants, not {node.value!r}")
+                node.value = float(node.value)  # No unbounded integer arithmetic (9**9**9)
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                    raise ValueError(f"Unknown function in '{ast.unparse(node)}' "
+                                     f"(available: {', '.join(FUNCTIONS)})")
+                calls.add(id(node.func))
+        self.names = sorted({n.id for n in ast.walk(tree) if isinstance(n, ast.Name)
+                             and id(n) not in calls and not re.fullmatch(r"_c\d+", n.id)})
+        self.key = ast.dump(tree) + repr(self.columns)  # Normalised: whitespace does not matter
+        self.code = compile(tree, "<formula>", "eval")
+
+
+def compile_formula(expression):
+    """Formula for ``expression``, parsed and validated once per distinct text."""
+    if expression not in _compiled:
+        _compiled[expression] = Formula(expression)
+    return _compiled[expression]
+
+
+def definitions(ctx):
+    return ctx.params.get("formulas", {})
+
+
+def label(name, unit):
+    return f"{name} ({unit})" if unit else name
+
+
+def channels(ctx):
+    """{display label: formula name} for every defined formula channel."""
+    return {label(n, d.get("unit")): n for n, d in definitions(ctx).items()}
+
+
+def constants(ctx):
+    """Scalar names: test parameters that are set plus the user constants."""
+    p = ctx.params
+    env = {"g0": G0_FT_S2}
+    for k in ("fuel_mdot", "oxidizer_mdot", "throat_area"):
+        if k in p:
+            env[k] = float(p[k])
+    if "fuel_mdot" in p and "oxidizer_mdot" in p:
+        env["mdot"] = float(p["fuel_mdot"] + p["oxidizer_mdot"])
+    env.update({k: float(v) for k, v in p.get("formula_constants", {}).items()})
+    return env
+
+
+def _channel_columns(ctx, name):
+    """Columns behind a channel alias (None when the role is not assigned)."""
+    cols = {"t": [ctx.time_col], "F": list(ctx.thrust_cols), "Pc": [ctx.chamber_col],
+            "OF": [ctx.fuel_col, ctx.oxidizer_col], "fuel": [ctx.fuel_col], "ox": [ctx.oxidizer_col]}[name]
+    return cols if cols and all(cols) else None
+
+
+def required_columns(ctx, name, stack=()):
+    """
+    Every loaded column formula channel ``name`` reads, checking that all its
+    names resolve (ValueError otherwise, including circular references).
+    """
+    if name in stack:
+        raise ValueError(f"Circular formula reference: {' -> '.join(stack + (name,))}")
+    defs = definitions(ctx)
+    if name not in defs:
+        raise ValueError(f"Unknown formula channel '{name}'")
+    f = compile_formula(defs[name]["expression"])
+    env = constants(ctx)
+    needed = []
+    for c in f.columns:
+        if c not in ctx.df.columns:
+            raise ValueError(f"Column '{c}' is not loaded")
+        needed.append(c)
+    for n in f.names:
+        if n in CHANNELS:
+            cols = _channel_columns(ctx, n)
+            if cols is None:
+                raise ValueError(f"'{n}' needs a channel role that is not assigned")
+            needed += cols
+        elif n in defs:
+            needed += required_columns(ctx, n, stack + (name,))
+        elif n not in env:
+            raise ValueError(f"Unknown name '{n}' in formula '{name}'"
+                             + (" (enter mdot / throat area in the ISP or c* plot first)"
+                                if n in PARAMETERS else ""))
+    return list(dict.fromkeys(needed))
+
+
+def _column(frame, col):
+    return frame[col].to_numpy(dtype=float)
+
+
+def _bind(ctx, frame, name, env, stack):
+    """Array (or scalar) bound to one name of an expression for this chunk."""
+    if name in env:
+        return env[name]
+    if name == "t":
+        return _column(frame, ctx.time_col)
+    if name == "F":
+        total = _column(frame, ctx.thrust_cols[0]).copy()
+        for c in ctx.thrust_cols[1:]:
+            total += _column(frame, c)
+        return total
+    if name == "Pc":
+        return _column(frame, ctx.chamber_col)
+    if name == "OF":
+        return _column(frame, ctx.oxidizer_col) / (_column(frame, ctx.fuel_col) + 1e-6)  # As plot_of_ratio
+    if name == "fuel":
+        return _column(frame, ctx.fuel_col)
+    if name == "ox":
+        return _column(frame, ctx.oxidizer_col)
+    return _evaluate_chunk(ctx, frame, name, env, stack)  # Another formula channel
+
+
+def _evaluate_chunk(ctx, frame, name, env, stack=()):
+    f = compile_formula(definitions(ctx)[name]["expression"])
+    scope = {f"_c{i}": _column(frame, c) for i, c in enumerate(f.columns)}
+    scope.update((n, _bind(ctx, frame, n, env, stack + (name,))) for n in f.names)
+    scope.update(FUNCTIONS)
+    try:
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):  # x/0 → inf / NaN, as NumPy does
+            values = eval(f.code, {"__builtins__": {}}, scope)
+    except (OverflowError, ZeroDivisionError) as e:  # Scalar-only sub-expressions use Python floats
+        raise ValueError(f"Formula '{name}': {e}") from None
+    return np.broadcast_to(np.asarray(values, dtype=float), (len(frame),))
+
+
+def evaluate_frame(ctx, name, frame):
+    """Formula channel ``name`` on a DataFrame chunk holding its required columns."""
+    return np.array(_evaluate_chunk(ctx, frame, name, constants(ctx)), dtype=float)
+
+
+def evaluate(ctx, name, rows=None):
+    """
+    Formula channel ``name`` on positional ``rows`` of ctx.df (all rows when
+    None), evaluated ``CHUNK_ROWS`` at a time and cached by expression,
+    constants and rows.
+    """
+    needed = required_columns(ctx, name)
+    n = len(ctx.df) if rows is None else len(rows)
+    env = constants(ctx)
+    exprs = tuple((k, compile_formula(d["expression"]).key) for k, d in sorted(definitions(ctx).items()))
+    span = n if rows is None else hashlib.sha1(np.ascontiguousarray(rows, dtype=np.int64).tobytes()).hexdigest()
+    key = (render_cache.dataset_key(ctx), "formula", name, exprs, tuple(sorted(env.items())), span)
+
+    def build():
+        cols = [ctx.df.columns.get_loc(c) for c in needed]
+        out = np.empty(n)
+        for i in range(0, n, CHUNK_ROWS):
+            sel = slice(i, i + CHUNK_ROWS) if rows is None else rows[i:i + CHUNK_ROWS]
+            frame = ctx.df.iloc[sel, cols]  # Only this chunk of the needed columns
+            out[i:i + len(frame)] = _evaluate_chunk(ctx, frame, name, env)
+        return out
+    return render_cache.cache.get_or_build(key, build)
+
+
+def check_name(name):
+    """ValueError unless ``name`` can name a formula channel or constant."""
+    if not name.isidentifier():
+        raise ValueError("Formula names must be identifiers (letters, digits, _), e.g. Cf")
+    if name in FUNCTIONS or name in CHANNELS or name in PARAMETERS:
+        raise ValueError(f"'{name}' is already a built-in name")
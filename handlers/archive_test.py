@@ -0,0 +1,81 @@
+
+# handlers/archive_test.py
+import os
+import tkinter as tk
+from tkinter import filedialog, messagebox
+import archive
+
+
+def _raw_frame(ctx):
+    """ctx.df with calibrated columns put back to their raw values."""
+    df = ctx.df.copy()
+    for c, raw in ctx.raw_columns.items():
+        if c in df.columns and len(raw) == len(df):
+            df[c] = raw
+    return df
+
+
+def run(app):
+    ctx = app.ctx
+    if ctx.df is None or ctx.time_col is None:
+        messagebox.showerror("Error", "Load data first.")
+        return
+    if isinstance(ctx.store, archive.ArchiveStore):
+        messagebox.showinfo("Archive Test", "This test was opened from an archive already.")
+        return
+    sources = ctx.source_paths
+    if len(sources) == 1 and os.path.exists(sources[0]):
+        source = sources[0]  # Archive the raw log itself, streamed chunk by chunk
+    elif ctx.store is None:
+        source = None  # Merged DAQ files only exist in memory: archive what is loaded
+    else:
+        messagebox.showerror("Error", "The source CSV of this test is no longer available.")
+        return
+
+    win = tk.Toplevel(app)
+    win.title("Archive Test")
+    win.geometry("420x160")
+    tk.Label(win, text="Compression (lzma is smallest, zlib fastest):").pack(anchor="w", padx=8, pady=6)
+    codec_var = tk.StringVar(value="zlib")
+    tk.OptionMenu(win, codec_var, *archive.CODECS).pack(fill=tk.X, padx=8)
+    result = {}
+
+    def confirm():
+        result["codec"] = codec_var.get()
+        win.destroy()
+
+    tk.Button(win, text="Save Archive…", command=confirm).pack(pady=10)
+    win.transient(app)
+    win.grab_set()
+    app.wait_window(win)
+    if not result:
+        return
+
+    stem = os.path.splitext(os.path.basename(source or "merged"))[0]
+    path = filedialog.asksaveasfilename(defaultextension=archive.ARCHIVE_SUFFIX, initialfile=stem,
+                                        filetypes=[("HDAA archives", "*" + archive.ARCHIVE_SUFFIX)],
+                                        title="Save Archive As")
+    if not path:
+        return
+    metadata = {"params": ctx.params, "target_thrust": getattr(ctx, "last_target_thrust", None),
+                "calibration": ctx.calibration.name if ctx.calibration is not None else None,
+                "despike": ctx.despike}
+
+    def progress(rows):
+        app.file_label.config(text=f"Archiving: {rows:,} rows", fg="black")
+        app.update_idletasks()
+
+    label = app.file_label.cget("text")
+    try:
+        if source is not None:
+            archive.from_csv(source, path, result["codec"], metadata=metadata, progress=progress)
+        else:
+            archive.write_frame(_raw_frame(ctx), path, ctx.time_col, result["codec"],
+                                metadata=metadata, time_origin=ctx.time_origin)
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to archive: {e}")
+        return
+    finally:
+        app.file_label.config(text=label, fg="black")
+    ratio = f" ({os.path.getsize(source) / os.path.getsize(path):.1f}x smaller than the CSV)" if source else ""
+    messagebox.showinfo("Archive Test", f"Saved {os.path.basename(path)}{ratio}.")
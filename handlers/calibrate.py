@@ -0,0 +1,141 @@
+
+# handlers/calibrate.py
+import tkinter as tk
+from tkinter import ttk, messagebox, simpledialog
+import calibration
+
+
+def _default_channels(ctx):
+    """Channels offered when a stand has no set yet: thrust cells plus the role columns."""
+    cols = list(ctx.thrust_cols)
+    cols += [c for c in (ctx.chamber_col, ctx.fuel_col, ctx.oxidizer_col) if c]
+    return cols
+
+
+def run(app):
+    ctx = app.ctx
+    if ctx.df is None:
+        messagebox.showerror("Error", "Load data first.")
+        return
+    small_font = ("Arial", 12)
+
+    win = tk.Toplevel(app)
+    win.title("Load Cell Calibration")
+    win.geometry("1000x600")
+
+    # Stand picker: saved sets live in ~/.hdaa/calibrations
+    top = tk.Frame(win)
+    top.pack(fill=tk.X, padx=6, pady=6)
+    tk.Label(top, text="Test stand:", font=small_font).pack(side=tk.LEFT)
+    current = ctx.calibration or calibration.CalibrationSet()
+    stand_var = tk.StringVar(value=current.name)
+    stand_box = ttk.Combobox(top, textvariable=stand_var, values=calibration.list_stands(), width=24)
+    stand_box.pack(side=tk.LEFT, padx=4)
+    tk.Label(top, text="Tare window (s):", font=small_font).pack(side=tk.LEFT, padx=(20, 2))
+    tare_var = tk.StringVar(value=str(current.tare_seconds))
+    tk.Entry(top, textvariable=tare_var, width=6).pack(side=tk.LEFT)
+
+    tk.Label(win, text="Linear: value = scale · raw + offset.  Polynomial coefficients (c0, c1, c2, …) "
+                       "override scale/offset when given.", font=small_font).pack(anchor="w", padx=6)
+
+    table = tk.Frame(win)
+    table.pack(fill=tk.BOTH, expand=True, padx=6)
+    for j, head in enumerate(("Channel", "Scale", "Offset", "Polynomial", "Tare")):
+        tk.Label(table, text=head, font=("Arial", 12, "bold")).grid(row=0, column=j, sticky="w", padx=4)
+    rows = {}  # col -> (scale, offset, poly, tare) variables
+
+    def add_row(col, spec=None):
+        if col in rows or col not in ctx.df.columns:
+            return
+        spec = spec or {}
+        r = len(rows) + 1
+        tk.Label(table, text=col, anchor="w", width=40, font=small_font).grid(row=r, column=0, sticky="w")
+        vars_ = (tk.StringVar(value=str(spec.get("scale", 1.0))),
+                 tk.StringVar(value=str(spec.get("offset", 0.0))),
+                 tk.StringVar(value=", ".join(str(c) for c in spec.get("poly") or [])),
+                 tk.BooleanVar(value=spec.get("tare", True)))
+        tk.Entry(table, textvariable=vars_[0], width=10).grid(row=r, column=1, padx=4)
+        tk.Entry(table, textvariable=vars_[1], width=10).grid(row=r, column=2, padx=4)
+        tk.Entry(table, textvariable=vars_[2], width=24).grid(row=r, column=3, padx=4)
+        tk.Checkbutton(table, variable=vars_[3]).grid(row=r, column=4)
+        rows[col] = vars_
+
+    def fill(cal_set):
+        for child in table.grid_slaves():
+            if int(child.grid_info()["row"]) > 0:
+                child.destroy()
+        rows.clear()
+        for col, spec in cal_set.channels.items():
+            add_row(col, spec)
+        for col in _default_channels(ctx):
+            add_row(col)
+        tare_var.set(str(cal_set.tare_seconds))
+
+    def load_stand(_event=None):
+        try:
+            fill(calibration.resolve(stand_var.get()))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not load stand: {e}", parent=win)
+
+    stand_box.bind("<<ComboboxSelected>>", load_stand)
+
+    # Extra channels (any numeric column) can be added to the set
+    extra = tk.Frame(win)
+    extra.pack(fill=tk.X, padx=6, pady=4)
+    extra_var = tk.StringVar()
+    ttk.Combobox(extra, textvariable=extra_var, width=40, state="readonly",
+                 values=[c for c in ctx.df.columns if c != ctx.time_col]).pack(side=tk.LEFT)
+    tk.Button(extra, text="Add Channel", command=lambda: add_row(extra_var.get())).pack(side=tk.LEFT, padx=4)
+
+    def collect():
+        cal_set = calibration.CalibrationSet(stand_var.get().strip() or "default",
+                                             tare_seconds=float(tare_var.get()))
+        for col, (scale, offset, poly, tare) in rows.items():
+            coeffs = [float(c) for c in poly.get().replace(",", " ").split()]
+            cal_set.set_channel(col, float(scale.get()), float(offset.get()), coeffs or None, tare.get())
+        return cal_set
+
+    def save():
+        try:
+            cal_set = collect()
+        except ValueError:
+            messagebox.showerror("Error", "Scales, offsets and coefficients must be numbers.", parent=win)
+            return
+        if not stand_var.get().strip():
+            name = simpledialog.askstring("Save", "Test stand name:", parent=win)
+            if not name:
+                return
+            cal_set.name = name
+        path = cal_set.save()
+        stand_box.config(values=calibration.list_stands())
+        messagebox.showinfo("Saved", f"Calibration saved to {path}", parent=win)
+
+    def apply():
+        try:
+            cal_set = collect()
+        except ValueError:
+            messagebox.showerror("Error", "Scales, offsets and coefficients must be numbers.", parent=win)
+            return
+        report = calibration.apply(ctx, cal_set)  # Stays active for the next loads too
+        app._recalc_metrics()
+        window = report["tare_window"]
+        where = f"{window[0]:.3f}–{window[1]:.3f} s" if window else "no pre-ignition window found"
+        lines = [f"{c}: tare {v['tare']:.4g}" for c, v in report["channels"].items()]
+        messagebox.showinfo("Calibration", f"Tare window: {where}\n" + "\n".join(lines), parent=win)
+        win.destroy()
+
+    def clear():
+        calibration.reset(ctx)
+        app._recalc_metrics()
+        win.destroy()
+
+    buttons = tk.Frame(win)
+    buttons.pack(pady=10)
+    tk.Button(buttons, text="Save Stand", command=save, font=small_font).pack(side=tk.LEFT, padx=6)
+    tk.Button(buttons, text="Apply", command=apply, font=small_font).pack(side=tk.LEFT, padx=6)
+    tk.Button(buttons, text="Remove Calibration", command=clear, font=small_font).pack(side=tk.LEFT, padx=6)
+
+    fill(current)
+    win.transient(app)
+    win.grab_set()
+    app.wait_window(win)
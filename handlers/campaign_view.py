@@ -0,0 +1,109 @@
+
+# handlers/campaign_view.py
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import campaign_db
+
+TABLE_COLS = ["test_date", "file_name", "target_thrust", *campaign_db.METRICS]
+
+
+def run(app):
+    try:
+        con = campaign_db.connect()
+    except Exception as e:
+        messagebox.showerror("Error", f"Cannot open campaign index: {e}")
+        return
+
+    win = tk.Toplevel(app)
+    win.title("Campaign Trends")
+    win.geometry("1400x950")
+    win.protocol("WM_DELETE_WINDOW", lambda: (con.close(), win.destroy()))
+
+    # Filters
+    bar = tk.Frame(win)
+    bar.pack(side=tk.TOP, fill=tk.X, pady=6)
+    tk.Label(bar, text="From (YYYY-MM-DD):").pack(side=tk.LEFT, padx=4)
+    since_var = tk.StringVar()
+    tk.Entry(bar, textvariable=since_var, width=12).pack(side=tk.LEFT)
+    tk.Label(bar, text="To:").pack(side=tk.LEFT, padx=4)
+    until_var = tk.StringVar()
+    tk.Entry(bar, textvariable=until_var, width=12).pack(side=tk.LEFT)
+    tk.Label(bar, text="Name contains:").pack(side=tk.LEFT, padx=4)
+    name_var = tk.StringVar()
+    tk.Entry(bar, textvariable=name_var, width=16).pack(side=tk.LEFT)
+    tk.Label(bar, text="Metric:").pack(side=tk.LEFT, padx=4)
+    labels = {v: k for k, v in campaign_db.METRICS.items()}
+    metric_var = tk.StringVar(value=campaign_db.METRICS["total_impulse"])
+    tk.OptionMenu(bar, metric_var, *labels).pack(side=tk.LEFT)
+
+    # Trend plot
+    fig, ax = plt.subplots(figsize=(12, 4.5), dpi=100)
+    canvas = FigureCanvasTkAgg(fig, master=win)
+    canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+    NavigationToolbar2Tk(canvas, win).update()
+
+    # Results table
+    table_frame = tk.Frame(win)
+    table_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+    tree = ttk.Treeview(table_frame, columns=TABLE_COLS, show="headings", height=12)
+    for c in TABLE_COLS:
+        tree.heading(c, text=campaign_db.METRICS.get(c, c.replace("_", " ").title()))
+        tree.column(c, width=140 if c != "file_name" else 240, anchor="w")
+    scroll = tk.Scrollbar(table_frame, command=tree.yview)
+    tree.config(yscrollcommand=scroll.set)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    scroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+    state = {"df": pd.DataFrame()}
+
+    def refresh(*_):
+        df = campaign_db.query_tests(con, since_var.get().strip() or None,
+                                     until_var.get().strip() or None,
+                                     name_var.get().strip() or None)
+        state["df"] = df
+        tree.delete(*tree.get_children())
+        for _, row in df.iterrows():
+            tree.insert("", tk.END, values=[_fmt(row[c]) for c in TABLE_COLS])
+
+        metric = labels[metric_var.get()]
+        ax.clear()
+        sub = df.dropna(subset=[metric])
+        if len(sub):
+            dates = pd.to_datetime(sub["test_date"], errors="coerce")
+            ax.plot(dates, sub[metric], "o-", color="blue")
+            for d, v, n in zip(dates, sub[metric], sub["file_name"]):
+                ax.annotate(n, (d, v), textcoords="offset points", xytext=(3, 3), fontsize=7, alpha=0.7)
+        ax.set_xlabel("Test date")
+        ax.set_ylabel(metric_var.get())
+        ax.set_title(f"{metric_var.get()} across {len(sub)} tests")
+        ax.grid(True)
+        fig.autofmt_xdate()
+        fig.tight_layout()
+        canvas.draw()
+
+    def record_current():
+        campaign_db.record_context(app, con)
+        refresh()
+
+    def export_table():
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")],
+                                            title="Export Campaign Table")
+        if path:
+            state["df"].to_csv(path, index=False)
+
+    buttons = tk.Frame(win)
+    buttons.pack(side=tk.BOTTOM, pady=6)
+    tk.Button(buttons, text="Query", command=refresh).pack(side=tk.LEFT, padx=4)
+    tk.Button(buttons, text="Record Current Test", command=record_current).pack(side=tk.LEFT, padx=4)
+    tk.Button(buttons, text="Export Table", command=export_table).pack(side=tk.LEFT, padx=4)
+    metric_var.trace_add("write", refresh)
+    refresh()
+
+
+def _fmt(v):
+    if isinstance(v, float):
+        return "" if pd.isna(v) else f"{v:.4g}"
+    return "" if v is None else v
@@ -13,18 +13,18 @@ from matplotlib.backends.backend_tkagg import (
     FigureCanvasTkAgg,
     NavigationToolbar2Tk,
 )
-from utils import apply_extra_data
+import numpy as np
+from utils import apply_extra_data, extract_unit, quick_stats
+from channel_browser import ChannelBrowser
+import plot_links
+import formulas
 
-
-# ---------- small helpers ----------
-def _extract_unit(name: str):
-    if "(" in name and ")" in name:
-        return name[name.find("(") + 1 : name.find(")")]
-    return None
+DEFAULT_SMOOTHING = 10  # Rolling-mean window (samples) offered per series
 
 
+# ---------- small helpers ----------
 def _pick_columns(app):
-    """Modal checkbox picker → list[str]"""
+    """Modal searchable channel picker → list[str]"""
     ctx = app.ctx
     chosen = []
 
@@ -34,21 +34,22 @@ def _pick_columns(app):
 
     tk.Label(win, text="Pick columns to plot:").pack(anchor="w", pady=6)
 
-    vars_ = {c: tk.BooleanVar() for c in ctx.df.columns}
+    names = list(ctx.df.columns)
     # generated
     if ctx.thrust_cols:
-        vars_["Thrust (lbf)"] = tk.BooleanVar()
+        names.append("Thrust (lbf)")
     if ctx.chamber_col:
-        vars_["Chamber Pressure (psi)"] = tk.BooleanVar()
+        names.append("Chamber Pressure (psi)")
     if ctx.of_ratio is not None:
-        vars_["O/F Ratio"] = tk.BooleanVar()
+        names.append("O/F Ratio")
+    names += [c for c in formulas.channels(ctx) if c not in names]  # User formula channels
 
-    for c, var in vars_.items():
-        tk.Checkbutton(win, text=c, variable=var).pack(anchor="w")
+    browser = ChannelBrowser(win, names, stats_fn=lambda c: quick_stats(ctx, c), height=30)
+    browser.pack(fill=tk.BOTH, expand=True, padx=6)
 
     def done():
         nonlocal chosen
-        chosen = [c for c, v in vars_.items() if v.get()]
+        chosen = browser.selected()
         win.destroy()
 
     tk.Button(win, text="Confirm", command=done).pack(pady=10)
@@ -59,26 +60,36 @@ def _pick_columns(app):
 
 
 def _pick_display_opts(app, cols):
-    """Modal option-menu picker → {col: ("Raw"|"Smoothed"|"Both")}"""
+    """Modal option-menu picker → {col: ("Raw"|"Smoothed"|"Both", smoothing window)}"""
     opts = {c: tk.StringVar(value="Raw") for c in cols}
+    windows = {c: tk.StringVar(value=str(DEFAULT_SMOOTHING)) for c in cols}
 
     win = tk.Toplevel(app)
     win.title("Display Options")
-    win.geometry("400x600")
+    win.geometry("520x600")
 
-    tk.Label(win, text="Choose display type for each column").pack(anchor="w", pady=6)
+    tk.Label(win, text="Choose display type and smoothing window (samples) for each column").pack(anchor="w", pady=6)
 
     for c in cols:
         f = tk.Frame(win)
         f.pack(anchor="w", padx=6, pady=2)
         tk.Label(f, text=c, width=28, anchor="w").pack(side=tk.LEFT)
         tk.OptionMenu(f, opts[c], "Raw", "Smoothed", "Both").pack(side=tk.LEFT)
+        tk.Entry(f, textvariable=windows[c], width=6).pack(side=tk.LEFT, padx=4)
 
     tk.Button(win, text="Confirm", command=win.destroy).pack(pady=8)
     win.transient(app)
     win.grab_set()
     app.wait_window(win)
-    return {c: v.get() for c, v in opts.items()}
+
+    result = {}
+    for c in cols:
+        try:
+            window = max(1, int(windows[c].get()))
+        except ValueError:
+            window = DEFAULT_SMOOTHING  # fall back on invalid input
+        result[c] = (opts[c].get(), window)
+    return result
 
 
 def _prompt_constant_lines(app, unit_groups):
@@ -199,43 +210,38 @@ def _run_inner(app):
     disp_opts = _pick_display_opts(app, cols)
 
     # ------------ prep data ------------
+    # Resolve the window + downsampling to row positions once; every series
+    # below is sliced with the same indexer instead of re-masking the frame.
     mask = apply_extra_data(app)
     ds = max(app.downsampling_slider.get(), 1)
-    time = ctx.df[ctx.time_col][mask].iloc[::ds]
-
-    # Prepare generated data if selected
-    generated = {
-        "Thrust (lbf)": ctx.df[ctx.thrust_cols].sum(axis=1)
-        if ctx.thrust_cols
-        else None,
-        "Chamber Pressure (psi)": ctx.df[ctx.chamber_col]
-        if ctx.chamber_col
-        else None,
-        "O/F Ratio": (
-            pd.Series(ctx.of_ratio, index=ctx.df.index[:len(ctx.of_ratio)])
-            .reindex(ctx.df.index)  # Ensure alignment with the full DataFrame index
-            .loc[mask]  # Apply the mask
-            .iloc[::ds]  # Downsample
-            if ctx.of_ratio is not None and len(ctx.of_ratio) > 0
-            else None
-        ),
-    }
-
-    # Debugging: Check generated data
-    for key, series in generated.items():
-        if series is not None:
-            print(f"Generated series '{key}': {series.describe()}")
-        else:
-            print(f"Generated series '{key}' is None.")
-
-    # Debugging: Check mask alignment
-    print(f"Mask length: {len(mask)}, DataFrame length: {len(ctx.df)}")
-    print(f"Mask true count: {mask.sum()}")
+    rows = np.arange(len(ctx.df)) if isinstance(mask, slice) else np.flatnonzero(mask)
+    rows = rows[::ds]
+    time = ctx.df[ctx.time_col].iloc[rows]
+
+    # Generated series are built lazily, only when selected, on the windowed rows
+    generated = {}
+    if ctx.thrust_cols:
+        generated["Thrust (lbf)"] = lambda: ctx.df[ctx.thrust_cols].iloc[rows].sum(axis=1)
+    if ctx.chamber_col:
+        generated["Chamber Pressure (psi)"] = lambda: ctx.df[ctx.chamber_col].iloc[rows]
+    if ctx.of_ratio is not None and ctx.fuel_col and ctx.oxidizer_col:
+        generated["O/F Ratio"] = lambda: (ctx.df[ctx.oxidizer_col].iloc[rows]
+                                          / (ctx.df[ctx.fuel_col].iloc[rows] + 1e-6))
+    for label, name in formulas.channels(ctx).items():
+        generated.setdefault(label, lambda name=name: pd.Series(formulas.evaluate(ctx, name, rows),
+                                                                index=time.index))
+
+    series = {}
+    for col in cols:
+        if col in ctx.df.columns:
+            series[col] = ctx.df[col].iloc[rows]
+        elif col in generated:
+            series[col] = generated[col]()
 
     # group by units
     unit_groups = {}
     for col in cols:
-        unit_groups.setdefault(_extract_unit(col), []).append(col)
+        unit_groups.setdefault(extract_unit(col), []).append(col)
 
     # Prompt for constant lines
     constant_lines = _prompt_constant_lines(app, unit_groups)
@@ -276,34 +282,22 @@ def _run_inner(app):
             )
 
         for col in unit_cols:
-            raw_series = (
-                ctx.df[col] if col in ctx.df.columns else generated.get(col)
-            )
+            raw_series = series.get(col)
             if raw_series is None:
                 continue  # skip missing
 
-            # Align mask with raw_series length
-            aligned_mask = mask[:len(raw_series)]
-
-            # Debugging: Check raw_series and aligned_mask
-            print(f"Column '{col}' raw_series length: {len(raw_series)}")
-            print(f"Aligned mask length: {len(aligned_mask)}")
-            print(f"Aligned mask true count: {aligned_mask.sum()}")
-
-            raw_series = raw_series[aligned_mask].iloc[::ds]
-
             if raw_series.empty:
                 print(f"Column '{col}' resulted in an empty series after masking and downsampling.")
                 continue
 
-            opt = disp_opts[col]
+            opt, window = disp_opts[col]
             c = color_for[col]
 
             if opt in ("Raw", "Both"):
                 ax.plot(time, raw_series, label=f"{col} (Raw)", color=c,
                         alpha=0.35 if opt == "Both" else 1)
             if opt in ("Smoothed", "Both"):
-                sm = raw_series.rolling(window=10, center=True).mean()
+                sm = raw_series.rolling(window=window, center=True).mean()
                 ax.plot(time, sm, label=f"{col} (Smoothed)", color=c, linewidth=2)
 
             plotted_any = True
@@ -319,3 +313,7 @@ def _run_inner(app):
     ax0.set_title(plot_title)
     fig.tight_layout()
     canvas.draw()
+
+    # Shared time cursor and x-zoom with the other open plots; the readout lists every series
+    plot_links.register(plot_win, ax0, canvas, time.to_numpy(dtype=float),
+                        {c: v.to_numpy(dtype=float) for c, v in series.items() if not v.empty})
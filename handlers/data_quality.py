@@ -0,0 +1,81 @@
+
+# handlers/data_quality.py
+import tkinter as tk
+from tkinter import messagebox
+import quality
+import timestamps
+
+
+def run(app):
+    ctx = app.ctx
+    if ctx.df is None or ctx.time_col is None:
+        messagebox.showerror("Error", "Load data first.")
+        return
+    if ctx.store is not None:
+        messagebox.showinfo("Data Quality", "The quality scan is not run on files opened out-of-core.")
+        return
+    if ctx.quality is None:
+        ctx.quality = quality.scan(ctx.df, ctx.time_col)
+    small_font = ("Arial", 12)
+
+    win = tk.Toplevel(app)
+    win.title("Data Quality")
+    win.geometry("900x600")
+
+    text = tk.Text(win, font=small_font, wrap=tk.WORD)
+    scroll = tk.Scrollbar(win, command=text.yview)
+    text.config(yscrollcommand=scroll.set)
+
+    def show():
+        report = ctx.quality
+        text.config(state=tk.NORMAL)
+        text.delete("1.0", tk.END)
+        text.insert(tk.END, report.summary() + "\n")
+        if ctx.time_origin is not None:
+            text.insert(tk.END, f"Clock: t = 0 is {timestamps.clock(ctx.time_origin)} ({ctx.time_reference})\n")
+        text.insert(tk.END, "\n")
+        issues = report.issues()
+        text.insert(tk.END, "\n".join(issues) if issues else "No problems found.")
+        if report.gaps:
+            text.insert(tk.END, "\n\nFirst gaps (time, length):\n")
+            text.insert(tk.END, "\n".join(f"  {t:.4f} s  {d:.4f} s" for t, d in report.gaps))
+        if report.repairs:
+            text.insert(tk.END, "\n\nRepairs applied:\n" + "\n".join(f"  {a}" for a in report.repairs))
+        text.config(state=tk.DISABLED)
+        repair_btn.config(state=tk.NORMAL if report.repairable else tk.DISABLED)
+
+    def do_repair():
+        quality.repair_context(ctx)  # On raw values; the calibration is re-applied after
+        repairs = ctx.quality.repairs
+        ctx.quality = quality.scan(ctx.df, ctx.time_col)  # Rescan what is left
+        ctx.quality.repairs = repairs
+        app._recalc_metrics()
+        show()
+
+    def zero_at_ignition():
+        t_ign = ctx.metric_values.get("ignition_time")
+        if t_ign is None:
+            messagebox.showerror("Error", "No ignition time measured yet.", parent=win)
+            return
+        timestamps.rereference(ctx, t_ign, "ignition")
+        # Keep a custom splice on the same samples of the shifted axis
+        for entry in (app.custom_splice_start, app.custom_splice_end):
+            try:
+                value = float(entry.get()) - t_ign
+            except ValueError:
+                continue
+            entry.delete(0, tk.END)
+            entry.insert(0, f"{value:.4f}")
+        ctx.quality = quality.scan(ctx.df, ctx.time_col)
+        app._recalc_metrics()
+        show()
+
+    buttons = tk.Frame(win)
+    buttons.pack(side=tk.BOTTOM, pady=6)
+    repair_btn = tk.Button(buttons, text="Repair", command=do_repair, font=small_font)
+    repair_btn.pack(side=tk.LEFT, padx=4)
+    tk.Button(buttons, text="Zero Time at Ignition", command=zero_at_ignition,
+              font=small_font).pack(side=tk.LEFT, padx=4)
+    scroll.pack(side=tk.RIGHT, fill=tk.Y)
+    text.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
+    show()
@@ -0,0 +1,60 @@
+
+# handlers/despike_settings.py
+import tkinter as tk
+from tkinter import messagebox
+import despike
+
+
+def run(app):
+    ctx = app.ctx
+    small_font = ("Arial", 12)
+    settings = ctx.despike or {}
+
+    win = tk.Toplevel(app)
+    win.title("Spike & Dropout Rejection")
+    win.geometry("700x450")
+
+    enabled_var = tk.BooleanVar(value=bool(ctx.despike))
+    tk.Checkbutton(win, text="Reject spikes and bridge dropouts before computing metrics",
+                   variable=enabled_var, font=small_font).pack(anchor="w", padx=6, pady=6)
+
+    form = tk.Frame(win)
+    form.pack(anchor="w", padx=6)
+    tk.Label(form, text="Median window (samples):", font=small_font).grid(row=0, column=0, sticky="w")
+    window_var = tk.StringVar(value=str(settings.get("window", despike.DEFAULT_WINDOW)))
+    tk.Entry(form, textvariable=window_var, width=8).grid(row=0, column=1, padx=4)
+    tk.Label(form, text="Threshold (scaled MADs):", font=small_font).grid(row=1, column=0, sticky="w")
+    threshold_var = tk.StringVar(value=str(settings.get("threshold", despike.DEFAULT_THRESHOLD)))
+    tk.Entry(form, textvariable=threshold_var, width=8).grid(row=1, column=1, padx=4)
+
+    # Per-channel rejection counts from the last metrics run
+    report = tk.Text(win, height=12, font=small_font)
+    report.pack(fill=tk.BOTH, expand=True, padx=6, pady=6)
+
+    def show_report():
+        report.config(state=tk.NORMAL)
+        report.delete("1.0", tk.END)
+        if not ctx.despike_report:
+            report.insert(tk.END, "No channels cleaned yet.")
+        for col, counts in ctx.despike_report.items():
+            report.insert(tk.END, f"{col}: {counts['spikes']} spikes, {counts['dropouts']} dropouts\n")
+        report.config(state=tk.DISABLED)
+
+    def apply():
+        if enabled_var.get():
+            try:
+                window, threshold = int(window_var.get()), float(threshold_var.get())
+            except ValueError:
+                messagebox.showerror("Error", "Window must be an integer and threshold a number.", parent=win)
+                return
+            if window < 3 or threshold <= 0:
+                messagebox.showerror("Error", "Use a window of at least 3 and a positive threshold.", parent=win)
+                return
+            ctx.despike = {"window": window, "threshold": threshold}
+        else:
+            ctx.despike = None
+        app._recalc_metrics()  # Thresholds and peak pressure now use the cleaned channels
+        show_report()
+
+    tk.Button(win, text="Apply", command=apply, font=small_font).pack(pady=6)
+    show_report()
@@ -0,0 +1,126 @@
+
+# handlers/export_data.py
+import numpy as np
+import tkinter as tk
+from tkinter import filedialog, messagebox
+from utils import apply_extra_data, quick_stats
+from channel_browser import ChannelBrowser
+import export
+
+EXTENSIONS = {"parquet": ".parquet", "feather": ".feather", "csv": ".csv"}
+
+
+def _pick_export_opts(app):
+    """Modal form → export options dict or None."""
+    ctx = app.ctx
+    result = {}
+
+    win = tk.Toplevel(app)
+    win.title("Export Data")
+    win.geometry("620x820")
+
+    row = tk.Frame(win)
+    row.pack(anchor="w", padx=8, pady=6)
+    tk.Label(row, text="Format:").pack(side=tk.LEFT)
+    fmt_var = tk.StringVar(value="parquet" if export.pa is not None else "csv")
+    formats = export.FORMATS if export.pa is not None else ("csv",)
+    tk.OptionMenu(row, fmt_var, *formats).pack(side=tk.LEFT, padx=4)
+    tk.Label(row, text="Compression:").pack(side=tk.LEFT, padx=(12, 0))
+    comp_var = tk.StringVar(value=export.COMPRESSIONS[fmt_var.get()][0])
+    comp_menu = tk.OptionMenu(row, comp_var, *export.COMPRESSIONS[fmt_var.get()])
+    comp_menu.pack(side=tk.LEFT, padx=4)
+
+    def on_format(*_):
+        # Refill the compression menu with codecs valid for the chosen format
+        menu = comp_menu["menu"]
+        menu.delete(0, tk.END)
+        for codec in export.COMPRESSIONS[fmt_var.get()]:
+            menu.add_command(label=codec, command=lambda c=codec: comp_var.set(c))
+        comp_var.set(export.COMPRESSIONS[fmt_var.get()][0])
+    fmt_var.trace_add("write", on_format)
+
+    tk.Label(win, text="Raw channels:").pack(anchor="w", padx=8)
+    browser = ChannelBrowser(win, [c for c in ctx.df.columns if c != ctx.time_col],
+                             stats_fn=lambda c: quick_stats(ctx, c), height=18)
+    browser.pack(fill=tk.BOTH, expand=True, padx=8)
+
+    tk.Label(win, text="Derived channels:").pack(anchor="w", padx=8, pady=(8, 0))
+    derived_vars = {}
+    for name in export.available_derived(ctx):
+        derived_vars[name] = tk.BooleanVar(value=True)
+        tk.Checkbutton(win, text=name, variable=derived_vars[name]).pack(anchor="w", padx=16)
+    if not derived_vars:
+        tk.Label(win, text="(run ISP / c* plots first to set mdot and throat area)", fg="gray").pack(anchor="w", padx=16)
+
+    row = tk.Frame(win)
+    row.pack(anchor="w", padx=8, pady=6)
+    tk.Label(row, text="Smoothing window (samples, 1 = off):").pack(side=tk.LEFT)
+    smooth_var = tk.StringVar(value="1")
+    tk.Entry(row, textvariable=smooth_var, width=6).pack(side=tk.LEFT, padx=4)
+    ds_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(win, text="Apply Downsample slider", variable=ds_var).pack(anchor="w", padx=8)
+
+    def confirm():
+        try:
+            smoothing = max(1, int(smooth_var.get()))
+        except ValueError:
+            messagebox.showerror("Error", "Smoothing must be an integer.", parent=win)
+            return
+        result.update(fmt=fmt_var.get(), compression=comp_var.get(), raw_cols=browser.selected(),
+                      derived=[n for n, v in derived_vars.items() if v.get()],
+                      smoothing=smoothing,
+                      downsample=max(app.downsampling_slider.get(), 1) if ds_var.get() else 1)
+        win.destroy()
+
+    tk.Button(win, text="Export", command=confirm).pack(pady=10)
+    win.transient(app)
+    win.grab_set()
+    app.wait_window(win)
+    return result or None
+
+
+def run(app):
+    ctx = app.ctx
+    if ctx.df is None or ctx.time_col is None:
+        messagebox.showerror("Error", "Load data first.")
+        return
+    opts = _pick_export_opts(app)
+    if opts is None:
+        return
+    if not opts["raw_cols"] and not opts["derived"]:
+        messagebox.showinfo("Info", "No channels selected.")
+        return
+
+    path = filedialog.asksaveasfilename(defaultextension=EXTENSIONS[opts["fmt"]],
+                                        filetypes=[(opts["fmt"].title(), "*" + EXTENSIONS[opts["fmt"]]),
+                                                   ("All files", "*.*")],
+                                        title="Export Data As")
+    if not path:
+        return
+
+    # Same window the quick plots show: burn mask plus the Extra Data margin
+    mask = apply_extra_data(app)
+    if isinstance(mask, slice):
+        start, stop = 0, len(ctx.df)
+    else:
+        start, stop = int(np.argmax(mask)), len(mask) - int(np.argmax(mask[::-1]))
+
+    splice = None
+    if app.custom_splice_var.get():
+        splice = [app.custom_splice_start.get(), app.custom_splice_end.get()]
+    metadata = {
+        "source": app.file_label.cget("text"),
+        "target_thrust_lbf": getattr(ctx, "last_target_thrust", None),
+        "custom_splice_s": splice,
+        "extra_data_pct": app.extra_data_slider.get(),
+        "parameters": ctx.params,
+        "metrics": ctx.metrics,
+    }
+    try:
+        rows = export.export_window(ctx, path, opts["fmt"], opts["raw_cols"], opts["derived"],
+                                    start, stop, opts["downsample"], opts["smoothing"],
+                                    opts["compression"], metadata)
+    except Exception as e:
+        messagebox.showerror("Error", f"Export failed: {e}")
+        return
+    messagebox.showinfo("Export", f"Wrote {rows:,} rows to {path}")
@@ -0,0 +1,144 @@
+
+# handlers/formula_channels.py
+import numpy as np
+import tkinter as tk
+from tkinter import messagebox
+import formulas
+from utils import apply_extra_data, create_plot_window
+
+HELP = ("Channels: t, F (total thrust), Pc, OF, fuel, ox, or any column as [Column Name]\n"
+        "Parameters: mdot, fuel_mdot, oxidizer_mdot, throat_area, g0 (ft/s²)\n"
+        f"Functions: {', '.join(formulas.FUNCTIONS)}\n"
+        "Example: Cf = F / (Pc * At)  with the constant  At = 0.785")
+
+
+def _parse_constants(text):
+    """'name = value' lines → {name: value} (ValueError on a bad line)."""
+    out = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        name, sep, value = line.partition("=")
+        name = name.strip()
+        if not sep:
+            raise ValueError(f"Expected 'name = value', got '{line.strip()}'")
+        formulas.check_name(name)
+        try:
+            out[name] = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for constant '{name}'") from None
+    return out
+
+
+def run(app):
+    ctx = app.ctx
+    if ctx.df is None or ctx.time_col is None:
+        messagebox.showerror("Error", "Load data first.")
+        return
+    defs = ctx.params.setdefault("formulas", {})
+
+    win = tk.Toplevel(app)
+    win.title("Formula Channels")
+    win.geometry("760x620")
+    tk.Label(win, text=HELP, justify=tk.LEFT, anchor="w").pack(fill=tk.X, padx=8, pady=6)
+
+    listbox = tk.Listbox(win, height=10)
+    listbox.pack(fill=tk.BOTH, expand=True, padx=8)
+
+    form = tk.Frame(win)
+    form.pack(fill=tk.X, padx=8, pady=6)
+    name_var, unit_var, expr_var = tk.StringVar(), tk.StringVar(), tk.StringVar()
+    for r, (text, var, width) in enumerate((("Name", name_var, 20), ("Unit", unit_var, 20),
+                                            ("Expression", expr_var, 80))):
+        tk.Label(form, text=text, width=10, anchor="w").grid(row=r, column=0, sticky="w")
+        tk.Entry(form, textvariable=var, width=width).grid(row=r, column=1, sticky="w", pady=2)
+
+    tk.Label(win, text="Constants (one 'name = value' per line):", anchor="w").pack(fill=tk.X, padx=8)
+    const_text = tk.Text(win, height=5)
+    const_text.pack(fill=tk.X, padx=8)
+    const_text.insert("1.0", "\n".join(f"{k} = {v:g}" for k, v in ctx.params.get("formula_constants", {}).items()))
+
+    def refresh():
+        listbox.delete(0, tk.END)
+        for n, d in defs.items():
+            listbox.insert(tk.END, f"{formulas.label(n, d.get('unit'))} = {d['expression']}")
+
+    def on_select(_):
+        sel = listbox.curselection()
+        if sel:
+            n = list(defs)[sel[0]]
+            name_var.set(n)
+            unit_var.set(defs[n].get("unit", ""))
+            expr_var.set(defs[n]["expression"])
+
+    def save_constants():
+        try:
+            consts = _parse_constants(const_text.get("1.0", tk.END))
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=win)
+            return False
+        clash = set(consts) & set(defs)
+        if clash:
+            messagebox.showerror("Error", f"'{clash.pop()}' is both a constant and a formula.", parent=win)
+            return False
+        ctx.params["formula_constants"] = consts
+        return True
+
+    def add_update():
+        if not save_constants():
+            return
+        name, expr = name_var.get().strip(), expr_var.get().strip()
+        old = defs.get(name)
+        try:
+            formulas.check_name(name)
+            if name in ctx.params["formula_constants"]:
+                raise ValueError(f"'{name}' is already a constant")
+            defs[name] = {"expression": expr, "unit": unit_var.get().strip()}
+            formulas.required_columns(ctx, name)  # Parses, checks names and cycles
+        except ValueError as e:
+            if old is None:
+                defs.pop(name, None)
+            else:
+                defs[name] = old
+            messagebox.showerror("Error", str(e), parent=win)
+            return
+        refresh()
+
+    def remove():
+        sel = listbox.curselection()
+        if not sel:
+            return
+        n = list(defs)[sel[0]]
+        users = [k for k, d in defs.items() if k != n and n in formulas.compile_formula(d["expression"]).names]
+        if users and not messagebox.askyesno("Remove", f"'{n}' is used by {', '.join(users)}. Remove anyway?",
+                                             parent=win):
+            return
+        del defs[n]
+        refresh()
+
+    def plot():
+        sel = listbox.curselection()
+        if not sel or not save_constants():
+            return
+        n = list(defs)[sel[0]]
+        mask = apply_extra_data(app)
+        ds = max(app.downsampling_slider.get(), 1)
+        rows = np.arange(len(ctx.df)) if isinstance(mask, slice) else np.flatnonzero(mask)
+        rows = rows[::ds]
+        try:
+            values = formulas.evaluate(ctx, n, rows)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=win)
+            return
+        time = ctx.df[ctx.time_col].to_numpy(dtype=float)[rows]
+        lbl = formulas.label(n, defs[n].get("unit"))
+        create_plot_window(app, f"{lbl} vs Time", time, values, "Time (s)", lbl, lbl, "purple")
+
+    buttons = tk.Frame(win)
+    buttons.pack(pady=8)
+    tk.Button(buttons, text="Add / Update", command=add_update).pack(side=tk.LEFT, padx=4)
+    tk.Button(buttons, text="Remove", command=remove).pack(side=tk.LEFT, padx=4)
+    tk.Button(buttons, text="Save Constants", command=save_constants).pack(side=tk.LEFT, padx=4)
+    tk.Button(buttons, text="Plot", command=plot).pack(side=tk.LEFT, padx=4)
+    listbox.bind("<<ListboxSelect>>", on_select)
+    refresh()
@@ -9,7 +9,8 @@ def run(app):
     if ctx.df is None:
         messagebox.showerror("Error", "Load data first.")
         return
-    # call each plot handler
+    # call each plot handler; arrays come through render_cache, so ISP/Ve reuse the
+    # thrust preparation and c* reuses the chamber pressure one
     for fn in [plot_thrust, plot_chamber_pressure, plot_of_ratio,
                plot_fuel_weight, plot_oxidizer_weight, plot_c_star, plot_isp, plot_ve_from_isp]:
         try:
@@ -1,8 +1,14 @@
 
 # handlers/load_csv.py
 from tkinter import filedialog, messagebox, simpledialog
-import pandas as pd
 from utils import infer_columns, compute_metrics
+import csv_parser
+import campaign_db
+import calibration
+import quality
+import timestamps
+import target_estimate
+import numpy as np
 
 def run(app):
     ctx = app.ctx
@@ -10,18 +16,63 @@ def run(app):
     if not path:
         return
     try:
-        ctx.df = pd.read_csv(path, low_memory=False)
+        ctx.df, _ = csv_parser.read_csv(path)  # Arrow (multi-threaded) when available, else pandas
+        ctx.store = None
+        ctx.source_paths, ctx.source_hash = [path], None
     except Exception as e:
         messagebox.showerror("Error", f"Failed to load: {e}")
         return
 
+    finish_load(app, path.split('/')[-1])
+
+def check_quality(app):
+    """Scan the fresh data once; offer an automatic repair when something is fixable."""
+    ctx = app.ctx
+    ctx.quality = None
+    if ctx.store is not None or ctx.time_col is None:
+        return  # Out-of-core: only a head frame is resident
+    ctx.quality = quality.scan(ctx.df, ctx.time_col)
+    issues = ctx.quality.issues()
+    if not issues:
+        return
+    text = ctx.quality.summary() + "\n\n" + "\n".join(issues[:12])
+    if len(issues) > 12:
+        text += f"\n… and {len(issues) - 12} more (see Data Quality)"
+    if ctx.quality.repairable and messagebox.askyesno("Data Quality", text + "\n\nRepair automatically?", parent=app):
+        quality.repair_context(ctx)
+    elif not ctx.quality.repairable:
+        messagebox.showwarning("Data Quality", text, parent=app)
+
+def finish_load(app, label):
+    """Shared tail of every loader once ctx.df is populated."""
+    ctx = app.ctx
     infer_columns(app)
+    try:
+        timestamps.normalize(ctx)  # Wall-clock time column -> seconds from the first sample
+    except ValueError as e:
+        messagebox.showerror("Error", f"Cannot read the time column: {e}")
+        return
+    # Raw copies belong to the previous file; the new data is raw until calibrated below
+    ctx.raw_columns.clear()
+    check_quality(app)
+    # The stand calibration stays active across loads; apply it once to the new data
+    if ctx.calibration is not None:
+        calibration.apply(ctx, ctx.calibration)
 
-    tgt = simpledialog.askfloat("Target Thrust", "Enter expected target thrust (lbf):", parent=app)
+    # Propose the detected plateau instead of asking blind; a bad value breaks the burn mask
+    est = target_estimate.estimate_target(ctx)
+    prompt = "Enter expected target thrust (lbf):"
+    if np.isfinite(est.value):
+        prompt = f"Detected steady thrust: {est.value:.1f} lbf\n" + prompt
+        if est.ambiguous:
+            prompt = f"Warning: {est.reason}.\n" + prompt
+    tgt = simpledialog.askfloat("Target Thrust", prompt, parent=app,
+                                initialvalue=round(est.value, 1) if np.isfinite(est.value) else None)
     if tgt is None:
         return
-    ctx.last_target_thrust = tgt  
+    ctx.last_target_thrust = tgt
     compute_metrics(app, tgt)
     # update GUI
-    app.file_label.config(text=f"Loaded: {path.split('/')[-1]}", fg="black")
+    app.file_label.config(text=f"Loaded: {label}", fg="black")
     app.display_metrics()
+    campaign_db.record_context(app)
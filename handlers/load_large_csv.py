@@ -0,0 +1,44 @@
+
+# handlers/load_large_csv.py
+import os
+from tkinter import filedialog, messagebox
+from ooc import ChannelStore
+from csv_index import IndexedCSV
+from handlers.load_csv import finish_load
+
+def run(app):
+    ctx = app.ctx
+    path = filedialog.askopenfilename(filetypes=[("CSV files","*.csv")],
+                                      title="Open large CSV (out-of-core)")
+    if not path:
+        return
+
+    # The sparse index reads only the burn window straight from the CSV;
+    # converting to a channel store is slower once but faster to re-slice
+    indexed = messagebox.askyesno(
+        "Large CSV",
+        "Index the file and read only the burn window from it?\n\n"
+        "Choose No to convert the whole file to a channel store instead.")
+    size = os.path.getsize(path)
+
+    def progress(done):
+        if indexed:
+            app.file_label.config(text=f"Indexing: {100 * done // max(size, 1)}%", fg="black")
+        else:
+            app.file_label.config(text=f"Converting: {done:,} rows", fg="black")
+        app.update_idletasks()
+
+    try:
+        if indexed:
+            store = IndexedCSV.build(path, progress=progress)
+        else:
+            store = ChannelStore.build(path, progress=progress)
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to load: {e}")
+        return
+
+    # Only a small head frame is resident until the burn window is streamed in
+    ctx.store = store
+    ctx.source_paths, ctx.source_hash = [path], None
+    ctx.df = store.frame(0, min(store.n_rows, 1000))
+    finish_load(app, f"{os.path.basename(path)} ({'indexed' if indexed else 'out-of-core'}, {store.n_rows:,} rows)")
@@ -0,0 +1,91 @@
+
+# handlers/merge_csv.py
+import os
+import tkinter as tk
+from tkinter import filedialog, messagebox
+from merge import MergeSource, merge_files, METHODS
+from handlers.load_csv import finish_load
+
+
+def _pick_merge_opts(app, sources):
+    """Modal dialog → (master index, method, {index: offset}) or None."""
+    small_font = ("Arial", 12)
+    result = {}
+
+    win = tk.Toplevel(app)
+    win.title("Merge DAQ Files")
+    win.geometry("900x500")
+
+    tk.Label(win, text="Master clock, per-file time offset (s) and alignment method:",
+             font=small_font).pack(anchor="w", pady=6)
+
+    fastest = max(range(len(sources)), key=lambda i: sources[i].rate)
+    master_var = tk.IntVar(value=fastest)
+    offset_vars = {}
+    for i, src in enumerate(sources):
+        row = tk.Frame(win)
+        row.pack(anchor="w", padx=6, pady=2, fill=tk.X)
+        tk.Radiobutton(row, variable=master_var, value=i, font=small_font).pack(side=tk.LEFT)
+        rate = f"{src.rate:.1f} Hz" if src.rate else "unknown rate"
+        tk.Label(row, text=f"{os.path.basename(src.path)}  [{src.time_col}, {rate}]",
+                 width=60, anchor="w", font=small_font).pack(side=tk.LEFT)
+        tk.Label(row, text="Offset:", font=small_font).pack(side=tk.LEFT)
+        offset_vars[i] = tk.StringVar(value="0")
+        tk.Entry(row, textvariable=offset_vars[i], width=8).pack(side=tk.LEFT, padx=4)
+
+    method_row = tk.Frame(win)
+    method_row.pack(anchor="w", padx=6, pady=10)
+    tk.Label(method_row, text="Alignment:", font=small_font).pack(side=tk.LEFT)
+    method_var = tk.StringVar(value="interp")
+    tk.OptionMenu(method_row, method_var, *METHODS).pack(side=tk.LEFT)
+
+    def confirm():
+        try:
+            offsets = {i: float(v.get() or 0) for i, v in offset_vars.items()}
+        except ValueError:
+            messagebox.showerror("Error", "Offsets must be numbers.", parent=win)
+            return
+        result.update(master=master_var.get(), method=method_var.get(), offsets=offsets)
+        win.destroy()
+
+    tk.Button(win, text="Merge", command=confirm, font=small_font).pack(pady=10)
+    win.transient(app)
+    win.grab_set()
+    app.wait_window(win)
+    if not result:
+        return None
+    return result["master"], result["method"], result["offsets"]
+
+
+def run(app):
+    ctx = app.ctx
+    paths = filedialog.askopenfilenames(filetypes=[("CSV files", "*.csv")],
+                                        title="Select the DAQ files to merge")
+    if not paths:
+        return
+    if len(paths) < 2:
+        messagebox.showinfo("Info", "Select at least two files to merge.")
+        return
+
+    try:
+        sources = [MergeSource(p).probe() for p in paths]
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to read headers: {e}")
+        return
+
+    opts = _pick_merge_opts(app, sources)
+    if opts is None:
+        return
+    master, method, offsets = opts
+    for i, src in enumerate(sources):
+        src.offset = offsets[i]
+
+    try:
+        ctx.df = merge_files(sources, master=master, method=method)
+        ctx.store = None
+        ctx.source_paths, ctx.source_hash = list(paths), None
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to merge: {e}")
+        return
+
+    finish_load(app, f"{len(paths)} merged files")
@@ -0,0 +1,24 @@
+
+# handlers/open_archive.py
+import os
+from tkinter import filedialog, messagebox
+from archive import ArchiveStore, ARCHIVE_SUFFIX
+from handlers.load_csv import finish_load
+
+def run(app):
+    ctx = app.ctx
+    path = filedialog.askopenfilename(filetypes=[("HDAA archives", "*" + ARCHIVE_SUFFIX)],
+                                      title="Open archived test")
+    if not path:
+        return
+    try:
+        store = ArchiveStore(path)
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to open: {e}")
+        return
+
+    # Same path as an out-of-core CSV: only the chunks around the burn are decoded
+    ctx.store = store
+    ctx.source_paths, ctx.source_hash = [path], None
+    ctx.df = store.frame(0, min(store.n_rows, 1000))
+    finish_load(app, f"{os.path.basename(path)} (archive, {store.n_rows:,} rows)")
@@ -1,4 +1,7 @@
 from utils import apply_extra_data
+import render_cache
+import plot_links
+from handlers import uncertainty_bands, theoretical_performance
 import numpy as np
 import tkinter as tk
 from tkinter import simpledialog, filedialog
@@ -11,11 +14,15 @@ def run(app):
         return
 
     # Prompt the user to input mdot values for fuel and oxidizer in lbs/s
-    fuel_mdot = simpledialog.askfloat("Input", "Enter the mass flow rate of fuel (mdot_fuel) in lbs/s:", parent=app)
-    oxidizer_mdot = simpledialog.askfloat("Input", "Enter the mass flow rate of oxidizer (mdot_oxidizer) in lbs/s:", parent=app)
+    fuel_mdot = simpledialog.askfloat("Input", "Enter the mass flow rate of fuel (mdot_fuel) in lbs/s:", parent=app,
+                                      initialvalue=ctx.params.get("fuel_mdot"))
+    oxidizer_mdot = simpledialog.askfloat("Input", "Enter the mass flow rate of oxidizer (mdot_oxidizer) in lbs/s:", parent=app,
+                                          initialvalue=ctx.params.get("oxidizer_mdot"))
     if fuel_mdot is None or oxidizer_mdot is None:
         return  # Exit if the user cancels the input
 
+    ctx.params.update(fuel_mdot=fuel_mdot, oxidizer_mdot=oxidizer_mdot)
+
     # Calculate total mdot in lbs/s
     mdot_lbs = fuel_mdot + oxidizer_mdot
 
@@ -23,15 +30,19 @@ def run(app):
     mdot = mdot_lbs / 32.174
 
     # Prompt the user to input the throat area in ft^2
-    throat_area = simpledialog.askfloat("Input", "Enter the throat area (in ft^2):", parent=app)
+    throat_area = simpledialog.askfloat("Input", "Enter the throat area (in ft^2):", parent=app,
+                                        initialvalue=ctx.params.get("throat_area"))
     if throat_area is None:
         return  # Exit if the user cancels the input
+    ctx.params["throat_area"] = throat_area
 
     # Apply extra data mask and downsample
     mask = apply_extra_data(app)
     ds = max(app.downsampling_slider.get(), 1)
-    time = ctx.df[ctx.time_col][mask].iloc[::ds].values
-    chamber_pressure = ctx.df[ctx.chamber_col][mask].iloc[::ds].values  # Get chamber pressure in psi
+    key = render_cache.plot_key(ctx, "channel", [ctx.chamber_col], mask, ds)  # Same arrays as the Pc plot
+    time, chamber_pressure = render_cache.arrays(key, lambda: (
+        ctx.df[ctx.time_col][mask].iloc[::ds].values,
+        ctx.df[ctx.chamber_col][mask].iloc[::ds].values))  # Chamber pressure in psi
 
     # Convert chamber pressure from psi to lbf/ft^2 (1 psi = 144 lbf/ft^2)
     chamber_pressure_lbf_ft2 = chamber_pressure * 144
@@ -117,7 +128,7 @@ def run(app):
     def update_smoothing(val):
         window = smoothing_slider.get()
         if window > 1:
-            smoothed_c_star = np.convolve(c_star, np.ones(window) / window, mode='same')
+            smoothed_c_star = render_cache.smoothed(key + ("c_star", mdot_lbs, throat_area), c_star, window)
             smoothed_line.set_ydata(smoothed_c_star)
         else:
             smoothed_line.set_ydata(c_star)
@@ -149,3 +160,12 @@ def run(app):
     # Add a save button
     save_button = tk.Button(plot_win, text="Save Plot", command=save_plot)
     save_button.pack(pady=5)
+
+    # Shared time cursor and x-zoom with the other open plots
+    plot_links.register(plot_win, ax, canvas, time, {"c* (m/s)": c_star})
+
+    # Monte Carlo uncertainty bands from measurement errors
+    uncertainty_bands.attach(app, plot_win, ax, canvas, "c_star", time, chamber_pressure, mdot_lbs, throat_area)
+
+    # Efficiency against a theoretical c* / Isp table (e.g. CEA) along O/F and Pc
+    theoretical_performance.attach(app, plot_win, ax, canvas, "c_star", time, c_star, mask, ds, mdot_lbs, throat_area)
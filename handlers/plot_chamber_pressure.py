@@ -1,6 +1,8 @@
 # handlers/plot_chamber_pressure.py
 import numpy as np
 from utils import apply_extra_data
+import render_cache
+import plot_links
 import tkinter as tk
 from tkinter import filedialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -12,8 +14,10 @@ def run(app):
         return
     mask = apply_extra_data(app)
     ds = max(app.downsampling_slider.get(), 1)
-    time = ctx.df[ctx.time_col][mask].iloc[::ds].values
-    press = ctx.df[ctx.chamber_col][mask].iloc[::ds].values
+    key = render_cache.plot_key(ctx, "channel", [ctx.chamber_col], mask, ds)
+    time, press = render_cache.arrays(key, lambda: (
+        ctx.df[ctx.time_col][mask].iloc[::ds].values,
+        ctx.df[ctx.chamber_col][mask].iloc[::ds].values))
 
     # Create a new plot window
     plot_win = tk.Toplevel(app)
@@ -90,7 +94,7 @@ def run(app):
     def update_smoothing(val):
         window = smoothing_slider.get()
         if window > 1:
-            smoothed_press = np.convolve(press, np.ones(window) / window, mode='same')
+            smoothed_press = render_cache.smoothed(key, press, window)
             smoothed_line.set_ydata(smoothed_press)
         else:
             smoothed_line.set_ydata(press)
@@ -103,7 +107,8 @@ def run(app):
                                                             ("All files", "*.*")],
                                                  title="Save Plot As")
         if file_path:
-            fig.savefig(file_path)
+            # Same data, smoothing and picked points → reuse the earlier render
+            render_cache.save_png(key + (smoothing_slider.get(), tuple(points)), fig, file_path)
             print(f"Plot saved to {file_path}")
 
     # Add smoothing slider
@@ -122,3 +127,6 @@ def run(app):
     # Add a save button
     save_button = tk.Button(plot_win, text="Save Plot", command=save_plot)
     save_button.pack(pady=5)
+
+    # Shared time cursor and x-zoom with the other open plots
+    plot_links.register(plot_win, ax, canvas, time, {"Pc (psi)": press})
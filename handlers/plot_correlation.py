@@ -0,0 +1,112 @@
+
+# handlers/plot_correlation.py
+import numpy as np
+import tkinter as tk
+from tkinter import filedialog, messagebox
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from utils import apply_extra_data, quick_stats
+from channel_browser import ChannelBrowser
+import correlation
+import despike
+import render_cache
+
+
+def _pick_correlation_opts(app):
+    """Modal form → {"cols", "max_lag", "nperseg"} or None."""
+    ctx = app.ctx
+    columns = [c for c in ctx.df.columns if c != ctx.time_col]
+    default = [c for c in [ctx.chamber_col, *ctx.thrust_cols] if c]
+    result = {}
+
+    win = tk.Toplevel(app)
+    win.title("Cross-Correlation")
+    win.geometry("700x700")
+
+    tk.Label(win, text="Channels (the first selected is the reference for a pair):").pack(anchor="w", padx=8, pady=4)
+    browser = ChannelBrowser(win, columns, selected=default, stats_fn=lambda c: quick_stats(ctx, c), height=20)
+    browser.pack(fill=tk.BOTH, expand=True, padx=8)
+
+    fields = {"max_lag": ("Max lag (s, blank = quarter of the window)", ""),
+              "nperseg": ("Coherence segment length (samples)", str(correlation.NPERSEG))}
+    vars_ = {}
+    for k, (label, default_value) in fields.items():
+        row = tk.Frame(win)
+        row.pack(anchor="w", padx=8, pady=2)
+        tk.Label(row, text=label, width=40, anchor="w").pack(side=tk.LEFT)
+        vars_[k] = tk.StringVar(value=default_value)
+        tk.Entry(row, textvariable=vars_[k], width=10).pack(side=tk.LEFT)
+
+    def confirm():
+        cols = browser.selected()
+        if len(cols) < 2:
+            messagebox.showerror("Error", "Select at least two channels.", parent=win)
+            return
+        try:
+            result.update(cols=cols,
+                          max_lag=float(vars_["max_lag"].get()) if vars_["max_lag"].get().strip() else None,
+                          nperseg=int(vars_["nperseg"].get()))
+        except ValueError:
+            messagebox.showerror("Error", "Invalid number.", parent=win)
+            return
+        win.destroy()
+
+    tk.Button(win, text="Analyze", command=confirm).pack(pady=10)
+    win.transient(app)
+    win.grab_set()
+    app.wait_window(win)
+    return result or None
+
+
+def run(app):
+    ctx = app.ctx
+    if ctx.df is None or ctx.time_col is None:
+        return
+    opts = _pick_correlation_opts(app)
+    if opts is None:
+        return
+    cols = opts.pop("cols")
+
+    # Contiguous burn window (plus Extra Data) at full resolution
+    mask = apply_extra_data(app)
+    if isinstance(mask, slice):
+        start, stop = 0, len(ctx.df)
+    else:
+        start, stop = int(np.argmax(mask)), len(mask) - int(np.argmax(mask[::-1]))
+    time = ctx.df[ctx.time_col].values[start:stop]
+    channels = {c: despike.channel(ctx, c)[start:stop] for c in cols}
+
+    try:
+        if len(cols) == 2:
+            key = (render_cache.dataset_key(ctx), tuple(cols), start, stop, despike.settings_key(ctx))
+            result = correlation.lag(time, channels[cols[0]], channels[cols[1]], key=key, **opts)
+            fig = correlation.render_pair(result, *cols)
+            summary = (f"{cols[1]} lags {cols[0]} by {result['lag'] * 1000:.3f} ms "
+                       f"(r = {result['r']:.3f}, coherence {result['coherence']:.3f})")
+        else:
+            names, lags, r, coh = correlation.lag_matrix(time, channels, **opts)
+            fig = correlation.render_matrix(names, lags, r, coh)
+            summary = "Cell (row, column): lag of the column channel behind the row channel"
+    except ValueError as e:
+        messagebox.showerror("Error", str(e))
+        return
+
+    plot_win = tk.Toplevel(app)
+    plot_win.title("Cross-Correlation: " + ", ".join(cols))
+    plot_win.geometry("1280x960")
+    canvas = FigureCanvasTkAgg(fig, master=plot_win)
+    canvas.draw()
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    NavigationToolbar2Tk(canvas, plot_win).update()
+    tk.Label(plot_win, text=summary, font=("Arial", 12)).pack(pady=5)
+
+    def save_plot():
+        file_path = filedialog.asksaveasfilename(defaultextension=".png",
+                                                 filetypes=[("PNG files", "*.png"),
+                                                            ("PDF files", "*.pdf"),
+                                                            ("All files", "*.*")],
+                                                 title="Save Plot As")
+        if file_path:
+            fig.savefig(file_path)
+            print(f"Plot saved to {file_path}")
+
+    tk.Button(plot_win, text="Save Plot", command=save_plot).pack(pady=5)
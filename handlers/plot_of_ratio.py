@@ -1,5 +1,7 @@
 # handlers/plot_of_ratio.py
 from utils import apply_extra_data
+import render_cache
+import plot_links
 import numpy as np
 import tkinter as tk
 from tkinter import filedialog
@@ -12,12 +14,12 @@ def run(app):
         return
     mask = apply_extra_data(app)
     ds = max(app.downsampling_slider.get(), 1)
-    time = ctx.df[ctx.time_col][mask].iloc[::ds].values
-    fuel = ctx.df[ctx.fuel_col][mask].iloc[::ds].values if ctx.fuel_col else None
-    ox = ctx.df[ctx.oxidizer_col][mask].iloc[::ds].values if ctx.oxidizer_col else None
-    if fuel is None or ox is None:
+    if ctx.fuel_col is None or ctx.oxidizer_col is None:
         return
-    of_ratio = ox / (fuel + 1e-6)
+    key = render_cache.plot_key(ctx, "of_ratio", [ctx.fuel_col, ctx.oxidizer_col], mask, ds)
+    time, of_ratio = render_cache.arrays(key, lambda: (
+        ctx.df[ctx.time_col][mask].iloc[::ds].values,
+        ctx.df[ctx.oxidizer_col][mask].iloc[::ds].values / (ctx.df[ctx.fuel_col][mask].iloc[::ds].values + 1e-6)))
 
     # Create a new plot window
     plot_win = tk.Toplevel(app)
@@ -94,7 +96,7 @@ def run(app):
     def update_smoothing(val):
         window = smoothing_slider.get()
         if window > 1:
-            smoothed_of_ratio = np.convolve(of_ratio, np.ones(window) / window, mode='same')
+            smoothed_of_ratio = render_cache.smoothed(key, of_ratio, window)
             smoothed_line.set_ydata(smoothed_of_ratio)
         else:
             smoothed_line.set_ydata(of_ratio)
@@ -107,7 +109,8 @@ def run(app):
                                                             ("All files", "*.*")],
                                                  title="Save Plot As")
         if file_path:
-            fig.savefig(file_path)
+            # Same data, smoothing and picked points → reuse the earlier render
+            render_cache.save_png(key + (smoothing_slider.get(), tuple(points)), fig, file_path)
             print(f"Plot saved to {file_path}")
 
     # Add smoothing slider
@@ -126,3 +129,6 @@ def run(app):
     # Add a save button
     save_button = tk.Button(plot_win, text="Save Plot", command=save_plot)
     save_button.pack(pady=5)
+
+    # Shared time cursor and x-zoom with the other open plots
+    plot_links.register(plot_win, ax, canvas, time, {"O/F": of_ratio})
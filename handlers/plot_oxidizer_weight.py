@@ -1,6 +1,7 @@
 # handlers/plot_oxidizer_weight.py
-import numpy as np
 from utils import apply_extra_data
+import render_cache
+import plot_links
 import tkinter as tk
 from tkinter import filedialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -12,8 +13,10 @@ def run(app):
         return
     mask = apply_extra_data(app)
     ds = max(app.downsampling_slider.get(), 1)
-    time = ctx.df[ctx.time_col][mask].iloc[::ds].values
-    weight = ctx.df[ctx.oxidizer_col][mask].iloc[::ds].values
+    key = render_cache.plot_key(ctx, "channel", [ctx.oxidizer_col], mask, ds)
+    time, weight = render_cache.arrays(key, lambda: (
+        ctx.df[ctx.time_col][mask].iloc[::ds].values,
+        ctx.df[ctx.oxidizer_col][mask].iloc[::ds].values))
 
     # Create a new plot window
     plot_win = tk.Toplevel(app)
@@ -78,7 +81,7 @@ def run(app):
     def update_smoothing(val):
         window = smoothing_slider.get()
         if window > 1:
-            smoothed_weight = np.convolve(weight, np.ones(window) / window, mode='same')
+            smoothed_weight = render_cache.smoothed(key, weight, window)
             smoothed_line.set_ydata(smoothed_weight)
         else:
             smoothed_line.set_ydata(weight)
@@ -91,7 +94,8 @@ def run(app):
                                                             ("All files", "*.*")],
                                                  title="Save Plot As")
         if file_path:
-            fig.savefig(file_path)
+            # Same data, smoothing and picked points → reuse the earlier render
+            render_cache.save_png(key + (smoothing_slider.get(), tuple(points)), fig, file_path)
             print(f"Plot saved to {file_path}")
 
     # Add smoothing slider
@@ -110,3 +114,6 @@ def run(app):
     # Add a save button
     save_button = tk.Button(plot_win, text="Save Plot", command=save_plot)
     save_button.pack(pady=5)
+
+    # Shared time cursor and x-zoom with the other open plots
+    plot_links.register(plot_win, ax, canvas, time, {"Oxidizer (lbf)": weight})
@@ -0,0 +1,114 @@
+
+# handlers/plot_spectrum.py
+import numpy as np
+import tkinter as tk
+from tkinter import filedialog, messagebox
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from utils import apply_extra_data, extract_unit, quick_stats
+from channel_browser import ChannelBrowser
+import spectral
+import render_cache
+import despike
+
+
+def _pick_spectrum_opts(app):
+    """Modal form → {"col", "nperseg", "spec_nperseg", "fmin", "fmax"} or None."""
+    ctx = app.ctx
+    columns = [c for c in ctx.df.columns if c != ctx.time_col]
+    result = {}
+
+    win = tk.Toplevel(app)
+    win.title("Spectral Analysis")
+    win.geometry("560x640")
+
+    tk.Label(win, text="Channel:").pack(anchor="w", padx=8, pady=4)
+    browser = ChannelBrowser(win, columns, selected=[ctx.chamber_col or columns[0]],
+                             stats_fn=lambda c: quick_stats(ctx, c), height=15, single=True)
+    browser.pack(fill=tk.BOTH, expand=True, padx=8)
+
+    fields = {"nperseg": ("PSD segment length (samples)", "4096"),
+              "spec_nperseg": ("Spectrogram segment length (samples)", "1024"),
+              "fmin": ("Peak search min frequency (Hz)", "0"),
+              "fmax": ("Peak search max frequency (Hz, blank = Nyquist)", "")}
+    vars_ = {}
+    for k, (label, default) in fields.items():
+        row = tk.Frame(win)
+        row.pack(anchor="w", padx=8, pady=2)
+        tk.Label(row, text=label, width=40, anchor="w").pack(side=tk.LEFT)
+        vars_[k] = tk.StringVar(value=default)
+        tk.Entry(row, textvariable=vars_[k], width=10).pack(side=tk.LEFT)
+
+    def confirm():
+        if not browser.selected():
+            messagebox.showerror("Error", "Select a channel.", parent=win)
+            return
+        try:
+            result.update(col=browser.selected()[0],
+                          nperseg=int(vars_["nperseg"].get()),
+                          spec_nperseg=int(vars_["spec_nperseg"].get()),
+                          fmin=float(vars_["fmin"].get() or 0),
+                          fmax=float(vars_["fmax"].get()) if vars_["fmax"].get().strip() else None)
+        except ValueError:
+            messagebox.showerror("Error", "Invalid number.", parent=win)
+            return
+        win.destroy()
+
+    tk.Button(win, text="Analyze", command=confirm).pack(pady=10)
+    win.transient(app)
+    win.grab_set()
+    app.wait_window(win)
+    return result or None
+
+
+def run(app):
+    ctx = app.ctx
+    if ctx.df is None or ctx.time_col is None:
+        return
+    opts = _pick_spectrum_opts(app)
+    if opts is None:
+        return
+    col = opts.pop("col")
+
+    # Contiguous burn window (plus Extra Data) at full resolution – no downsampling
+    mask = apply_extra_data(app)
+    if isinstance(mask, slice):
+        start, stop = 0, len(ctx.df)
+    else:
+        start, stop = int(np.argmax(mask)), len(mask) - int(np.argmax(mask[::-1]))
+    time = ctx.df[ctx.time_col].values[start:stop]
+    values = despike.channel(ctx, col)[start:stop]  # Despiked when despiking is on, like the other plots
+    if len(time) < 16:
+        messagebox.showerror("Error", "Not enough samples in the selected window.")
+        return
+
+    try:
+        result = spectral.analyze(time, values, key=(render_cache.dataset_key(ctx), despike.settings_key(ctx),
+                                                     col, start, stop), **opts)
+    except ValueError as e:
+        messagebox.showerror("Error", str(e))
+        return
+
+    plot_win = tk.Toplevel(app)
+    plot_win.title(f"Spectral Analysis: {col}")
+    plot_win.geometry("1280x960")
+    fig = spectral.render_figure(result, title=col, unit=extract_unit(col) or "units", fmax=opts["fmax"])
+    canvas = FigureCanvasTkAgg(fig, master=plot_win)
+    canvas.draw()
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    NavigationToolbar2Tk(canvas, plot_win).update()
+
+    peaks = ", ".join(f"{f:.1f} Hz" for f, _ in result["peaks"][:3]) or "none"
+    tk.Label(plot_win, text=f"Strongest PSD peaks: {peaks}", font=("Arial", 12)).pack(pady=5)
+
+    def save_plot():
+        file_path = filedialog.asksaveasfilename(defaultextension=".png",
+                                                 filetypes=[("PNG files", "*.png"),
+                                                            ("PDF files", "*.pdf"),
+                                                            ("All files", "*.*")],
+                                                 title="Save Plot As")
+        if file_path:
+            fig.savefig(file_path)
+            print(f"Plot saved to {file_path}")
+
+    tk.Button(plot_win, text="Save Plot", command=save_plot).pack(pady=5)
+
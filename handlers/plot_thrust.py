@@ -1,6 +1,8 @@
 # handlers/plot_thrust.py
 import numpy as np
 from utils import apply_extra_data
+import render_cache
+import plot_links
 import tkinter as tk
 from tkinter import filedialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -13,8 +15,11 @@ def run(app):
         return
     mask = apply_extra_data(app)
     ds = max(app.downsampling_slider.get(), 1)
-    time = ctx.df[ctx.time_col][mask].iloc[::ds].values
-    thrust = ctx.df.loc[mask, ctx.thrust_cols].sum(axis=1).iloc[::ds].values
+    # Prepared arrays are shared with the ISP/Ve plots and reused on re-open
+    key = render_cache.plot_key(ctx, "thrust", ctx.thrust_cols, mask, ds)
+    time, thrust = render_cache.arrays(key, lambda: (
+        ctx.df[ctx.time_col][mask].iloc[::ds].values,
+        ctx.df.loc[mask, ctx.thrust_cols].sum(axis=1).iloc[::ds].values))
 
     # Create a new plot window
     plot_win = tk.Toplevel(app)
@@ -91,7 +96,7 @@ def run(app):
     def update_smoothing(val):
         window = smoothing_slider.get()
         if window > 1:
-            smoothed_thrust = np.convolve(thrust, np.ones(window) / window, mode='same')
+            smoothed_thrust = render_cache.smoothed(key, thrust, window)
             smoothed_line.set_ydata(smoothed_thrust)
         else:
             smoothed_line.set_ydata(thrust)
@@ -104,7 +109,8 @@ def run(app):
                                                             ("All files", "*.*")],
                                                  title="Save Plot As")
         if file_path:
-            fig.savefig(file_path)
+            # Same data, smoothing and picked points → reuse the earlier render
+            render_cache.save_png(key + (smoothing_slider.get(), tuple(points)), fig, file_path)
             print(f"Plot saved to {file_path}")
 
     # Add smoothing slider
@@ -123,3 +129,6 @@ def run(app):
     # Add a save button
     save_button = tk.Button(plot_win, text="Save Plot", command=save_plot)
     save_button.pack(pady=5)
+
+    # Shared time cursor and x-zoom with the other open plots
+    plot_links.register(plot_win, ax, canvas, time, {"Thrust (lbf)": thrust})
@@ -1,4 +1,7 @@
 from utils import apply_extra_data
+import render_cache
+import plot_links
+from handlers import uncertainty_bands
 import numpy as np
 import tkinter as tk
 from tkinter import simpledialog, filedialog
@@ -11,11 +14,15 @@ def run(app):
         return
 
     # Prompt the user to input mdot values for fuel and oxidizer in lbs/s
-    fuel_mdot = simpledialog.askfloat("Input", "Enter the mass flow rate of fuel (mdot_fuel) in lbs/s:", parent=app)
-    oxidizer_mdot = simpledialog.askfloat("Input", "Enter the mass flow rate of oxidizer (mdot_oxidizer) in lbs/s:", parent=app)
+    fuel_mdot = simpledialog.askfloat("Input", "Enter the mass flow rate of fuel (mdot_fuel) in lbs/s:", parent=app,
+                                      initialvalue=ctx.params.get("fuel_mdot"))
+    oxidizer_mdot = simpledialog.askfloat("Input", "Enter the mass flow rate of oxidizer (mdot_oxidizer) in lbs/s:", parent=app,
+                                          initialvalue=ctx.params.get("oxidizer_mdot"))
     if fuel_mdot is None or oxidizer_mdot is None:
         return  # Exit if the user cancels the input
 
+    ctx.params.update(fuel_mdot=fuel_mdot, oxidizer_mdot=oxidizer_mdot)
+
     # Calculate total mdot in lbs/s
     mdot_lbs = fuel_mdot + oxidizer_mdot
 
@@ -28,8 +35,10 @@ def run(app):
     # Apply extra data mask and downsample
     mask = apply_extra_data(app)
     ds = max(app.downsampling_slider.get(), 1)
-    time = ctx.df[ctx.time_col][mask].iloc[::ds].values
-    thrust = ctx.df.loc[mask, ctx.thrust_cols].sum(axis=1).iloc[::ds].values  # Calculate thrust from data
+    key = render_cache.plot_key(ctx, "thrust", ctx.thrust_cols, mask, ds)  # Same arrays as the thrust plot
+    time, thrust = render_cache.arrays(key, lambda: (
+        ctx.df[ctx.time_col][mask].iloc[::ds].values,
+        ctx.df.loc[mask, ctx.thrust_cols].sum(axis=1).iloc[::ds].values))
 
     # Calculate ISP
     isp = thrust / (mdot * gravity)
@@ -113,7 +122,7 @@ def run(app):
     def update_smoothing(val):
         window = smoothing_slider.get()
         if window > 1:
-            smoothed_ve = np.convolve(ve, np.ones(window) / window, mode='same')
+            smoothed_ve = render_cache.smoothed(key + ("ve", mdot_lbs), ve, window)
             smoothed_line.set_ydata(smoothed_ve)
         else:
             smoothed_line.set_ydata(ve)
@@ -144,4 +153,10 @@ def run(app):
 
     # Add a save button
     save_button = tk.Button(plot_win, text="Save Plot", command=save_plot)
-    save_button.pack(pady=5)
\ No newline at end of file
+    save_button.pack(pady=5)
+
+    # Shared time cursor and x-zoom with the other open plots
+    plot_links.register(plot_win, ax, canvas, time, {"Ve (m/s)": ve})
+
+    # Monte Carlo uncertainty bands from measurement errors
+    uncertainty_bands.attach(app, plot_win, ax, canvas, "ve", time, thrust, mdot_lbs)
\ No newline at end of file
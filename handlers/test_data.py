@@ -1,11 +1,59 @@
 
 # handlers/test_data.py
+import numpy as np
+import tkinter as tk
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import ooc
+import plot_links
 from utils import create_plot_window
 def run(app):
     ctx = app.ctx
     if ctx.df is None or ctx.time_col is None or not ctx.thrust_cols:
         return
+    if ctx.store is not None:
+        _run_out_of_core(app)
+        return
     time = ctx.df[ctx.time_col].values
     thrust = ctx.df[ctx.thrust_cols].sum(axis=1).values
     create_plot_window(app, "Test Data: Total Thrust", time, thrust,
                        "Time (s)", "Thrust (lbf)", "Total Thrust", "blue")
+
+def _run_out_of_core(app):
+    """Plot a decimated envelope of the whole file and refetch detail on zoom."""
+    ctx = app.ctx
+    store = ctx.store
+    store.time_col = ctx.time_col
+    transform = ooc.ChunkFilter(ctx, store, ctx.thrust_cols)  # Calibrated and despiked like the in-memory path
+    time, thrust = store.summary(ctx.thrust_cols, transform=transform)
+
+    plot_win = tk.Toplevel(app)
+    plot_win.title("Test Data: Total Thrust")
+    plot_win.geometry("1200x900")
+    fig, ax = plt.subplots(figsize=(12, 6), dpi=100)
+    line, = ax.plot(time, thrust, label="Total Thrust", color="blue")
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel("Thrust (lbf)")
+    ax.set_title("Test Data: Total Thrust")
+    ax.legend()
+    canvas = FigureCanvasTkAgg(fig, master=plot_win)
+    canvas.draw()
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    NavigationToolbar2Tk(canvas, plot_win).update()
+    plot = plot_links.register(plot_win, ax, canvas, time, {"Total Thrust": thrust})
+
+    def on_xlim(axes):
+        # Pull a screen-resolution summary (full resolution once zoomed in far enough)
+        t0, t1 = axes.get_xlim()
+        start, stop = store.index_range(t0, t1)
+        start, stop = max(0, start - 1), min(store.n_rows, stop + 1)
+        if stop - start < 2:
+            return
+        t, y = store.summary(ctx.thrust_cols, start, stop, transform=transform)
+        line.set_data(t, y)
+        # Keep the linked cursor readout on the refetched samples
+        plot.time, plot.last = np.asarray(t, dtype=float), None
+        plot.series["Total Thrust"] = np.asarray(y, dtype=float)
+        canvas.draw_idle()
+
+    ax.callbacks.connect("xlim_changed", on_xlim)
@@ -0,0 +1,135 @@
+
+# handlers/theoretical_performance.py
+import os
+import tkinter as tk
+from tkinter import filedialog, messagebox
+import performance_table
+import render_cache
+
+UNITS = {"isp": "s", "c_star": "m/s"}
+NAMES = {"isp": "Isp", "c_star": "c*"}
+
+
+def _prompt_table(app):
+    """Modal form → (table path, Pc offset to absolute in psi) or None."""
+    params = app.ctx.params
+    path_var = tk.StringVar(value=params.get("performance_table", ""))
+    offset_var = tk.StringVar(value=str(params.get("pc_offset_abs", performance_table.ATM_PSI)))
+    result = {}
+
+    win = tk.Toplevel(app)
+    win.title("Theoretical Performance")
+    win.geometry("560x170")
+    tk.Label(win, text="c* / Isp table vs O/F and Pc (CEA output or CSV):").pack(anchor="w", padx=8, pady=4)
+    row = tk.Frame(win)
+    row.pack(fill=tk.X, padx=8)
+    tk.Entry(row, textvariable=path_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+    def browse():
+        path = filedialog.askopenfilename(parent=win, title="Open performance table",
+                                          filetypes=[("Tables / CEA output", "*.csv *.txt *.out"),
+                                                     ("All files", "*.*")])
+        if path:
+            path_var.set(path)
+
+    tk.Button(row, text="Browse", command=browse).pack(side=tk.LEFT, padx=4)
+    row = tk.Frame(win)
+    row.pack(anchor="w", padx=8, pady=6)
+    tk.Label(row, text="Add to Pc for absolute pressure (psi, 0 if psia)", width=40, anchor="w").pack(side=tk.LEFT)
+    tk.Entry(row, textvariable=offset_var, width=10).pack(side=tk.LEFT)
+
+    def confirm():
+        if not os.path.isfile(path_var.get()):
+            messagebox.showerror("Error", "Select a table file.", parent=win)
+            return
+        try:
+            result.update(path=path_var.get(), offset=float(offset_var.get()))
+        except ValueError:
+            messagebox.showerror("Error", "Invalid Pc offset.", parent=win)
+            return
+        win.destroy()
+
+    tk.Button(win, text="Compare", command=confirm).pack(pady=8)
+    win.transient(app)
+    win.grab_set()
+    app.wait_window(win)
+    if not result:
+        return None
+    params.update(performance_table=result["path"], pc_offset_abs=result["offset"])
+    return result["path"], result["offset"]
+
+
+def _of_series(ctx, rows):
+    """Measured O/F on ``rows`` (mask or slice), or the constant mdot ratio without tank channels."""
+    if ctx.fuel_col and ctx.oxidizer_col:
+        return ctx.df[ctx.oxidizer_col].values[rows] / (ctx.df[ctx.fuel_col].values[rows] + 1e-6)
+    return ctx.params["oxidizer_mdot"] / ctx.params["fuel_mdot"]
+
+
+def attach(app, plot_win, ax, canvas, kind, time, values, mask, ds, mdot_lbs, throat_area=None):
+    """Add an 'Efficiency vs Theory' button to the c* / Isp quick plot windows."""
+    ctx = app.ctx
+    label = tk.Label(plot_win, text="", font=("Arial", 12))
+    artists = []
+    twin = []
+
+    def run_efficiency():
+        if ctx.chamber_col is None:
+            messagebox.showerror("Error", "A chamber pressure channel is needed for the table lookup.")
+            return
+        opts = _prompt_table(app)
+        if opts is None:
+            return
+        path, offset = opts
+        try:
+            table = performance_table.load(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not read the table: {e}")
+            return
+
+        # Plotted series: Pc and O/F on the same rows as the quick plots
+        pc_key = render_cache.plot_key(ctx, "channel", [ctx.chamber_col], mask, ds)
+        _, pc = render_cache.arrays(pc_key, lambda: (
+            ctx.df[ctx.time_col][mask].iloc[::ds].values,
+            ctx.df[ctx.chamber_col][mask].iloc[::ds].values))
+        if ctx.fuel_col and ctx.oxidizer_col:
+            of_key = render_cache.plot_key(ctx, "of_ratio", [ctx.fuel_col, ctx.oxidizer_col], mask, ds)
+            _, of = render_cache.arrays(of_key, lambda: (
+                ctx.df[ctx.time_col][mask].iloc[::ds].values,
+                ctx.df[ctx.oxidizer_col][mask].iloc[::ds].values / (ctx.df[ctx.fuel_col][mask].iloc[::ds].values + 1e-6)))
+        else:
+            of = _of_series(ctx, slice(None))
+        curve = performance_table.efficiency(table, kind, time, values, of, pc + offset)
+
+        # Burn average over the full-resolution burn window
+        rows = ctx.initial_mask if ctx.initial_mask is not None else slice(None)
+        x = ctx.df[ctx.chamber_col].values[rows] if kind == "c_star" \
+            else ctx.df[ctx.thrust_cols].values[rows].sum(axis=1)
+        burn = performance_table.efficiency(
+            table, kind, ctx.df[ctx.time_col].values[rows],
+            performance_table.measured(kind, x, mdot_lbs, throat_area),
+            _of_series(ctx, rows), ctx.df[ctx.chamber_col].values[rows] + offset)
+        ctx.metric_values[f"{kind}_efficiency"] = burn["average"]
+
+        for a in artists:
+            a.remove()
+        artists.clear()
+        if not twin:
+            twin.append(ax.twinx())
+            twin[0].set_ylabel("Efficiency (%)")
+        artists.append(ax.plot(time, curve["theory"], "k--", linewidth=1, label="Theoretical")[0])
+        artists.append(twin[0].plot(time, 100 * curve["eta"], color="gray", linewidth=1,
+                                    label=f"{NAMES[kind]} efficiency")[0])
+        ax.legend(loc="upper left")
+        twin[0].legend(loc="upper right")
+        canvas.draw()
+
+        text = (f"Burn-average {NAMES[kind]} efficiency: {100 * burn['average']:.1f}% "
+                f"(theoretical {burn['theory_average']:.1f} {UNITS[kind]}, {os.path.basename(path)})")
+        if burn["outside"] > 0:
+            text += f"; {100 * burn['outside']:.1f}% of samples outside the table (clamped)"
+        label.config(text=text)
+        print(text)
+
+    tk.Button(plot_win, text="Efficiency vs Theory", command=run_efficiency).pack(pady=5)
+    label.pack(pady=2)
@@ -0,0 +1,100 @@
+
+# handlers/uncertainty_bands.py
+import tkinter as tk
+from tkinter import messagebox
+from uncertainty import propagate, DEFAULT_SIGMAS
+
+# Dialog labels for every error source in uncertainty.DEFAULT_SIGMAS
+SIGMA_LABELS = {
+    "thrust_gain": "Load cell gain (1σ, fraction)",
+    "thrust_offset": "Load cell offset (1σ, lbf)",
+    "pc_gain": "Pc transducer gain (1σ, fraction)",
+    "pc_offset": "Pc transducer offset (1σ, psi)",
+    "mdot": "Mass flow (1σ, fraction)",
+    "throat_area": "Throat area (1σ, fraction)",
+}
+UNITS = {"isp": "s", "ve": "m/s", "c_star": "m/s"}
+
+
+def _prompt_sigmas(app, kind):
+    """Modal entry form → ({source: sigma}, n_samples) or None."""
+    keys = ["thrust_gain", "thrust_offset", "mdot"] if kind in ("isp", "ve") \
+        else ["pc_gain", "pc_offset", "mdot", "throat_area"]
+    saved = app.ctx.params.get("sigmas", {})
+    vars_ = {k: tk.StringVar(value=str(saved.get(k, DEFAULT_SIGMAS[k]))) for k in keys}
+    n_var = tk.StringVar(value="10000")
+    result = {}
+
+    win = tk.Toplevel(app)
+    win.title("Measurement Uncertainty")
+    win.geometry("460x320")
+    for k in keys:
+        row = tk.Frame(win)
+        row.pack(anchor="w", padx=8, pady=2)
+        tk.Label(row, text=SIGMA_LABELS[k], width=32, anchor="w").pack(side=tk.LEFT)
+        tk.Entry(row, textvariable=vars_[k], width=10).pack(side=tk.LEFT)
+    row = tk.Frame(win)
+    row.pack(anchor="w", padx=8, pady=8)
+    tk.Label(row, text="Monte Carlo samples", width=32, anchor="w").pack(side=tk.LEFT)
+    tk.Entry(row, textvariable=n_var, width=10).pack(side=tk.LEFT)
+
+    def confirm():
+        try:
+            result["sigmas"] = {k: float(v.get()) for k, v in vars_.items()}
+            result["n"] = max(100, int(n_var.get()))
+        except ValueError:
+            messagebox.showerror("Error", "All entries must be numbers.", parent=win)
+            return
+        win.destroy()
+
+    tk.Button(win, text="Run", command=confirm).pack(pady=10)
+    win.transient(app)
+    win.grab_set()
+    app.wait_window(win)
+    if not result:
+        return None
+    app.ctx.params.setdefault("sigmas", {}).update(result["sigmas"])
+    return result["sigmas"], result["n"]
+
+
+def attach(app, plot_win, ax, canvas, kind, time, x, mdot_lbs, throat_area=None):
+    """Add an 'Uncertainty Bands' button to a quick plot window."""
+    ctx = app.ctx
+    label = tk.Label(plot_win, text="", font=("Arial", 12))
+    artists = []
+
+    def run_bands():
+        opts = _prompt_sigmas(app, kind)
+        if opts is None:
+            return
+        sigmas, n_samples = opts
+
+        # Full-resolution burn window for the integrated metric
+        burn_time = burn_x = None
+        if ctx.initial_mask is not None:
+            burn_time = ctx.df[ctx.time_col].values[ctx.initial_mask]
+            if kind == "c_star":
+                burn_x = ctx.df[ctx.chamber_col].values[ctx.initial_mask]
+            else:
+                burn_x = ctx.df.loc[ctx.initial_mask, ctx.thrust_cols].sum(axis=1).values
+
+        res = propagate(kind, time, x, mdot_lbs, throat_area, sigmas, n_samples,
+                        burn_time=burn_time, burn_x=burn_x)
+        for a in artists:
+            a.remove()
+        artists.clear()
+        lo, p16, med, p84, hi = res["bands"]
+        artists.append(ax.fill_between(time, lo, hi, color="gray", alpha=0.2, label="95% band"))
+        artists.append(ax.fill_between(time, p16, p84, color="gray", alpha=0.35, label="68% band"))
+        ax.legend()
+        canvas.draw()
+
+        s = res["summary"]
+        unit = UNITS[kind]
+        text = (f"Burn average: {s['mean']:.3f} ± {s['std']:.3f} {unit} "
+                f"(95%: {s['low']:.3f} – {s['high']:.3f})")
+        label.config(text=text)
+        print(text)
+
+    tk.Button(plot_win, text="Uncertainty Bands", command=run_bands).pack(pady=5)
+    label.pack(pady=2)
@@ -0,0 +1,217 @@
+
+# handlers/windowed_stats.py
+import numpy as np
+import pandas as pd
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import window_stats
+import despike
+import render_cache
+from channel_browser import pick_one
+from utils import quick_stats
+
+REGIONS = ("Steady state", "Burn window", "All loaded data")
+VIEWS = ("Summary", "Blocks")
+TOTAL_THRUST = "Total Thrust"
+PLOT_POINTS = 20_000  # Max points drawn for the rolling plot
+
+
+def _numeric_columns(ctx):
+    return [c for c in ctx.df.columns
+            if c != ctx.time_col and pd.api.types.is_numeric_dtype(ctx.df[c].dtype)]
+
+
+def _burn_rows(ctx):
+    """(start, stop) rows of the burn mask, or the whole frame without one."""
+    mask = ctx.initial_mask
+    if mask is None or not mask.any():
+        return 0, len(ctx.df)
+    return int(np.argmax(mask)), len(mask) - int(np.argmax(mask[::-1]))
+
+
+def _reference(ctx, name):
+    return despike.thrust_total(ctx) if name == TOTAL_THRUST else despike.channel(ctx, name)
+
+
+def run(app):
+    ctx = app.ctx
+    if ctx.df is None or ctx.time_col is None:
+        messagebox.showerror("Error", "Load data first.")
+        return
+    columns = _numeric_columns(ctx)
+    if not columns:
+        messagebox.showerror("Error", "No numeric channels loaded.")
+        return
+    time = ctx.df[ctx.time_col].to_numpy(dtype=float)
+
+    win = tk.Toplevel(app)
+    win.title("Windowed Statistics")
+    win.geometry("1400x950")
+
+    # Options
+    bar = tk.Frame(win)
+    bar.pack(side=tk.TOP, fill=tk.X, pady=6)
+    tk.Label(bar, text="Window (s):").pack(side=tk.LEFT, padx=4)
+    window_var = tk.StringVar(value=str(ctx.params.get("stats_window", window_stats.DEFAULT_WINDOW_S)))
+    tk.Entry(bar, textvariable=window_var, width=8).pack(side=tk.LEFT)
+    tk.Label(bar, text="Region:").pack(side=tk.LEFT, padx=4)
+    region_var = tk.StringVar(value=REGIONS[0])
+    tk.OptionMenu(bar, region_var, *REGIONS).pack(side=tk.LEFT)
+    tk.Label(bar, text="Steady state from:").pack(side=tk.LEFT, padx=4)
+    refs = ([TOTAL_THRUST] if ctx.thrust_cols else []) + columns
+    ref_var = tk.StringVar(value=refs[0])
+
+    def pick_reference():
+        # Searchable picker: wide files have hundreds of channels
+        col = pick_one(win, "Steady-State Reference", refs, ref_var.get(),
+                       stats_fn=lambda c: quick_stats(ctx, c) if c != TOTAL_THRUST else "sum of thrust channels")
+        if col:
+            ref_var.set(col)
+
+    tk.Button(bar, textvariable=ref_var, command=pick_reference, width=18).pack(side=tk.LEFT)
+    tk.Label(bar, text="View:").pack(side=tk.LEFT, padx=4)
+    view_var = tk.StringVar(value=VIEWS[0])
+    tk.OptionMenu(bar, view_var, *VIEWS).pack(side=tk.LEFT)
+    tk.Label(bar, text="Block statistic:").pack(side=tk.LEFT, padx=4)
+    stat_labels = {v: k for k, v in window_stats.LABELS.items()}
+    stat_var = tk.StringVar(value=window_stats.LABELS["mean"])
+    tk.OptionMenu(bar, stat_var, *stat_labels).pack(side=tk.LEFT)
+
+    info = tk.Label(win, text="", font=("Arial", 12))
+    info.pack(side=tk.TOP, pady=2)
+
+    # Rolling plot of the selected channel
+    fig, ax = plt.subplots(figsize=(12, 3.5), dpi=100)
+    canvas = FigureCanvasTkAgg(fig, master=win)
+    canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+    NavigationToolbar2Tk(canvas, win).update()
+
+    # Results table
+    table_frame = tk.Frame(win)
+    table_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+    tree = ttk.Treeview(table_frame, show="headings", height=12)
+    scroll_y = tk.Scrollbar(table_frame, command=tree.yview)
+    scroll_x = tk.Scrollbar(table_frame, orient=tk.HORIZONTAL, command=tree.xview)
+    tree.config(yscrollcommand=scroll_y.set, xscrollcommand=scroll_x.set)
+    scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+    scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    state = {"df": pd.DataFrame(), "rows": (0, len(ctx.df)), "window": 2, "steady": None}
+
+    def rows_for_region(window):
+        start, stop = _burn_rows(ctx)
+        state["steady"] = None
+        if region_var.get() == "All loaded data":
+            return 0, len(ctx.df)
+        if region_var.get() == "Steady state":
+            ref = _reference(ctx, ref_var.get())
+            key = (render_cache.dataset_key(ctx), "steady_state", ref_var.get(), window, despike.settings_key(ctx))
+            steady = render_cache.cache.get_or_build(key, lambda: window_stats.steady_state(time, ref, window))
+            if steady is not None:
+                state["steady"] = steady
+                return steady["start"], steady["stop"]
+        return start, stop
+
+    def show_table(df):
+        state["df"] = df
+        shown = df if view_var.get() == "Summary" else \
+            df[["Block Start (s)", "Block End (s)"] + [c for c in df.columns
+                                                         if c.endswith(f"[{stat_var.get()}]")]]
+        tree.delete(*tree.get_children())
+        tree["columns"] = list(shown.columns)
+        for c in shown.columns:
+            tree.heading(c, text=c)
+            tree.column(c, width=200 if c == "Channel" else 110, anchor="w", stretch=False)
+        for i, row in enumerate(shown.itertuples(index=False)):
+            tree.insert("", tk.END, iid=str(i), values=[_fmt(v) for v in row])
+
+    def compute(*_):
+        try:
+            seconds = float(window_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Invalid window length.", parent=win)
+            return
+        ctx.params["stats_window"] = seconds
+        window = window_stats.window_rows(time, seconds)
+        start, stop = rows_for_region(window)
+        state.update(rows=(start, stop), window=window)
+
+        # Every channel in one (rows x channels) pass, cached per dataset / region / window
+        view = view_var.get()
+        key = (render_cache.dataset_key(ctx), "window_stats", tuple(columns), start, stop, window, view)
+
+        def build():
+            x = ctx.df[columns].iloc[start:stop].to_numpy(dtype=float)  # Slice before converting
+            if view == "Summary":
+                out = {"Channel": list(columns)}
+                out.update({window_stats.LABELS[s]: v for s, v in window_stats.region(x).items()})
+                return out
+            stats = window_stats.block(x, window)
+            n_blocks = len(next(iter(stats.values())))
+            t0 = time[start:start + n_blocks * window:window]
+            out = {"Block Start (s)": t0, "Block End (s)": time[start + window - 1:start + n_blocks * window:window]}
+            for i, c in enumerate(columns):
+                for s, v in stats.items():
+                    out[f"{c} [{window_stats.LABELS[s]}]"] = v[:, i]
+            return out
+
+        show_table(pd.DataFrame(render_cache.cache.get_or_build(key, build)))  # Arrays cached, sized by the LRU
+
+        steady = state["steady"]
+        if steady is not None:
+            text = (f"Steady state ({ref_var.get()}): {steady['t0']:.3f}–{steady['t1']:.3f} s "
+                    f"at {steady['level']:.4g}")
+        elif region_var.get() == "Steady state":
+            text = "No steady region found: using the burn window"
+        else:
+            text = f"{region_var.get()}: {time[start]:.3f}–{time[stop - 1]:.3f} s" if stop > start else "Empty region"
+        if ctx.despike:  # The region is found on the despiked reference; the table is not despiked
+            text += "; table statistics from raw channels"
+        info.config(text=text + f"  (window {window} samples)")
+        plot_channel()
+
+    def plot_channel():
+        # The selected summary row, else the steady-state reference channel
+        sel = tree.selection()
+        name = columns[int(sel[0])] if sel and view_var.get() == "Summary" else ref_var.get()
+        x = _reference(ctx, name) if name == TOTAL_THRUST else ctx.df[name].to_numpy(dtype=float)
+        roll = window_stats.rolling(x, state["window"], ("mean", "min", "max"))
+        step = max(1, len(x) // PLOT_POINTS)
+        ax.clear()
+        ax.fill_between(time[::step], roll["min"][::step], roll["max"][::step], color="blue", alpha=0.2,
+                        label="Rolling min–max")
+        ax.plot(time[::step], roll["mean"][::step], color="blue", linewidth=1, label="Rolling mean")
+        start, stop = state["rows"]
+        if stop > start:
+            ax.axvspan(time[start], time[stop - 1], color="green", alpha=0.1, label=region_var.get())
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel(name)
+        ax.set_title(f"{name}: rolling statistics")
+        ax.legend()
+        ax.grid(True)
+        fig.tight_layout()
+        canvas.draw()
+
+    def export_table():
+        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")],
+                                            title="Export Windowed Statistics", parent=win)
+        if path:
+            state["df"].to_csv(path, index=False)  # Blocks view exports every statistic
+            print(f"Windowed statistics saved to {path}")
+
+    buttons = tk.Frame(win)
+    buttons.pack(side=tk.BOTTOM, pady=6)
+    tk.Button(buttons, text="Compute", command=compute).pack(side=tk.LEFT, padx=4)
+    tk.Button(buttons, text="Export Table", command=export_table).pack(side=tk.LEFT, padx=4)
+    tree.bind("<<TreeviewSelect>>", lambda e: plot_channel())
+    stat_var.trace_add("write", lambda *_: show_table(state["df"]) if view_var.get() == "Blocks" else None)
+    compute()
+
+
+def _fmt(v):
+    if isinstance(v, (float, np.floating)):
+        return "" if np.isnan(v) else f"{v:.5g}"
+    return v
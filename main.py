@@ -7,7 +7,10 @@ from context import AnalyzerContext  # Custom context class for managing applica
 from handlers import (load_csv, plot_isp, plot_thrust, plot_chamber_pressure,  # Importing various handlers for specific tasks
                       plot_of_ratio, plot_fuel_weight,
                       plot_oxidizer_weight, generate_all, plot_ve_from_isp, plot_c_star,
-                      test_data, custom_plot)
+                      test_data, custom_plot, merge_csv, load_large_csv, plot_spectrum,
+                      export_data, campaign_view, calibrate, despike_settings, data_quality,
+                      plot_correlation, archive_test, open_archive, windowed_stats,
+                      formula_channels)
 from PIL import Image, ImageTk
 
 import instructions  # Ensure PIL is imported
@@ -59,6 +62,12 @@ class HotfireAnalyzerApp(tk.Tk):
 
         # Buttons for file-related actions
         tk.Button(top, text="Load CSV", command=lambda: load_csv.run(self)).pack(side=tk.LEFT, padx=100)  # Button to load CSV
+        tk.Button(top, text="Merge DAQ Files", command=lambda: merge_csv.run(self)).pack(side=tk.LEFT)  # Button to merge multi-DAQ CSVs
+        tk.Button(top, text="Load Large CSV", command=lambda: load_large_csv.run(self)).pack(side=tk.LEFT, padx=10)  # Button to open a CSV out-of-core
+        tk.Button(top, text="Open Archive", command=lambda: open_archive.run(self)).pack(side=tk.LEFT)  # Open a compressed .hdaa test archive
+        tk.Button(top, text="Calibration", command=lambda: calibrate.run(self)).pack(side=tk.LEFT)  # Per-stand load cell calibration and tare
+        tk.Button(top, text="Despike", command=lambda: despike_settings.run(self)).pack(side=tk.LEFT, padx=10)  # Spike/dropout rejection for metrics
+        tk.Button(top, text="Data Quality", command=lambda: data_quality.run(self)).pack(side=tk.LEFT)  # Load-time quality scan and repair
         
         # Label to display the currently loaded file
         self.file_label = tk.Label(top, text="No file", fg="white")  # Default text is "No file"
@@ -101,6 +110,10 @@ class HotfireAnalyzerApp(tk.Tk):
         tk.Button(plots2, text="Exhaust Velocity from Isp", command=lambda: plot_ve_from_isp.run(self)).pack(side=tk.LEFT, padx=3)  # Button for exhaust velocity from ISP
         tk.Button(plots2, text="Specific Impulse", command=lambda: plot_isp.run(self)).pack(side=tk.LEFT, padx=3)  # ISP calculation
         tk.Button(plots2, text="C* actual", command=lambda: plot_c_star.run(self)).pack(side=tk.LEFT, padx=3)  # C star button
+        tk.Button(plots2, text="Spectral Analysis", command=lambda: plot_spectrum.run(self)).pack(side=tk.LEFT, padx=3)  # PSD / spectrogram of any channel
+        tk.Button(plots2, text="Cross-Correlation", command=lambda: plot_correlation.run(self)).pack(side=tk.LEFT, padx=3)  # Lag / coherence between channels
+        tk.Button(plots2, text="Windowed Stats", command=lambda: windowed_stats.run(self)).pack(side=tk.LEFT, padx=3)  # Rolling / block stats and steady state
+        tk.Button(plots2, text="Formula Channels", command=lambda: formula_channels.run(self)).pack(side=tk.LEFT, padx=3)  # User-defined derived channels
 
         # Bottom frame for additional actions
         bottom = tk.Frame(self)  # Create a frame for bottom buttons
@@ -112,7 +125,8 @@ class HotfireAnalyzerApp(tk.Tk):
             text=(
                 "This program uses thrust data to slice other data. Once thrust hits 50% of the target, "
                 "that data is then included. If you are getting errors or the data does not look right, "
-                "use the Test Data button to ensure you actually hit 50% of your target thrust."
+                "use the Test Data button to ensure you actually hit 50% of your target thrust. "
+                "The target prompt is pre-filled with the detected thrust plateau."
             ),
             wraplength=800,
             justify="center",
@@ -122,6 +136,9 @@ class HotfireAnalyzerApp(tk.Tk):
         tk.Button(bottom, text="Test Data", command=lambda: test_data.run(self)).pack(side=tk.BOTTOM, pady=10, )  # Button to test data
         tk.Button(bottom, text="Generate All Plots", command=lambda: generate_all.run(self)).pack(side=tk.BOTTOM, pady=20)  # Button to generate all plots
         tk.Button(bottom, text="Custom Plot", command=lambda: custom_plot.run(self)).pack(side=tk.BOTTOM, pady=10, padx=50)  # Button for custom plot
+        tk.Button(bottom, text="Export Data", command=lambda: export_data.run(self)).pack(side=tk.BOTTOM, pady=10)  # Button to export windowed + derived channels
+        tk.Button(bottom, text="Archive Test", command=lambda: archive_test.run(self)).pack(side=tk.BOTTOM, pady=10)  # Button to save the test as a compressed archive
+        tk.Button(bottom, text="Campaign Trends", command=lambda: campaign_view.run(self)).pack(side=tk.BOTTOM, pady=10)  # Button for the cross-test campaign index
 
         # Add checkbox and input boxes for time-based splicing
         time_splicing_frame = tk.Frame(bottom)
@@ -169,7 +186,7 @@ class HotfireAnalyzerApp(tk.Tk):
         self.custom_splice_var.trace_add("write", _sync_apply_state)
 
         # Text widget to display metrics
-        self.metrics_text = tk.Text(self, height=6, state=tk.DISABLED, bg=self.cget("bg"), relief=tk.FLAT)  # Read-only text widget
+        self.metrics_text = tk.Text(self, height=14, state=tk.DISABLED, bg=self.cget("bg"), relief=tk.FLAT)  # Read-only text widget
         self.metrics_text.pack(fill=tk.X, padx=5, pady=5)
         
         bottom_frame = tk.Frame(self)
@@ -191,6 +208,8 @@ class HotfireAnalyzerApp(tk.Tk):
         from utils import compute_metrics
         compute_metrics(self, tgt)
         self.display_metrics()
+        import campaign_db
+        campaign_db.record_context(self)
 
 # Entry point of the application
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+# merge.py
+"""
+Merge CSV logs written by several DAQs onto one master clock.
+
+Every file is streamed with ``pd.read_csv(chunksize=...)`` so two multi-GB
+logs never have to be resident at the same time: only one master chunk and
+a short look-ahead buffer per secondary file are held in memory.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from utils import guess_columns
+import timestamps
+
+DEFAULT_CHUNKSIZE = 200_000  # Rows per chunk read from each file
+METHODS = ("interp", "nearest", "asof")  # Supported alignment methods
+
+
+class MergeSource:
+    """One input file plus how its clock maps onto the master clock."""
+    def __init__(self, path, offset=0.0, time_col=None, prefix=None):
+        self.path = path
+        self.offset = float(offset)  # Seconds added to this file's time column
+        self.time_col = time_col  # Guessed from the header when None
+        self.prefix = prefix  # Used to rename clashing column names
+        self.columns = []  # Data columns (time column excluded)
+        self.period = None  # Median sample period estimated from the first chunk
+        self.time_format = None  # timestamps.TimeFormat of the time column
+        self.start = None  # Epoch ns of the first sample when the file logs wall-clock time
+        self.epoch = None  # Epoch ns mapped to t = 0 (set by iter_merged)
+
+    def open(self, chunksize):
+        """Start a fresh chunk iterator over the file."""
+        return pd.read_csv(self.path, chunksize=chunksize, low_memory=False)
+
+    def probe(self, nrows=2000):
+        """Read the header and a few rows to find the time column and sample rate."""
+        head = pd.read_csv(self.path, nrows=nrows, low_memory=False)
+        if self.time_col is None:
+            self.time_col = guess_columns(head.columns)["time"]
+        if self.time_col is None:
+            raise ValueError(f"No time column found in {os.path.basename(self.path)}")
+        self.columns = [c for c in head.columns if c != self.time_col]
+        self.time_format = timestamps.detect(head[self.time_col])
+        if self.time_format.absolute:
+            _, self.start = timestamps.to_relative(timestamps.to_epoch_ns(head[self.time_col], self.time_format))
+            self.epoch = self.start
+        dt = np.diff(self.seconds(head) - self.offset)
+        dt = dt[np.isfinite(dt) & (dt > 0)]
+        self.period = float(np.median(dt)) if len(dt) else None
+        return self
+
+    def seconds(self, chunk):
+        """Time column of ``chunk`` in seconds on the merged clock (offset included)."""
+        col = chunk[self.time_col]
+        if self.time_format is None or not self.time_format.absolute:
+            return col.to_numpy(dtype=float) + self.offset
+        t, _ = timestamps.to_relative(timestamps.to_epoch_ns(col, self.time_format), self.epoch)
+        return t + self.offset
+
+    @property
+    def rate(self):
+        return 1.0 / self.period if self.period else 0.0
+
+
+class _SourceStream:
+    """Look-ahead buffer that keeps just enough rows to cover a master chunk."""
+    def __init__(self, source, chunksize, rename):
+        self.source = source
+        self.rename = rename
+        self.reader = source.open(chunksize)
+        self.exhausted = False
+        self.t = np.empty(0)
+        self.values = np.empty((0, len(source.columns)))
+
+    def _pull(self):
+        try:
+            chunk = next(self.reader)
+        except StopIteration:
+            self.exhausted = True
+            return
+        t = self.source.seconds(chunk)
+        v = chunk[self.source.columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        self.t = np.concatenate([self.t, t])
+        self.values = np.concatenate([self.values, v])
+
+    def align(self, t_master, method, tolerance):
+        """Return this source's columns sampled on ``t_master``."""
+        # Read ahead until the buffer extends past the end of the master chunk
+        while not self.exhausted and (len(self.t) == 0 or self.t[-1] < t_master[-1]):
+            self._pull()
+
+        out = np.full((len(t_master), self.values.shape[1]), np.nan)
+        if len(self.t):
+            if method == "interp":
+                for j in range(self.values.shape[1]):
+                    out[:, j] = np.interp(t_master, self.t, self.values[:, j],
+                                          left=np.nan, right=np.nan)
+            else:
+                # Index of the last sample at or before each master time (as-of join)
+                idx = np.searchsorted(self.t, t_master, side="right") - 1
+                if method == "nearest":
+                    nxt = np.minimum(idx + 1, len(self.t) - 1)
+                    prev = np.maximum(idx, 0)
+                    use_next = (idx < 0) | (np.abs(self.t[nxt] - t_master) < np.abs(t_master - self.t[prev]))
+                    idx = np.where(use_next, nxt, prev)
+                valid = idx >= 0
+                gap = np.abs(t_master - self.t[np.maximum(idx, 0)])
+                if tolerance is not None:
+                    valid &= gap <= tolerance
+                out[valid] = self.values[idx[valid]]
+
+        # Drop rows the next master chunk can no longer need (keep one before it)
+        keep = max(np.searchsorted(self.t, t_master[-1], side="right") - 1, 0)
+        self.t = self.t[keep:]
+        self.values = self.values[keep:]
+        return pd.DataFrame(out, columns=self.rename)
+
+
+def _output_names(sources, master_idx):
+    """Map every source's data columns to unique names in the merged frame."""
+    master = sources[master_idx]
+    taken = {master.time_col}
+    names = []
+    for i, src in enumerate(sources):
+        cols = []
+        for c in src.columns:
+            name = c
+            if name in taken:
+                prefix = src.prefix or os.path.splitext(os.path.basename(src.path))[0]
+                name = f"{prefix}: {c}"
+            taken.add(name)
+            cols.append(name)
+        names.append(cols)
+    return names
+
+
+def iter_merged(sources, master=None, method="interp", tolerance=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield merged DataFrame chunks on the master file's clock.
+
+    ``master`` is the index of the master source; by default the file with the
+    highest sample rate is used. ``tolerance`` (s) limits how far an as-of or
+    nearest match may be; by default it is 1.5 sample periods of each source.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown merge method '{method}'")
+    for src in sources:
+        if not src.columns:
+            src.probe()
+    if master is None:
+        master = int(np.argmax([s.rate for s in sources]))
+    names = _output_names(sources, master)
+    m_src = sources[master]
+    # Wall-clock files line up on their absolute time: t = 0 is the master's first
+    # sample (or the earliest start when the master logs relative seconds)
+    starts = [s.start for s in sources if s.start is not None]
+    if starts:
+        epoch = m_src.start if m_src.start is not None else min(starts)
+        for src in sources:
+            if src.start is not None:
+                src.epoch = epoch
+
+    streams = {}
+    for i, src in enumerate(sources):
+        if i != master:
+            streams[i] = _SourceStream(src, chunksize, names[i])
+
+    for chunk in m_src.open(chunksize):
+        t = m_src.seconds(chunk)
+        if not len(t):
+            continue
+        parts = [pd.DataFrame({m_src.time_col: t})]
+        for i in range(len(sources)):
+            if i == master:
+                block = chunk[m_src.columns].reset_index(drop=True)
+                block.columns = names[i]
+                parts.append(block)
+            else:
+                src = sources[i]
+                tol = tolerance
+                if tol is None and method != "interp" and src.period:
+                    tol = 1.5 * src.period
+                parts.append(streams[i].align(t, method, tol))
+        yield pd.concat(parts, axis=1)
+
+
+def merge_files(sources, master=None, method="interp", tolerance=None,
+                chunksize=DEFAULT_CHUNKSIZE, out_path=None):
+    """
+    Merge ``sources`` chunk by chunk.
+
+    Returns the merged DataFrame, or streams it to ``out_path`` (CSV) and
+    returns the path so the merged result never has to be fully resident.
+    """
+    chunks = iter_merged(sources, master, method, tolerance, chunksize)
+    if out_path is None:
+        frames = list(chunks)
+        if not frames:
+            raise ValueError("Master file contains no rows")
+        return pd.concat(frames, ignore_index=True)
+
+    header = True
+    with open(out_path, "w", newline="") as fh:
+        for frame in chunks:
+            frame.to_csv(fh, index=False, header=header)
+            header = False
+    return out_path
@@ -0,0 +1,313 @@
+# ooc.py
+"""
+Out-of-core channel store for logs larger than RAM.
+
+A CSV is converted once, chunk by chunk, into one raw float64 file per
+channel inside ``<file>.hdaa_store/``.  Channels are then opened as read-only
+``np.memmap`` arrays, so metrics stream over chunks and plots only ever touch
+the rows they need (a decimated summary or a full-resolution window).
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+import calibration
+import despike
+import timestamps
+from utils import guess_columns
+
+STORE_SUFFIX = ".hdaa_store"
+META_FILE = "meta.json"
+CHUNK_ROWS = 1_000_000  # Rows per streaming chunk
+WINDOW_MARGIN = 0.03  # Extra rows loaded around the burn (matches the 3% Extra Data slider max)
+PROBE_BLOCKS = 16  # Contiguous blocks read for channel-wide estimates (despike noise floor)...
+PROBE_ROWS = 1 << 16  # ...of this many rows each
+
+
+def _safe_name(i, col):
+    keep = "".join(ch if ch.isalnum() else "_" for ch in str(col))[:40]
+    return f"{i:04d}_{keep}.f64"
+
+
+class ChannelStore:
+    """Memory-mapped per-channel storage built from a CSV."""
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE)) as fh:
+            self.meta = json.load(fh)
+        self.columns = self.meta["columns"]
+        self.n_rows = self.meta["n_rows"]
+        self.time_col = None  # Set by the loader once columns are inferred
+        self._arrays = {}
+        self._summaries = {}
+
+    # ---------- building ----------
+    @classmethod
+    def build(cls, csv_path, directory=None, chunksize=CHUNK_ROWS, progress=None):
+        """Convert ``csv_path`` into a store (reused if already up to date)."""
+        directory = directory or csv_path + STORE_SUFFIX
+        st = os.stat(csv_path)
+        meta_path = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as fh:
+                meta = json.load(fh)
+            if meta.get("source_size") == st.st_size and meta.get("source_mtime") == st.st_mtime:
+                return cls(directory)
+
+        os.makedirs(directory, exist_ok=True)
+        columns, files, handles = None, {}, {}
+        n_rows = 0
+        time_col, time_fmt, origin = None, None, None
+        try:
+            for chunk in pd.read_csv(csv_path, chunksize=chunksize, low_memory=False):
+                if columns is None:
+                    columns = list(chunk.columns)
+                    files = {c: _safe_name(i, c) for i, c in enumerate(columns)}
+                    handles = {c: open(os.path.join(directory, files[c]), "wb") for c in columns}
+                    # A wall-clock time column is stored as seconds from its first sample
+                    time_col = guess_columns(columns)["time"]
+                    if time_col is not None:
+                        time_fmt = timestamps.detect(chunk[time_col])
+                for c in columns:
+                    if c == time_col and time_fmt.absolute:
+                        vals, origin = timestamps.to_relative(timestamps.to_epoch_ns(chunk[c], time_fmt), origin)
+                    else:
+                        vals = pd.to_numeric(chunk[c], errors="coerce").to_numpy(dtype=np.float64)
+                    handles[c].write(vals.tobytes())
+                n_rows += len(chunk)
+                if progress:
+                    progress(n_rows)
+        finally:
+            for fh in handles.values():
+                fh.close()
+        if columns is None:
+            raise ValueError("CSV contains no data")
+
+        meta = {"columns": columns, "files": files, "n_rows": n_rows,
+                "source": os.path.abspath(csv_path),
+                "source_size": st.st_size, "source_mtime": st.st_mtime}
+        if origin is not None:
+            meta["time_origin"] = {time_col: origin}  # Epoch ns of t = 0
+            meta["time_format"] = time_fmt.kind
+        with open(meta_path, "w") as fh:
+            json.dump(meta, fh)
+        return cls(directory)
+
+    # ---------- access ----------
+    def array(self, col):
+        """Read-only memmap of one channel (nothing is read until sliced)."""
+        if col not in self._arrays:
+            path = os.path.join(self.directory, self.meta["files"][col])
+            self._arrays[col] = np.memmap(path, dtype=np.float64, mode="r", shape=(self.n_rows,))
+        return self._arrays[col]
+
+    def iter_chunks(self, cols, start=0, stop=None, chunksize=CHUNK_ROWS):
+        """Yield (offset, {col: ndarray}) over [start, stop)."""
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        for i in range(start, stop, chunksize):
+            j = min(i + chunksize, stop)
+            yield i, {c: np.asarray(self.array(c)[i:j]) for c in cols}
+
+    def frame(self, start, stop, cols=None):
+        """Materialise rows [start, stop) as an ordinary DataFrame."""
+        cols = cols or self.columns
+        index = pd.RangeIndex(start, stop)
+        return pd.DataFrame({c: np.array(self.array(c)[start:stop]) for c in cols}, index=index)
+
+    def coarse(self, cols, max_points, transform=None):
+        """
+        Sum of ``cols`` at every k-th row (at most ~``max_points`` values) for
+        quick estimates; ``transform`` maps the {col: array} sample first.
+        """
+        step = max(1, self.n_rows // max_points)
+        arrs = {c: np.asarray(self.array(c)[::step], dtype=float) for c in cols}
+        return sum((transform(arrs) if transform else arrs).values())
+
+    def probe(self, cols, blocks=PROBE_BLOCKS, rows=PROBE_ROWS):
+        """Evenly spaced contiguous row blocks [{col: array}] for channel-wide estimates."""
+        if self.n_rows <= blocks * rows:
+            starts, rows = [0], self.n_rows
+        else:
+            starts = np.linspace(0, self.n_rows - rows, blocks).astype(int)
+        out = []
+        for s in starts:
+            frame = self.frame(int(s), int(s) + rows, cols)
+            out.append({c: frame[c].to_numpy(dtype=float) for c in cols})
+        return out
+
+    def _chunks(self, cols, start, stop, transform, chunksize=CHUNK_ROWS):
+        """
+        ``iter_chunks`` with ``transform`` applied to each chunk; a transform
+        with a ``halo`` (rows of context it needs) gets that many extra rows on
+        each side, trimmed off again afterwards.
+        """
+        halo = getattr(transform, "halo", 0)
+        if not halo:
+            for off, arrs in self.iter_chunks(cols, start, stop, chunksize):
+                yield off, (transform(arrs) if transform is not None else arrs)
+            return
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        for i in range(start, stop, chunksize):
+            j = min(i + chunksize, stop)
+            lo, hi = max(0, i - halo), min(self.n_rows, j + halo)
+            frame = self.frame(lo, hi, cols)
+            arrs = transform({c: frame[c].to_numpy(dtype=float) for c in cols})
+            yield i, {c: v[i - lo:j - lo] for c, v in arrs.items()}
+
+    def index_range(self, t0, t1):
+        """Row range covering times [t0, t1] (binary search on the time memmap)."""
+        t = self.array(self.time_col)
+        return int(np.searchsorted(t, t0, side="left")), int(np.searchsorted(t, t1, side="right"))
+
+    def summary(self, cols, start=0, stop=None, n_bins=4000, transform=None):
+        """
+        Min/max envelope of the sum of ``cols`` over [start, stop).
+
+        Returns (time, values) with every bin contributing its min and max, or
+        the full-resolution samples when the range already fits in ``n_bins``.
+        ``transform`` maps each chunk first (see ``ChunkFilter``); results are
+        only cached for transforms that carry a ``key``.
+        """
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        key = (tuple(cols), start, stop, n_bins, getattr(transform, "key", None))
+        cacheable = transform is None or key[-1] is not None
+        if cacheable and key in self._summaries:
+            return self._summaries[key]
+
+        n = stop - start
+        if n <= 2 * n_bins:
+            arrs = next(self._chunks([self.time_col, *cols], start, stop, transform, max(n, 1)),
+                        (start, {c: np.empty(0) for c in [self.time_col, *cols]}))[1]
+            t = np.array(arrs[self.time_col])
+            y = np.zeros(n)
+            for c in cols:
+                y += arrs[c]
+            result = (t, y)
+        else:
+            b = int(np.ceil(n / n_bins))  # Rows per bin
+            step = max(b, (CHUNK_ROWS // b) * b)  # Chunk size aligned to bins
+            ts, ys = [], []
+            for off, arrs in self._chunks([self.time_col, *cols], start, stop, transform, step):
+                y = np.zeros(len(arrs[self.time_col]))
+                for c in cols:
+                    y += arrs[c]
+                full = (len(y) // b) * b
+                blocks = y[:full].reshape(-1, b)
+                t_blocks = arrs[self.time_col][:full:b]
+                lo, hi = np.nanmin(blocks, axis=1), np.nanmax(blocks, axis=1)
+                ts.append(np.repeat(t_blocks, 2))
+                ys.append(np.column_stack([lo, hi]).ravel())
+                if full < len(y):  # Ragged tail of the last chunk
+                    ts.append(np.repeat(arrs[self.time_col][full], 2))
+                    ys.append(np.array([np.nanmin(y[full:]), np.nanmax(y[full:])]))
+            result = (np.concatenate(ts), np.concatenate(ys))
+        if cacheable:
+            self._summaries[key] = result
+        return result
+
+    # ---------- streaming metrics ----------
+    def burn_scan(self, thrust_cols, lower, upper, chamber_col=None, start=0, stop=None, transform=None):
+        """
+        One streaming pass over rows [start, stop) (the whole file by default)
+        computing what ``compute_metrics`` needs: first/last in-range row, burn
+        time, trapezoidal impulse over the in-range samples and peak chamber
+        pressure.  ``transform`` maps each {col: array} chunk before it is
+        used (see ``ChunkFilter``), so thresholds and sums see the same
+        calibrated, despiked values as ``ctx.df``.
+        """
+        cols = [self.time_col, *thrust_cols] + ([chamber_col] if chamber_col else [])
+        first = last = None
+        t_first = t_last = None
+        impulse = 0.0
+        prev = None  # (t, F) of the last in-range sample from the previous chunk
+        peak = -np.inf
+        for off, arrs in self._chunks(cols, start, stop, transform):
+            t = arrs[self.time_col]
+            f = np.zeros(len(t))
+            for c in thrust_cols:
+                f += arrs[c]
+            if chamber_col:
+                peak = max(peak, np.nanmax(arrs[chamber_col]))
+            idx = np.flatnonzero((f >= lower) & (f <= upper))
+            if not len(idx):
+                continue
+            ts, fs = t[idx], f[idx]
+            if prev is not None:  # Bridge from the previous chunk like np.trapz over t[mask]
+                ts = np.concatenate([[prev[0]], ts])
+                fs = np.concatenate([[prev[1]], fs])
+            impulse += float(np.sum(0.5 * (fs[1:] + fs[:-1]) * np.diff(ts)))
+            if first is None:
+                first, t_first = off + int(idx[0]), float(t[idx[0]])
+            last, t_last = off + int(idx[-1]), float(t[idx[-1]])
+            prev = (ts[-1], fs[-1])
+        if first is None:
+            return None
+        return {"start": first, "stop": last + 1, "burn_time": t_last - t_first,
+                "impulse": impulse, "peak_pressure": None if peak == -np.inf else float(peak)}
+
+
+class ChunkFilter:
+    """
+    What ``ctx.df`` gets in memory, applied to streamed {col: array} chunks:
+    the stand calibration, then spike rejection.  The Hampel filter sees
+    ``halo`` rows past each chunk edge and one noise floor per channel (from
+    ``store.probe``), so chunk boundaries do not change the result.
+    """
+    def __init__(self, ctx, store, cols):
+        self.ctx = ctx
+        self.time_col = store.time_col
+        self.floors = {}
+        self.halo = 0
+        settings = ctx.despike
+        # Identifies the output for cached summaries: calibration (with its tares) and despike settings
+        self.key = (json.dumps(ctx.calibration_report, sort_keys=True, default=str), despike.settings_key(ctx))
+        if settings:
+            self.window = settings.get("window", despike.DEFAULT_WINDOW)
+            self.threshold = settings.get("threshold", despike.DEFAULT_THRESHOLD)
+            self.halo = 2 * (int(self.window) | 1)  # Median of the samples, then median of the deviations
+            chans = [c for c in cols if c != store.time_col]
+            blocks = [self.calibrate(b) for b in store.probe(chans)]
+            self.floors = {c: despike.noise_floor([b[c] for b in blocks]) for c in chans}
+
+    def calibrate(self, arrs):
+        return calibration.calibrate_arrays(self.ctx, arrs)
+
+    def __call__(self, arrs):
+        arrs = dict(self.calibrate(arrs))
+        t = arrs.get(self.time_col)
+        for c, floor in self.floors.items():
+            if c in arrs:
+                arrs[c] = despike.hampel(t, arrs[c], self.window, self.threshold, floor)[0]
+        return arrs
+
+
+def refresh_window(app, target_thrust):
+    """
+    Stream the store for the current splice/target and load only the burn
+    window (plus margin) into ``ctx.df`` so every handler keeps working.
+    Returns the streamed metrics, or None when the window is empty.
+    """
+    ctx = app.ctx
+    store = ctx.store
+    store.time_col = ctx.time_col
+    use_custom_splice = hasattr(app, "custom_splice_var") and app.custom_splice_var.get()
+    if use_custom_splice:
+        t0, t1 = float(app.custom_splice_start.get()), float(app.custom_splice_end.get())
+        start, stop = store.index_range(t0, t1)
+        scan = None
+    else:
+        cols = ctx.thrust_cols + ([ctx.chamber_col] if ctx.chamber_col else [])
+        scan = store.burn_scan(ctx.thrust_cols, 0.5 * target_thrust, 1.5 * target_thrust, ctx.chamber_col,
+                               transform=ChunkFilter(ctx, store, cols))
+        if scan is None:
+            return None
+        start, stop = scan["start"], scan["stop"]
+    if stop <= start:
+        return None
+
+    margin = int(store.n_rows * WINDOW_MARGIN) + 1
+    lo, hi = max(0, start - margin), min(store.n_rows, stop + margin)
+    if ctx.df is None or len(ctx.df) == 0 or ctx.df.index[0] != lo or ctx.df.index[-1] != hi - 1:
+        ctx.df = calibration.apply_frame(ctx, store.frame(lo, hi))  # Keep the stand calibration
+    return scan
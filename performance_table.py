@@ -0,0 +1,213 @@
+# performance_table.py
+"""
+Theoretical c* / Isp lookup tables (e.g. exported from NASA CEA).
+
+A table of c* and Isp against O/F and chamber pressure is read once into a
+rectangular grid (gaps filled by interpolation along each axis) and cached
+per file.  ``PerformanceTable.lookup`` then does a vectorised bilinear
+interpolation for whole O/F and Pc time series in one call, so c* and Isp
+efficiencies can be computed sample by sample over millions of rows.
+
+Accepted files: delimited tables with O/F, Pc, c* and Isp columns (units in
+parentheses, e.g. "Pc (bar)", "Isp (m/s)"), or CEA's own text output.
+Grids are stored in psia, m/s (c*) and s (Isp).
+"""
+
+import os
+import re
+import numpy as np
+import pandas as pd
+from utils import extract_unit, trapz
+
+G0 = 9.80665  # m/s^2
+G_FT_S2 = 32.174
+FT_TO_M = 0.3048
+CHUNK = 1 << 16  # Samples per lookup pass
+ATM_PSI = 14.696  # Default offset from gauge to absolute chamber pressure
+PSI_PER = {"psi": 1.0, "psia": 1.0, "bar": 14.5038, "atm": 14.6959, "mpa": 145.038, "kpa": 0.145038}
+ROLES = {  # Header patterns per quantity, checked in order
+    "of": re.compile(r"o/f|\bof\b|mixture|\bmr\b"),
+    "pc": re.compile(r"\bpc\b|p_c|chamber|pressure|^p\b"),
+    "c_star": re.compile(r"c\*|c_?star"),
+    "isp": re.compile(r"isp|ivac"),
+}
+_tables = {}  # (path, mtime, size) -> PerformanceTable
+
+
+def _number(text):
+    """CEA number, including its exponent shorthand ("1.9906-3" = 1.9906e-3)."""
+    m = re.fullmatch(r"(-?\d*\.?\d+)([-+]\d+)?", text)
+    if m is None:
+        raise ValueError(text)
+    return float(m.group(1)) * 10.0 ** int(m.group(2) or 0)
+
+
+def _read_cea_output(text):
+    """Points from CEA text output: one case per "O/F=" block (Pc = chamber P, Isp = last exit)."""
+    rows = []
+    for block in re.split(r"(?=\bO/F=)", text)[1:]:
+        case = {"of": _number(block.split()[1])}
+        for line in block.splitlines()[1:]:
+            label, _, rest = line.strip().partition("  ")
+            try:
+                values = [_number(v) for v in rest.split()]
+            except ValueError:
+                continue
+            if not values:
+                continue
+            label = label.strip().upper()
+            if label.startswith("P,") and "pc" not in case:
+                case["pc"] = values[0] * PSI_PER.get(label[2:].strip().lower(), 1.0)
+            elif label == "CSTAR, M/SEC" and "c_star" not in case:
+                case["c_star"] = values[0]
+            elif label == "ISP, M/SEC":
+                case["isp"] = values[-1] / G0
+        if len(case) == 4:
+            rows.append(case)
+    if not rows:
+        raise ValueError("No O/F cases with P, CSTAR and Isp found in the CEA output")
+    return pd.DataFrame(rows)
+
+
+def _read_delimited(path):
+    """Points from a delimited table, converted to psia, m/s and s."""
+    df = pd.read_csv(path, sep=None, engine="python")
+    out = {}
+    for role, pattern in ROLES.items():
+        col = next((c for c in df.columns if c not in out.values() and pattern.search(str(c).lower())), None)
+        if col is None:
+            raise ValueError(f"No {role} column found (columns: {', '.join(map(str, df.columns))})")
+        out[role] = col
+    unit = lambda c: (extract_unit(str(c)) or "").strip().lower()
+    points = pd.DataFrame({r: pd.to_numeric(df[c], errors="coerce") for r, c in out.items()})
+    points["pc"] *= PSI_PER.get(unit(out["pc"]), 1.0)
+    if unit(out["c_star"]) in ("ft/s", "ft/sec"):
+        points["c_star"] *= FT_TO_M
+    if unit(out["isp"]) in ("m/s", "m/sec"):
+        points["isp"] /= G0
+    elif unit(out["isp"]) in ("ft/s", "ft/sec"):
+        points["isp"] /= G_FT_S2
+    return points.dropna()
+
+
+def _fill(grid):
+    """Fill NaN cells by linear interpolation along O/F rows, then along Pc columns."""
+    for axis in (1, 0):
+        g = grid if axis == 1 else grid.T
+        for row in g:
+            ok = np.isfinite(row)
+            if ok.any() and not ok.all():
+                idx = np.arange(len(row))
+                row[~ok] = np.interp(idx[~ok], idx[ok], row[ok])
+    return grid
+
+
+class PerformanceTable:
+    """c* and Isp on a rectangular (O/F, Pc) grid with vectorised bilinear lookup."""
+    def __init__(self, points, source=None):
+        points = points.groupby(["of", "pc"], as_index=False)[["c_star", "isp"]].mean()
+        self.source = source
+        self.n_points = len(points)
+        self.of = np.unique(points["of"].to_numpy(dtype=float))
+        self.pc = np.unique(points["pc"].to_numpy(dtype=float))
+        grid = np.full((2, len(self.of), len(self.pc)), np.nan)
+        i = np.searchsorted(self.of, points["of"].to_numpy(dtype=float))
+        j = np.searchsorted(self.pc, points["pc"].to_numpy(dtype=float))
+        grid[0, i, j] = points["c_star"].to_numpy(dtype=float)
+        grid[1, i, j] = points["isp"].to_numpy(dtype=float)
+        for g in grid:
+            _fill(g)
+        # A single O/F or Pc value is a constant along that axis: give it a second node
+        if len(self.of) == 1:
+            self.of, grid = np.append(self.of, self.of[0] + 1.0), np.concatenate([grid, grid], axis=1)
+        if len(self.pc) == 1:
+            self.pc, grid = np.append(self.pc, self.pc[0] + 1.0), np.concatenate([grid, grid], axis=2)
+        self.grid = grid  # [quantity (c*, Isp), O/F, Pc]
+        # Per-cell bilinear coefficients: value = c0 + c1*u + c2*v + c3*u*v
+        g00, g10 = grid[:, :-1, :-1], grid[:, 1:, :-1]
+        g01, g11 = grid[:, :-1, 1:], grid[:, 1:, 1:]
+        self._coef = np.stack([g00, g10 - g00, g01 - g00, g11 - g10 - g01 + g00]).reshape(4, 2, -1)
+
+    @property
+    def ranges(self):
+        return (self.of[0], self.of[-1]), (self.pc[0], self.pc[-1])
+
+    @staticmethod
+    def _cell(axis, x):
+        """Lower node index and fractional position of x in its cell, clamped to the grid."""
+        step = np.diff(axis)
+        if np.allclose(step, step[0]):
+            f = np.clip((x - axis[0]) * (1.0 / step[0]), 0, len(axis) - 1)  # Uniform axis: no search
+        else:
+            f = np.interp(x, axis, np.arange(len(axis), dtype=float))
+        i = np.minimum(np.nan_to_num(f).astype(np.intp), len(axis) - 2)
+        return i, f - i
+
+    def lookup(self, of, pc):
+        """
+        Theoretical (c* m/s, Isp s, inside) for O/F and Pc (psia) series.
+        Points outside the table are clamped to its edge (``inside`` False);
+        NaN inputs give NaN.
+        """
+        of, pc = np.broadcast_arrays(np.asarray(of, dtype=float), np.asarray(pc, dtype=float))
+        shape = of.shape
+        of, pc = of.ravel(), pc.ravel()
+        values = np.empty((2, len(of)))
+        for s in range(0, len(of), CHUNK):  # Cache-sized chunks: the temporaries stay in L2
+            x, y = of[s:s + CHUNK], pc[s:s + CHUNK]
+            i, u = self._cell(self.of, x)
+            j, v = self._cell(self.pc, y)
+            k = i * (len(self.pc) - 1) + j  # Flat cell index
+            for q, (c0, c1, c2, c3) in enumerate(self._coef.transpose(1, 0, 2)):
+                values[q, s:s + CHUNK] = c0[k] + u * (c1[k] + v * c3[k]) + v * c2[k]
+            values[:, s:s + CHUNK][:, np.isnan(x) | np.isnan(y)] = np.nan
+        inside = (of >= self.of[0]) & (of <= self.of[-1]) & (pc >= self.pc[0]) & (pc <= self.pc[-1])
+        values = values.reshape((2,) + shape)
+        inside = inside.reshape(shape)
+        return values[0], values[1], inside
+
+
+def load(path):
+    """PerformanceTable for ``path``, parsed once and cached while the file is unchanged."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime, st.st_size)
+    if key not in _tables:
+        with open(path, errors="replace") as fh:
+            text = fh.read()
+        points = _read_cea_output(text) if "O/F=" in text else _read_delimited(path)
+        _tables[key] = PerformanceTable(points, source=path)
+    return _tables[key]
+
+
+def measured(kind, x, mdot_lbs, throat_area=None):
+    """Measured c* (m/s) from Pc (psi) or Isp (s) from thrust (lbf), as the quick plots compute them."""
+    x = np.asarray(x, dtype=float)
+    if kind == "c_star":
+        return x * 144 * throat_area / (mdot_lbs / G_FT_S2) * FT_TO_M
+    if kind == "isp":
+        return x / mdot_lbs  # F / (mdot_slug * g)
+    raise ValueError(f"Unknown quantity '{kind}'")
+
+
+def efficiency(table, kind, time, value, of, pc_abs):
+    """
+    Efficiency of a measured c* or Isp series against the table.
+
+    Returns {"theory", "eta" (per sample), "average" (time-weighted burn
+    average of eta), "theory_average", "outside" (fraction of samples
+    clamped to the table edge)}.
+    """
+    c_star, isp, inside = table.lookup(of, pc_abs)
+    theory = c_star if kind == "c_star" else isp
+    eta = np.asarray(value, dtype=float) / theory
+    time = np.asarray(time, dtype=float)
+    ok = np.isfinite(eta) & np.isfinite(time)
+    duration = time[ok][-1] - time[ok][0] if ok.sum() > 1 else 0.0
+    if duration > 0:
+        average = float(trapz(eta[ok], time[ok]) / duration)
+        theory_average = float(trapz(theory[ok], time[ok]) / duration)
+    else:
+        average = float(np.mean(eta[ok])) if ok.any() else float("nan")
+        theory_average = float(np.mean(theory[ok])) if ok.any() else float("nan")
+    return {"theory": theory, "eta": eta, "average": average, "theory_average": theory_average,
+            "outside": float(np.mean(~inside[ok])) if ok.any() else 0.0}
@@ -0,0 +1,124 @@
+# plot_links.py
+"""
+Shared time cursor and linked x-zoom across open plot windows.
+
+Each registered plot keeps its own (sorted) time base and series.  Moving the
+mouse over any linked plot finds the cursor sample in every other plot by
+bisection (``np.searchsorted``), moves an animated cursor line and value
+readout, and redraws only those two artists over a cached background
+(blitting), so several dense plots follow the mouse at interactive rates.
+Zooming or panning one linked plot sets the same x-limits on the others.
+"""
+
+import tkinter as tk
+import numpy as np
+
+_plots = []  # Registered LinkedPlot objects, in opening order
+_syncing = False  # Set while x-limits are being propagated (no feedback loops)
+
+
+class LinkedPlot:
+    """One plot window's cursor, readout and blit background."""
+    def __init__(self, ax, canvas, time, series):
+        self.ax, self.canvas, self.fig = ax, canvas, ax.figure
+        self.time = np.asarray(time, dtype=float)
+        self.series = {k: np.asarray(v, dtype=float) for k, v in series.items()}
+        self.enabled = True
+        self.last = None  # Index shown last (skip redundant blits)
+        self.background = None
+        self.cursor = ax.axvline(self.time[0] if len(self.time) else 0.0, color="gray",
+                                 linewidth=0.8, animated=True, visible=False)
+        self.readout = ax.text(0.01, 0.98, "", transform=ax.transAxes, va="top", ha="left",
+                               fontsize=9, animated=True, visible=False,
+                               bbox={"facecolor": "white", "alpha": 0.8, "edgecolor": "none"})
+        self._cids = [canvas.mpl_connect("draw_event", self._on_draw),
+                      canvas.mpl_connect("motion_notify_event", self._on_move)]
+        self._xlim_cid = ax.callbacks.connect("xlim_changed", self._on_xlim)
+
+    def _on_draw(self, event):
+        # A full redraw (zoom, smoothing, resize): grab the new background, then re-blit the cursor
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._blit()
+
+    def _on_move(self, event):
+        if not self.enabled or event.inaxes is None or event.inaxes.figure is not self.fig \
+                or event.xdata is None:
+            return
+        for p in _plots:
+            if p.enabled:
+                p.show(event.xdata)
+
+    def _on_xlim(self, ax):
+        global _syncing
+        if _syncing or not self.enabled:
+            return
+        _syncing = True
+        try:
+            lim = ax.get_xlim()
+            for p in _plots:
+                if p is not self and p.enabled:
+                    p.ax.set_xlim(lim)
+                    p.canvas.draw_idle()
+        finally:
+            _syncing = False
+
+    def index(self, t):
+        """Nearest sample to time ``t`` by bisection."""
+        i = int(np.searchsorted(self.time, t))
+        if i >= len(self.time):
+            return len(self.time) - 1
+        if i > 0 and t - self.time[i - 1] < self.time[i] - t:
+            return i - 1
+        return i
+
+    def show(self, t):
+        if not len(self.time):
+            return
+        i = self.index(t)
+        if i == self.last:
+            return
+        self.last = i
+        x = self.time[i]
+        self.cursor.set_xdata([x, x])
+        lines = [f"t = {x:.4f} s"] + [f"{k}: {v[i]:.4g}" for k, v in self.series.items()]
+        self.readout.set_text("\n".join(lines))
+        self.cursor.set_visible(True)
+        self.readout.set_visible(True)
+        self._blit()
+
+    def _blit(self):
+        if self.background is None or not self.cursor.get_visible():
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.cursor)
+        self.ax.draw_artist(self.readout)
+        self.canvas.blit(self.fig.bbox)
+
+    def close(self):
+        for cid in self._cids:
+            self.canvas.mpl_disconnect(cid)
+        self.ax.callbacks.disconnect(self._xlim_cid)
+        if self in _plots:
+            _plots.remove(self)
+
+
+def register(plot_win, ax, canvas, time, series):
+    """
+    Link a Tk plot window: ``series`` maps readout labels to arrays on
+    ``time``.  Adds a 'Link cursor and zoom' checkbox and unregisters when
+    the window closes.  Returns the LinkedPlot.
+    """
+    plot = LinkedPlot(ax, canvas, time, series)
+    _plots.append(plot)
+    var = tk.BooleanVar(value=True)
+
+    def toggle():
+        plot.enabled = var.get()
+        if not plot.enabled:
+            plot.cursor.set_visible(False)
+            plot.readout.set_visible(False)
+            canvas.draw_idle()
+
+    tk.Checkbutton(plot_win, text="Link cursor and zoom", variable=var, command=toggle).pack(pady=2)
+    plot_win.bind("<Destroy>", lambda e: plot.close() if e.widget is plot_win else None, add="+")
+    return plot
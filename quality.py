@@ -0,0 +1,231 @@
+# quality.py
+"""
+Data quality scan run once right after a file is loaded.
+
+One vectorised pass over the time column gives the sample-rate estimate,
+gaps, duplicated timestamps and monotonicity breaks (DAQ restarts or
+jitter); one pass per numeric channel gives NaN/inf counts, flatlined
+(stuck) stretches and samples pinned at a clipping rail.  The report is kept
+on ``ctx.quality`` and ``repair`` fixes what can be fixed automatically.
+"""
+
+import numpy as np
+import pandas as pd
+import calibration
+
+GAP_FACTOR = 5.0  # A step this many median periods long is a gap
+RESTART_FACTOR = 10.0  # A backwards step this many periods long is a DAQ restart (else jitter)
+FLAT_SECONDS = 1.0  # Identical consecutive values for this long count as flatlined
+FLAT_MIN_SAMPLES = 100
+CLIP_FRACTION = 1e-3  # Share of samples at the min or max rail that counts as clipping
+CLIP_MIN_SAMPLES = 5
+DISCRETE_LEVELS = 16  # Channels with this few distinct values (valves, flags) skip flat/clip checks
+SUBSAMPLE = 100_000
+MAX_LISTED = 20  # Events kept per category in the report
+
+
+class QualityReport:
+    """Findings of one scan; ``issues()`` gives human-readable lines."""
+    def __init__(self):
+        self.n_rows = 0
+        self.sample_rate = None
+        self.gaps = []  # (time, duration s)
+        self.n_gaps = 0
+        self.n_duplicates = 0
+        self.restarts = []  # (row, time before, time after)
+        self.n_backsteps = 0  # Small backwards steps (timestamp jitter)
+        self.bad_time = 0  # Non-finite timestamps
+        self.channels = {}  # col -> {"nan", "inf", "flat_run" (s), "flat_at" (s), "clip_low", "clip_high"}
+        self.repairs = []  # Actions taken by repair(), if it was run
+
+    def channel_issues(self, col):
+        c = self.channels[col]
+        out = []
+        if c["nan"]:
+            out.append(f"{c['nan']} NaN")
+        if c["inf"]:
+            out.append(f"{c['inf']} inf")
+        if c["flat_run"]:
+            out.append(f"flatlined for {c['flat_run']:.2f} s at t={c['flat_at']:.3f} s")
+        if c["clip_low"] or c["clip_high"]:
+            out.append(f"clipped ({c['clip_low']} at min, {c['clip_high']} at max)")
+        return out
+
+    def issues(self):
+        lines = []
+        if self.bad_time:
+            lines.append(f"{self.bad_time} rows with missing/invalid time")
+        if self.restarts:
+            lines.append(f"{len(self.restarts)} time resets (DAQ restart) at rows "
+                         + ", ".join(str(r[0]) for r in self.restarts[:5]))
+        if self.n_backsteps:
+            lines.append(f"{self.n_backsteps} non-monotonic timestamps")
+        if self.n_duplicates:
+            lines.append(f"{self.n_duplicates} duplicated timestamps")
+        if self.n_gaps:
+            worst = max(d for _, d in self.gaps)
+            lines.append(f"{self.n_gaps} gaps in time (longest {worst:.4f} s)")
+        for col in self.channels:
+            found = self.channel_issues(col)
+            if found:
+                lines.append(f"{col}: " + "; ".join(found))
+        return lines
+
+    def summary(self):
+        rate = f"{self.sample_rate:.1f} Hz" if self.sample_rate else "unknown"
+        return f"{self.n_rows:,} rows, sample rate {rate}"
+
+    @property
+    def repairable(self):
+        return bool(self.bad_time or self.restarts or self.n_backsteps or self.n_duplicates
+                    or any(c["nan"] or c["inf"] for c in self.channels.values()))
+
+
+def _longest_run(x):
+    """(length, start index) of the longest run of identical consecutive values."""
+    if len(x) < 2:
+        return len(x), 0
+    breaks = np.flatnonzero(x[1:] != x[:-1]) + 1
+    bounds = np.concatenate(([0], breaks, [len(x)]))
+    lengths = np.diff(bounds)
+    i = int(np.argmax(lengths))
+    return int(lengths[i]), int(bounds[i])
+
+
+def scan_time(report, t):
+    finite = np.isfinite(t)
+    report.bad_time = int((~finite).sum())
+    t = t[finite]
+    if len(t) < 2:
+        return
+    dt = np.diff(t)
+    pos = dt[dt > 0]
+    period = float(np.median(pos)) if len(pos) else None
+    report.sample_rate = 1.0 / period if period else None
+    report.n_duplicates = int((dt == 0).sum())
+    back = np.flatnonzero(dt < 0)
+    if period:
+        big = dt[back] < -RESTART_FACTOR * period
+        report.restarts = [(int(i + 1), float(t[i]), float(t[i + 1])) for i in back[big][:MAX_LISTED]]
+        report.n_backsteps = int((~big).sum())
+        gaps = np.flatnonzero(dt > GAP_FACTOR * period)
+        report.n_gaps = len(gaps)
+        report.gaps = [(float(t[i]), float(dt[i])) for i in gaps[:MAX_LISTED]]
+    else:
+        report.n_backsteps = len(back)
+
+
+def scan_channel(x, rate, time=None):
+    x = np.asarray(x, dtype=float)
+    nan = np.isnan(x)
+    inf = np.isinf(x)
+    out = {"nan": int(nan.sum()), "inf": int(inf.sum()), "flat_run": 0.0, "flat_at": 0.0,
+           "clip_low": 0, "clip_high": 0}
+    rows = np.flatnonzero(~(nan | inf)) if out["nan"] or out["inf"] else None  # Rows of the finite samples
+    finite = x[rows] if rows is not None else x
+    if len(finite) < 2:
+        return out
+    step = max(1, len(finite) // SUBSAMPLE)
+    if len(np.unique(finite[::step])) <= DISCRETE_LEVELS:
+        return out  # Discrete channel: long constant stretches and rails are normal
+
+    run, start = _longest_run(finite)
+    min_run = max(FLAT_MIN_SAMPLES, int(FLAT_SECONDS * rate) if rate else FLAT_MIN_SAMPLES)
+    if run >= min_run:
+        out["flat_run"] = run / rate if rate else float(run)
+        row = int(rows[start]) if rows is not None else start
+        if time is not None and np.isfinite(time[row]):
+            out["flat_at"] = float(time[row])  # Actual timestamp: gaps and restarts shift sample counts
+        else:
+            out["flat_at"] = start / rate if rate else float(start)
+
+    lo, hi = finite.min(), finite.max()
+    limit = max(CLIP_MIN_SAMPLES, int(CLIP_FRACTION * len(finite)))
+    n_lo, n_hi = int((finite == lo).sum()), int((finite == hi).sum())
+    out["clip_low"] = n_lo if n_lo >= limit else 0
+    out["clip_high"] = n_hi if n_hi >= limit else 0
+    return out
+
+
+def scan(df, time_col, channels=None):
+    """Scan ``df``; ``channels`` defaults to every numeric column except time."""
+    report = QualityReport()
+    report.n_rows = len(df)
+    t = pd.to_numeric(df[time_col], errors="coerce").to_numpy(dtype=float)
+    scan_time(report, t)
+    if channels is None:
+        channels = [c for c in df.columns if c != time_col and pd.api.types.is_numeric_dtype(df[c])]
+    for c in channels:
+        report.channels[c] = scan_channel(df[c].to_numpy(dtype=float), report.sample_rate, t)
+    return report
+
+
+def repair(df, time_col, report=None):
+    """
+    Return (repaired copy, list of actions): rows without time dropped, DAQ
+    restarts stitched onto a continuous clock, jitter sorted, duplicated
+    timestamps dropped (first kept) and NaN/inf samples interpolated in time.
+    Flatlined and clipped channels are reported only - there is nothing to
+    restore them from.
+    """
+    report = report or scan(df, time_col)
+    actions = []
+    out = df.copy()
+    t = pd.to_numeric(out[time_col], errors="coerce").to_numpy(dtype=float)
+
+    if report.bad_time:
+        keep = np.isfinite(t)
+        out, t = out[keep], t[keep]
+        actions.append(f"dropped {report.bad_time} rows without time")
+
+    if report.restarts and report.sample_rate:
+        # Each reset continues one period after the last sample before it
+        period = 1.0 / report.sample_rate
+        dt = np.diff(t)
+        jump = np.zeros(len(t))
+        resets = np.flatnonzero(dt < -RESTART_FACTOR * period)
+        jump[resets + 1] = t[resets] - t[resets + 1] + period
+        t = t + np.cumsum(jump)
+        actions.append(f"stitched {len(resets)} time resets")
+
+    order = np.argsort(t, kind="stable")
+    if report.n_backsteps or (order[1:] < order[:-1]).any():
+        out, t = out.iloc[order], t[order]
+        actions.append("sorted rows by time")
+
+    dup = np.concatenate(([False], np.diff(t) == 0))
+    if dup.any():
+        out, t = out[~dup], t[~dup]
+        actions.append(f"dropped {int(dup.sum())} duplicated timestamps")
+
+    out[time_col] = t
+    fixed = 0
+    for c, info in report.channels.items():
+        if (info["nan"] or info["inf"]) and c in out.columns:
+            x = out[c].to_numpy(dtype=float)
+            bad = ~np.isfinite(x)
+            if bad.any() and (~bad).any():
+                x = x.copy()
+                x[bad] = np.interp(t[bad], t[~bad], x[~bad])
+                out[c] = x
+                fixed += int(bad.sum())
+    if fixed:
+        actions.append(f"interpolated {fixed} NaN/inf samples")
+    report.repairs = actions
+    return out.reset_index(drop=True), actions
+
+
+def repair_context(ctx):
+    """
+    ``repair`` ctx.df on raw values: an active calibration is reset first and
+    re-applied to the repaired rows, so ``ctx.raw_columns`` always matches
+    ``ctx.df``.  Returns the list of actions.
+    """
+    cal_set = ctx.calibration if ctx.raw_columns else None
+    if cal_set is not None:
+        calibration.reset(ctx)
+    ctx.df, actions = repair(ctx.df, ctx.time_col, ctx.quality)
+    ctx.revision += 1
+    if cal_set is not None:
+        calibration.apply(ctx, cal_set)
+    return actions
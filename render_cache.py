@@ -0,0 +1,165 @@
+# render_cache.py
+"""
+Size-bounded cache for prepared plot arrays, rendered PNGs and exports.
+
+Keys describe *what* was drawn rather than the objects involved: the dataset
+(source hash, load generation and ``ctx.revision``), the plot type, channel
+set, analysed window (absolute first/last row), decimation, smoothing and any
+extra parameters; saved PNGs also key on the axes limits.
+Re-opening a quick plot with unchanged settings therefore skips the data
+preparation, saving the same view again skips the Agg render, and repeating
+an export just copies the bytes already written.
+
+Entries are evicted least-recently-used once ``MAX_BYTES`` is exceeded;
+single entries larger than ``MAX_ITEM_BYTES`` are not cached at all.
+"""
+
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+MAX_BYTES = 512 * 2 ** 20
+MAX_ITEM_BYTES = 64 * 2 ** 20
+
+
+def _nbytes(value):
+    """Approximate memory held by a cached value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return 64
+
+
+class RenderCache:
+    """Thread-safe LRU keyed by hashable tuples, bounded by total bytes."""
+    def __init__(self, max_bytes=MAX_BYTES, max_item_bytes=MAX_ITEM_BYTES):
+        self.max_bytes, self.max_item_bytes = max_bytes, max_item_bytes
+        self._data = OrderedDict()  # key -> (value, nbytes)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        if size > self.max_item_bytes:
+            return value
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._data[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes and self._data:
+                _, (_, freed) = self._data.popitem(last=False)
+                self._size -= freed
+        return value
+
+    def get_or_build(self, key, build):
+        value = self.get(key, _MISSING)
+        return self.put(key, build()) if value is _MISSING else value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    @property
+    def size(self):
+        return self._size
+
+
+_MISSING = object()
+cache = RenderCache()
+
+
+def dataset_key(ctx):
+    """
+    Identity of the loaded data: file hash when known, else the frame object,
+    plus the load generation (re-merges and reloads of the same files) and
+    the in-place revision.
+    """
+    ident = ctx.source_hash or ("df", id(ctx.df))
+    return ident, getattr(ctx, "generation", 0), getattr(ctx, "revision", 0)
+
+
+def window_key(ctx, mask):
+    """Absolute (first, last) row of the analysed window for an apply_extra_data mask."""
+    if isinstance(mask, slice) or mask is None:
+        return (int(ctx.df.index[0]), int(ctx.df.index[-1])) if len(ctx.df) else (0, -1)
+    mask = np.asarray(mask)
+    if not mask.any():
+        return (0, -1)
+    first, last = int(np.argmax(mask)), len(mask) - 1 - int(np.argmax(mask[::-1]))
+    # The window between first and last is contiguous (see utils.apply_extra_data)
+    return int(ctx.df.index[first]), int(ctx.df.index[last])
+
+
+def plot_key(ctx, kind, channels, mask, downsample, extra=()):
+    """Key for one prepared plot: dataset, plot type, channels, window, decimation."""
+    return ("plot", dataset_key(ctx), kind, tuple(channels), window_key(ctx, mask),
+            int(downsample), tuple(extra))
+
+
+def arrays(key, build):
+    """Prepared arrays for ``key``, running ``build()`` only on a miss."""
+    return cache.get_or_build(("arrays",) + key, build)
+
+
+def smoothed(key, values, window):
+    """Centred moving average (np.convolve 'same', as the quick plots use), cached per window."""
+    window = int(window)
+    if window <= 1:
+        return values
+    return cache.get_or_build(("smoothed", window) + key,
+                              lambda: np.convolve(values, np.ones(window) / window, mode="same"))
+
+
+def _view_state(fig):
+    """Limits and artist counts of every axes: zoomed, panned or annotated figures render differently."""
+    return tuple((ax.get_xlim(), ax.get_ylim(), len(ax.get_children())) for ax in fig.axes)
+
+
+def figure_png(key, fig, **savefig_kw):
+    """PNG bytes of ``fig``; rendered only the first time ``key`` is seen in this view."""
+    def render():
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", **savefig_kw)
+        return buf.getvalue()
+    size = tuple(fig.get_size_inches()) + (fig.dpi,)  # Resized windows render differently
+    return cache.get_or_build(("png",) + tuple(key) + size + _view_state(fig)
+                              + tuple(sorted(savefig_kw.items())), render)
+
+
+def save_png(key, fig, path, **savefig_kw):
+    """Write ``fig`` to ``path`` as PNG through the cache (other formats render directly)."""
+    if not path.lower().endswith(".png"):
+        fig.savefig(path, **savefig_kw)
+        return path
+    data = figure_png(key, fig, **savefig_kw)
+    with open(path, "wb") as fh:
+        fh.write(data)
+    return path
+
+
+def export_key(ctx, *parts):
+    """Key for an export: dataset plus every option, with metadata serialised stably."""
+    return ("export", dataset_key(ctx)) + tuple(
+        json.dumps(p, sort_keys=True, default=str) if isinstance(p, (dict, list)) else p for p in parts)
@@ -0,0 +1,278 @@
+# server.py
+"""
+Local HTTP service: load one test once, serve metrics and plot tiles.
+
+The dataset goes through the same headless pipeline as batch runs
+(``batch.HeadlessApp`` → ``compute_metrics``), then stays resident while any
+number of browsers on the lab network request:
+
+    GET /                         minimal pan/zoom viewer
+    GET /api/metrics              metrics, numeric values, column roles
+    GET /api/channels             channel names and time range
+    GET /api/tile?channel=&level=&index=
+                                  min/max envelope of one pyramid tile
+    GET /api/range?channel=&t0=&t1=&px=
+                                  min/max envelope of an arbitrary range
+
+Tiles split the test into 2**level equal spans of TILE_BINS bins each, so a
+browser only ever fetches screen-resolution data and panning reuses cached
+tiles.  Requests are served concurrently (ThreadingHTTPServer) and responses
+are cached in a bounded LRU.
+
+    python server.py test.csv --target 250 --port 8050
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+import warnings
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+import batch
+import calibration
+from utils import compute_metrics
+
+TILE_BINS = 512
+MAX_LEVEL = 24
+CACHE_SIZE = 2048  # Cached JSON responses
+THRUST_TOTAL = "Thrust (lbf)"
+
+
+class Dataset:
+    """Channels of one loaded test as contiguous float arrays."""
+    def __init__(self, path, target_thrust=None, params=None, cal_set=None, despike=None):
+        app = batch.HeadlessApp()
+        self.ctx = ctx = app.ctx
+        ctx.params.update(params or {})
+        ctx.despike = despike
+        batch.load(app, path, cal_set)
+        target = target_thrust if target_thrust is not None else batch.auto_target(ctx)[0]
+        ctx.last_target_thrust = target
+        compute_metrics(app, target)
+
+        self.name = os.path.basename(path)
+        self.time = ctx.df[ctx.time_col].to_numpy(dtype=float)
+        self.channels = {}
+        for c in ctx.df.columns:
+            if c == ctx.time_col:
+                continue
+            values = ctx.df[c].to_numpy()
+            if np.issubdtype(values.dtype, np.number):
+                self.channels[c] = values.astype(float)
+        self.channels.setdefault(THRUST_TOTAL, ctx.df[ctx.thrust_cols].sum(axis=1).to_numpy(dtype=float))
+        self.t0, self.t1 = float(self.time[0]), float(self.time[-1])
+
+    def envelope(self, channel, t0, t1, bins):
+        """Per-bin min/max of ``channel`` over [t0, t1); raw samples if they fit."""
+        y = self.channels[channel]
+        i0 = int(np.searchsorted(self.time, t0, side="left"))
+        i1 = int(np.searchsorted(self.time, t1, side="left"))
+        t, v = self.time[i0:i1], y[i0:i1]
+        if len(v) <= 2 * bins:
+            return {"t": t.tolist(), "min": _json_list(v), "max": _json_list(v)}
+        per = int(math.ceil(len(v) / bins))
+        pad = per * int(math.ceil(len(v) / per)) - len(v)
+        blocks = np.concatenate([v, np.full(pad, np.nan)]).reshape(-1, per)
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN bins are expected on dropouts
+            lo, hi = np.nanmin(blocks, axis=1), np.nanmax(blocks, axis=1)
+        return {"t": t[::per].tolist(), "min": _json_list(lo), "max": _json_list(hi)}
+
+
+def _json_list(values):
+    """List with NaN/inf as None, since browsers reject bare NaN in JSON."""
+    return np.where(np.isfinite(values), values, None).tolist()
+
+
+def _json_value(value):
+    """NaN/inf scalars (e.g. a transient that never happened) as None, recursing into dicts."""
+    if isinstance(value, dict):
+        return {k: _json_value(v) for k, v in value.items()}
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class _LRU:
+    def __init__(self, size):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, fn):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return self._data[key]
+        value = fn()  # Computed outside the lock so slow tiles don't serialise requests
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+        return value
+
+
+def make_handler(dataset):
+    cache = _LRU(CACHE_SIZE)
+
+    def metrics():
+        ctx = dataset.ctx
+        return {"file": dataset.name, "target_thrust": ctx.last_target_thrust,
+                "metrics": ctx.metrics, "values": _json_value(ctx.metric_values),
+                "columns": {"time": ctx.time_col, "thrust": ctx.thrust_cols,
+                            "chamber": ctx.chamber_col, "fuel": ctx.fuel_col,
+                            "oxidizer": ctx.oxidizer_col}}
+
+    def channels():
+        return {"channels": list(dataset.channels), "t0": dataset.t0, "t1": dataset.t1,
+                "tile_bins": TILE_BINS, "default": THRUST_TOTAL}
+
+    def tile(q):
+        channel, level, index = q["channel"], int(q["level"]), int(q["index"])
+        if channel not in dataset.channels or not 0 <= level <= MAX_LEVEL or not 0 <= index < 2 ** level:
+            raise KeyError("tile out of range")
+        span = (dataset.t1 - dataset.t0) / 2 ** level
+        start = dataset.t0 + index * span
+        body = dataset.envelope(channel, start, start + span, TILE_BINS)
+        body.update(level=level, index=index)
+        return body
+
+    def time_range(q):
+        channel = q["channel"]
+        if channel not in dataset.channels:
+            raise KeyError("unknown channel")
+        px = min(max(int(q.get("px", 1000)), 1), 10_000)
+        return dataset.envelope(channel, float(q["t0"]), float(q["t1"]), px)
+
+    routes = {"/api/metrics": lambda q: metrics(), "/api/channels": lambda q: channels(),
+              "/api/tile": tile, "/api/range": time_range}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path in ("/", "/index.html"):
+                self._send(200, VIEWER_HTML.encode(), "text/html; charset=utf-8")
+                return
+            route = routes.get(url.path)
+            if route is None:
+                self._send(404, b'{"error": "not found"}')
+                return
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                key = (url.path, tuple(sorted(q.items())))
+                body = cache.get_or_compute(key, lambda: json.dumps(route(q)).encode())
+            except (KeyError, ValueError) as e:
+                self._send(400, json.dumps({"error": str(e)}).encode())
+                return
+            self._send(200, body)
+
+        def _send(self, status, body, ctype="application/json"):
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-cache")  # Another test may be served on this port later
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass  # Keep the console quiet under tile bursts
+
+    return Handler
+
+
+VIEWER_HTML = """<!doctype html>
+<html><head><title>HDAA viewer</title>
+<style>body{font-family:Arial;margin:12px}canvas{border:1px solid #999;width:100%;height:520px}</style>
+</head><body>
+<h2 id="title">Hotfire Data</h2>
+<select id="channel"></select> <span id="info"></span>
+<pre id="metrics"></pre>
+<canvas id="plot"></canvas>
+<script>
+const cv = document.getElementById('plot'), g = cv.getContext('2d');
+let meta, view, tiles = {};
+async function getJSON(u) { const r = await fetch(u); return r.json(); }
+function key(c, l, i) { return c + '|' + l + '|' + i; }
+async function draw() {
+  cv.width = cv.clientWidth; cv.height = cv.clientHeight;
+  const ch = document.getElementById('channel').value, dur = meta.t1 - meta.t0;
+  const level = Math.max(0, Math.min(24, Math.ceil(Math.log2(dur * cv.width / ((view[1] - view[0]) * meta.tile_bins)))));
+  const span = dur / 2 ** level, first = Math.max(0, Math.floor((view[0] - meta.t0) / span));
+  const last = Math.min(2 ** level - 1, Math.floor((view[1] - meta.t0) / span));
+  const parts = [];
+  for (let i = first; i <= last; i++) {
+    const k = key(ch, level, i);
+    if (!tiles[k]) tiles[k] = getJSON(`/api/tile?channel=${encodeURIComponent(ch)}&level=${level}&index=${i}`);
+    parts.push(tiles[k]);
+  }
+  const data = await Promise.all(parts);
+  let lo = Infinity, hi = -Infinity;
+  data.forEach(d => { d.min.forEach(v => { if (v !== null && v < lo) lo = v; });
+                      d.max.forEach(v => { if (v !== null && v > hi) hi = v; }); });
+  if (!(hi > lo)) { hi = lo + 1; }
+  const X = t => (t - view[0]) / (view[1] - view[0]) * cv.width, Y = v => cv.height - (v - lo) / (hi - lo) * cv.height;
+  g.clearRect(0, 0, cv.width, cv.height); g.strokeStyle = 'blue'; g.beginPath();
+  data.forEach(d => d.t.forEach((t, j) => { if (d.min[j] === null) return;  // Dropout bin: leave a gap
+    g.moveTo(X(t), Y(d.min[j])); g.lineTo(X(t), Y(d.max[j])); }));
+  g.stroke();
+  document.getElementById('info').textContent =
+    `${view[0].toFixed(3)} – ${view[1].toFixed(3)} s, level ${level}, ${data.length} tiles, range ${lo.toFixed(2)} – ${hi.toFixed(2)}`;
+}
+cv.addEventListener('wheel', e => { e.preventDefault();
+  const f = e.deltaY > 0 ? 1.25 : 0.8, x = view[0] + (view[1] - view[0]) * e.offsetX / cv.clientWidth;
+  view = [x - (x - view[0]) * f, x + (view[1] - x) * f]; draw(); });
+let drag = null;
+cv.addEventListener('mousedown', e => drag = [e.offsetX, view.slice()]);
+window.addEventListener('mouseup', () => drag = null);
+cv.addEventListener('mousemove', e => { if (!drag) return;
+  const dt = (e.offsetX - drag[0]) / cv.clientWidth * (drag[1][1] - drag[1][0]);
+  view = [drag[1][0] - dt, drag[1][1] - dt]; draw(); });
+(async () => {
+  meta = await getJSON('/api/channels'); view = [meta.t0, meta.t1];
+  const sel = document.getElementById('channel');
+  meta.channels.forEach(c => sel.add(new Option(c, c, false, c === meta.default)));
+  sel.onchange = draw;
+  const m = await getJSON('/api/metrics');
+  document.getElementById('title').textContent = m.file;
+  document.getElementById('metrics').textContent = Object.entries(m.metrics).map(([k, v]) => `${k}: ${v}`).join('\\n');
+  draw();
+})();
+</script></body></html>
+"""
+
+
+def serve(path, host="127.0.0.1", port=8050, target_thrust=None, params=None, cal_set=None, despike=None):
+    dataset = Dataset(path, target_thrust, params, cal_set, despike)
+    httpd = ThreadingHTTPServer((host, port), make_handler(dataset))
+    httpd.daemon_threads = True
+    print(f"Serving {dataset.name} on http://{host}:{port}/")
+    return httpd
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve one hotfire test to browsers on the lab network.")
+    parser.add_argument("csv")
+    parser.add_argument("--host", default="127.0.0.1", help="Use 0.0.0.0 to expose on the LAN")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--target", type=float, default=None, help="Target thrust (lbf)")
+    parser.add_argument("--calibration", help="Test stand calibration (saved stand name or JSON path)")
+    parser.add_argument("--despike", type=float, metavar="MADS",
+                        help="Reject spikes further than this many MADs from the rolling median")
+    args = parser.parse_args()
+    cal_set = calibration.resolve(args.calibration) if args.calibration else None
+    httpd = serve(args.csv, args.host, args.port, args.target, cal_set=cal_set,
+                  despike={"threshold": args.despike} if args.despike else None)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# spectral.py
+"""
+Chunked spectral analysis for combustion instability checks.
+
+Welch PSD and the short-time spectrogram are built from strided (zero-copy)
+frame views and FFT'd a batch of frames at a time, so a 50 kHz, 60 s trace
+never allocates one huge FFT.  Results are cached per channel, window and
+parameter set.  Figures are plain ``matplotlib.figure.Figure`` objects so the
+same rendering works in a Tk window and headless for batch reports.
+"""
+
+from collections import OrderedDict
+import numpy as np
+from matplotlib.figure import Figure
+
+FRAME_BATCH = 64  # Frames transformed per FFT call
+MAX_FRAMES = 1500  # Spectrogram columns kept (hop grows on long traces)
+CACHE_SIZE = 16
+_cache = OrderedDict()
+
+
+def sample_rate(time):
+    """Sample rate estimate (Hz) from the median time step."""
+    dt = np.diff(np.asarray(time, dtype=float))
+    dt = dt[np.isfinite(dt) & (dt > 0)]
+    if not len(dt):
+        raise ValueError("Time column has no increasing samples")
+    return 1.0 / float(np.median(dt))
+
+
+def _clean(x):
+    """Float copy with NaNs bridged by linear interpolation."""
+    x = np.asarray(x, dtype=float)
+    bad = ~np.isfinite(x)
+    if bad.any():
+        idx = np.arange(len(x))
+        x = x.copy()
+        x[bad] = np.interp(idx[bad], idx[~bad], x[~bad]) if (~bad).any() else 0.0
+    return x
+
+
+def _frame_power(x, nperseg, hop, window):
+    """Yield (frame start indices, |rfft|^2) for batches of detrended frames."""
+    frames = np.lib.stride_tricks.sliding_window_view(x, nperseg)[::hop]
+    for i in range(0, len(frames), FRAME_BATCH):
+        seg = frames[i:i + FRAME_BATCH]
+        seg = (seg - seg.mean(axis=1, keepdims=True)) * window
+        spec = np.fft.rfft(seg, axis=1)
+        yield np.arange(i, i + len(seg)) * hop, spec.real ** 2 + spec.imag ** 2
+
+
+def _density_scale(n_freq, nperseg, fs, window):
+    """One-sided PSD scaling (DC and Nyquist bins are not doubled)."""
+    scale = np.full(n_freq, 2.0 / (fs * np.sum(window ** 2)))
+    scale[0] /= 2
+    if nperseg % 2 == 0:
+        scale[-1] /= 2
+    return scale
+
+
+def welch_psd(x, fs, nperseg=4096, overlap=0.5):
+    """Welch power spectral density (units^2/Hz) with a Hann window."""
+    x = _clean(x)
+    nperseg = min(nperseg, len(x))
+    hop = max(1, int(nperseg * (1 - overlap)))
+    window = np.hanning(nperseg)
+    freqs = np.fft.rfftfreq(nperseg, 1.0 / fs)
+    acc = np.zeros(len(freqs))
+    count = 0
+    for _, power in _frame_power(x, nperseg, hop, window):
+        acc += power.sum(axis=0)
+        count += len(power)
+    return freqs, acc / max(count, 1) * _density_scale(len(freqs), nperseg, fs, window)
+
+
+def spectrogram(x, fs, nperseg=1024, overlap=0.5, max_frames=MAX_FRAMES):
+    """
+    Short-time PSD in dB, shape (n_freq, n_frames), plus frame centre times
+    (s from the first sample).  The hop is widened when the trace would need
+    more than ``max_frames`` columns so the output stays screen-sized.
+    """
+    x = _clean(x)
+    nperseg = min(nperseg, len(x))
+    hop = max(1, int(nperseg * (1 - overlap)))
+    n_frames = (len(x) - nperseg) // hop + 1
+    if n_frames > max_frames:
+        hop = int(np.ceil((len(x) - nperseg) / (max_frames - 1)))
+    window = np.hanning(nperseg)
+    freqs = np.fft.rfftfreq(nperseg, 1.0 / fs)
+    scale = _density_scale(len(freqs), nperseg, fs, window)
+    starts, cols = [], []
+    for s, power in _frame_power(x, nperseg, hop, window):
+        starts.append(s)
+        cols.append((10 * np.log10(power * scale + 1e-20)).astype(np.float32))
+    sxx = np.concatenate(cols).T
+    times = (np.concatenate(starts) + nperseg / 2) / fs
+    return freqs, times, sxx
+
+
+def track_peaks(freqs, sxx, fmin=0.0, fmax=None):
+    """Dominant frequency and its level (dB) in [fmin, fmax] for every frame."""
+    band = (freqs >= fmin) & (freqs <= (fmax if fmax else freqs[-1]))
+    if not band.any():
+        return np.full(sxx.shape[1], np.nan), np.full(sxx.shape[1], np.nan)
+    sub = sxx[band]
+    idx = np.argmax(sub, axis=0)
+    return freqs[band][idx], sub[idx, np.arange(sub.shape[1])]
+
+
+def top_peaks(freqs, psd, count=5, fmin=0.0, fmax=None):
+    """Strongest local maxima of a PSD as [(freq, power)], highest first."""
+    band = (freqs >= fmin) & (freqs <= (fmax if fmax else freqs[-1]))
+    p = np.where(band, psd, -np.inf)
+    local = np.flatnonzero((p[1:-1] > p[:-2]) & (p[1:-1] >= p[2:])) + 1
+    best = local[np.argsort(p[local])[::-1][:count]]
+    return [(float(freqs[i]), float(psd[i])) for i in best]
+
+
+def analyze(time, x, key=None, nperseg=4096, spec_nperseg=1024, overlap=0.5, fmin=0.0, fmax=None):
+    """
+    PSD, spectrogram and peak track for one channel window.
+
+    ``key`` identifies the data (e.g. (dataset id, column, start, stop)); when
+    given, results are cached together with the parameters.
+    """
+    cache_key = None if key is None else (key, nperseg, spec_nperseg, overlap, fmin, fmax)
+    if cache_key is not None and cache_key in _cache:
+        _cache.move_to_end(cache_key)
+        return _cache[cache_key]
+
+    time = np.asarray(time, dtype=float)
+    fs = sample_rate(time)
+    freqs, psd = welch_psd(x, fs, nperseg, overlap)
+    s_freqs, s_times, sxx = spectrogram(x, fs, spec_nperseg, overlap)
+    peak_f, peak_db = track_peaks(s_freqs, sxx, fmin, fmax)
+    result = {
+        "fs": fs, "t0": float(time[0]),
+        "freqs": freqs, "psd": psd, "peaks": top_peaks(freqs, psd, fmin=fmin, fmax=fmax),
+        "spec_freqs": s_freqs, "spec_times": s_times + float(time[0]), "sxx": sxx,
+        "peak_freq": peak_f, "peak_db": peak_db,
+    }
+
+    if cache_key is not None:
+        _cache[cache_key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def render_figure(result, title="Spectral Analysis", unit="psi", fmax=None):
+    """Build a three-panel Figure (PSD, spectrogram, peak track)."""
+    fig = Figure(figsize=(12, 9), dpi=100)
+    ax_psd, ax_spec, ax_peak = fig.subplots(3, 1)
+    fmax = fmax or result["fs"] / 2
+
+    ax_psd.semilogy(result["freqs"], result["psd"], color="red", linewidth=1)
+    for f, p in result["peaks"]:
+        ax_psd.annotate(f"{f:.1f} Hz", (f, p), textcoords="offset points", xytext=(4, 4), fontsize=8)
+    ax_psd.set_xlim(0, fmax)
+    ax_psd.set_xlabel("Frequency (Hz)")
+    ax_psd.set_ylabel(f"PSD ({unit}²/Hz)")
+    ax_psd.set_title(f"{title} – Welch PSD (fs = {result['fs']:.0f} Hz)")
+    ax_psd.grid(True)
+
+    t, f = result["spec_times"], result["spec_freqs"]
+    mesh = ax_spec.pcolormesh(t, f, result["sxx"], shading="nearest", cmap="viridis")
+    ax_spec.set_ylim(0, fmax)
+    ax_spec.set_ylabel("Frequency (Hz)")
+    ax_spec.set_title("Spectrogram")
+    fig.colorbar(mesh, ax=ax_spec, label="dB")
+
+    ax_peak.plot(t, result["peak_freq"], color="black", linewidth=1)
+    ax_peak.set_xlabel("Time (s)")
+    ax_peak.set_ylabel("Peak frequency (Hz)")
+    ax_peak.set_title("Dominant frequency")
+    ax_peak.grid(True)
+    fig.tight_layout()
+    return fig
+
+
+def save_report(time, x, path, title="Spectral Analysis", unit="psi", **params):
+    """Headless entry point for batch reports: analyse and write a PNG/PDF."""
+    result = analyze(time, x, **params)
+    render_figure(result, title, unit, params.get("fmax")).savefig(path)
+    return result
@@ -0,0 +1,98 @@
+# target_estimate.py
+"""
+Automatic target-thrust estimate from the summed thrust channel.
+
+The steady plateau of a hotfire is the most common high-thrust level, so the
+estimate is the mode of a kernel-smoothed histogram of the samples above a
+fraction of the peak.  It runs on a block-mean pyramid level of at most
+``MAX_POINTS`` samples (which also averages out sensor noise), so even very
+long recordings cost one vectorised pass.  Tests with two comparable
+plateaus (throttled burns) or no clear plateau are flagged as ambiguous.
+"""
+
+import numpy as np
+import despike
+import calibration
+
+MAX_POINTS = 200_000  # Samples kept at the pyramid level used for the histogram
+HIGH_FRACTION = 0.25  # Only samples above this fraction of the peak count as "firing"
+BINS = 256
+KERNEL_BINS = 3  # Gaussian kernel sigma in bins
+SECOND_PEAK = 0.5  # A separate peak this tall (relative) makes the plateau ambiguous
+PEAK_SEPARATION = 0.15  # ... when it is at least this far (relative) from the main one
+MIN_PLATEAU_SHARE = 0.3  # Share of firing samples within ±10 % of the mode
+
+
+class TargetEstimate:
+    """Proposed target thrust plus the evidence behind it."""
+    def __init__(self, value, ambiguous=False, reason="", candidates=()):
+        self.value = value
+        self.ambiguous = ambiguous
+        self.reason = reason
+        self.candidates = list(candidates)  # Other plateau levels, strongest first
+
+    def __repr__(self):
+        flag = f", ambiguous: {self.reason}" if self.ambiguous else ""
+        return f"TargetEstimate({self.value:.1f} lbf{flag})"
+
+
+def pyramid_level(x, max_points=MAX_POINTS):
+    """Block means of ``x`` halved until at most ``max_points`` remain."""
+    x = np.asarray(x, dtype=float)
+    while len(x) > max_points:
+        n = len(x) // 2 * 2
+        x = 0.5 * (x[:n:2] + x[1:n:2])
+    return x
+
+
+def thrust_series(ctx, max_points=MAX_POINTS):
+    """Summed thrust at pyramid resolution, from the store in out-of-core mode."""
+    if ctx.store is not None:
+        # Strided reads from the store avoid touching every row of a huge file (calibrated like ctx.df)
+        return ctx.store.coarse(ctx.thrust_cols, max_points,
+                                lambda arrs: calibration.calibrate_arrays(ctx, arrs))
+    return pyramid_level(despike.thrust_total(ctx), max_points)
+
+
+def _smoothed_hist(x, lo, hi):
+    counts, edges = np.histogram(x, bins=BINS, range=(lo, hi))
+    k = np.arange(-4 * KERNEL_BINS, 4 * KERNEL_BINS + 1)
+    kernel = np.exp(-0.5 * (k / KERNEL_BINS) ** 2)
+    density = np.convolve(counts, kernel / kernel.sum(), mode="same")
+    return density, 0.5 * (edges[:-1] + edges[1:])
+
+
+def estimate(thrust):
+    """Plateau estimate from a thrust series (see module docstring)."""
+    x = np.asarray(thrust, dtype=float)
+    x = x[np.isfinite(x)]
+    if not len(x):
+        return TargetEstimate(float("nan"), True, "no finite thrust samples")
+    peak = float(np.percentile(x, 99.9))
+    if peak <= 0:
+        return TargetEstimate(float("nan"), True, "thrust never rises above zero")
+    firing = x[x >= HIGH_FRACTION * peak]
+    density, centres = _smoothed_hist(firing, HIGH_FRACTION * peak, peak)
+    main = int(np.argmax(density))
+    mode = float(centres[main])
+
+    # Other local maxima of the smoothed histogram, strongest first
+    d = density
+    local = np.flatnonzero((d[1:-1] > d[:-2]) & (d[1:-1] >= d[2:])) + 1
+    local = local[np.argsort(d[local])[::-1]]
+    rivals = [i for i in local if i != main and d[i] >= SECOND_PEAK * d[main]
+              and abs(centres[i] - mode) > PEAK_SEPARATION * mode]
+
+    share = float(np.mean(np.abs(firing - mode) <= 0.1 * mode))
+    if rivals:
+        levels = ", ".join(f"{centres[i]:.0f}" for i in rivals[:3])
+        return TargetEstimate(mode, True, f"several thrust plateaus (also {levels} lbf)",
+                              [float(centres[i]) for i in rivals])
+    if share < MIN_PLATEAU_SHARE:
+        return TargetEstimate(mode, True, f"no clear plateau ({share:.0%} of firing samples near the mode)")
+    return TargetEstimate(mode)
+
+
+def estimate_target(ctx):
+    """Estimate for the data loaded in ``ctx``."""
+    return estimate(thrust_series(ctx))
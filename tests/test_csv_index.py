@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+import pytest
+import csv_index
+
+
+@pytest.mark.parametrize("n_rows", [999, 1000, 123_457])
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_row_count_and_tail(tmp_path, n_rows, trailing_newline):
+    path = tmp_path / "log.csv"
+    df = pd.DataFrame({"Time": np.arange(n_rows) * 1e-3, "Thrust (lbf)": np.arange(n_rows, dtype=float)})
+    text = df.to_csv(index=False)
+    path.write_text(text if trailing_newline else text.rstrip("\n"))
+
+    store = csv_index.IndexedCSV.build(str(path))
+    store.time_col = "Time"
+    assert store.n_rows == n_rows
+    assert store.array("Thrust (lbf)")[-1] == n_rows - 1
+    t, y = store.summary(["Thrust (lbf)"], max(0, n_rows - 3000), n_rows)
+    assert len(t) == len(y)
+
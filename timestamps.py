@@ -0,0 +1,206 @@
+# timestamps.py
+"""
+Absolute timestamp support for the time column.
+
+Several DAQs log wall-clock time instead of seconds since start: ISO 8601
+strings or integer epoch seconds / ms / µs / ns.  ``detect`` works out the
+format from a small sample, ``to_epoch_ns`` parses a whole column to int64
+nanoseconds in one vectorised call (an Arrow cast when pyarrow is installed,
+else ``pd.to_datetime`` with a fixed pattern cached per string layout) and
+``to_relative`` turns that into float seconds from a reference.
+
+The analysis keeps working in relative seconds; the absolute clock is kept
+as ``ctx.time_origin`` (epoch ns of t = 0) for cross-file alignment.
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+try:  # Optional dependency
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+SAMPLE = 1000  # Values inspected by detect()
+NAT = np.iinfo(np.int64).min  # int64 view of NaT
+# Epoch unit by magnitude of a typical value: (lower bound, unit, ns per unit).
+# Anything below 3e8 (about ten years in seconds) is taken as relative seconds.
+EPOCH_UNITS = ((3e17, "ns", 1), (3e14, "us", 1_000), (3e11, "ms", 1_000_000), (3e8, "s", 1_000_000_000))
+ISO_PATTERNS = (
+    "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%d %H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d %H:%M:%S%z",
+)
+ABSOLUTE_NAME = re.compile(r"(^|[^a-z])(timestamp|datetime|date|epoch|utc|clock)")
+_pattern_cache = {}  # String layout ("0000-00-00T00:...") -> strptime pattern
+
+
+class TimeFormat:
+    """How a time column is encoded: relative seconds, epoch numbers, ISO text or datetimes."""
+    def __init__(self, kind, unit=None, pattern=None, tz=False):
+        self.kind = kind  # "relative", "epoch", "iso" or "datetime"
+        self.unit = unit  # Epoch unit ("s", "ms", "us", "ns")
+        self.pattern = pattern  # strptime pattern for the pandas fallback (None: ISO8601)
+        self.tz = tz  # Text carries a UTC offset
+
+    @property
+    def absolute(self):
+        return self.kind != "relative"
+
+    def __repr__(self):
+        extra = self.unit or self.pattern or ""
+        return f"TimeFormat({self.kind}{', ' + extra if extra else ''})"
+
+
+def is_absolute_name(name):
+    """Header names that suggest a wall-clock column (Timestamp, DateTime, Epoch ns, ...)."""
+    return bool(ABSOLUTE_NAME.search(str(name).lower()))
+
+
+def _layout(text):
+    return re.sub(r"\d", "0", text)
+
+
+def _iso_pattern(sample):
+    """strptime pattern matching every value of ``sample``, cached per layout."""
+    key = _layout(sample.iloc[0])
+    if key not in _pattern_cache:
+        for p in ISO_PATTERNS:
+            try:
+                pd.to_datetime(sample, format=p, utc="%z" in p)
+            except (ValueError, TypeError):
+                continue
+            _pattern_cache[key] = p
+            break
+        else:
+            _pattern_cache[key] = None  # Mixed layouts: let pandas parse ISO8601 generically
+    return _pattern_cache[key]
+
+
+def detect(values):
+    """TimeFormat of a column (Series or array) from its first non-null values."""
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    if isinstance(s.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_any_dtype(s.dtype):
+        return TimeFormat("datetime")
+    sample = s.dropna().iloc[:SAMPLE] if len(s) else s
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        x = np.abs(sample.to_numpy(dtype=float))
+        typical = float(np.median(x)) if len(x) else 0.0
+        for bound, unit, _ in EPOCH_UNITS:
+            if typical >= bound:
+                return TimeFormat("epoch", unit=unit)
+        return TimeFormat("relative")
+    if not len(sample):
+        raise ValueError("Time column is empty")
+    sample = sample.astype(str).str.strip()
+    numeric = pd.to_numeric(sample, errors="coerce")
+    if numeric.notna().all():
+        return detect(numeric)  # Numbers stored as text
+    try:
+        parsed = pd.to_datetime(sample, format="ISO8601")
+    except (ValueError, TypeError):
+        raise ValueError(f"Unrecognised time format (e.g. '{sample.iloc[0]}')") from None
+    tz = getattr(parsed.dt, "tz", None) is not None
+    return TimeFormat("iso", pattern=_iso_pattern(sample), tz=tz)
+
+
+def _datetimes_to_ns(dt):
+    """int64 epoch ns (NaT -> NAT) from a datetime Series, tz-aware values as UTC."""
+    if getattr(dt.dt, "tz", None) is not None:
+        dt = dt.dt.tz_convert("UTC").dt.tz_localize(None)
+    return dt.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _arrow_iso(s, fmt):
+    arr = pa.array(s.array if isinstance(s.dtype, pd.StringDtype) else s.to_numpy(dtype=object), from_pandas=True)
+    if not pa.types.is_string(arr.type) and not pa.types.is_large_string(arr.type):
+        raise TypeError("not text")
+    target = pa.timestamp("ns", tz="UTC" if fmt.tz else None)
+    try:
+        ts = arr.cast(target)
+    except pa.ArrowInvalid:
+        ts = pc.utf8_trim_whitespace(arr).cast(target)  # Padded fields; retry before giving up on Arrow
+    return pc.fill_null(ts.cast(pa.int64()), NAT).to_numpy(zero_copy_only=False)
+
+
+def to_epoch_ns(values, fmt=None):
+    """Parse a whole time column to int64 epoch nanoseconds (missing values -> NAT)."""
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+    fmt = fmt or detect(s)
+    if fmt.kind == "relative":
+        raise ValueError("Time column holds relative seconds, not absolute timestamps")
+    if fmt.kind == "datetime":
+        return _datetimes_to_ns(pd.to_datetime(s))
+    if fmt.kind == "epoch":
+        x = pd.to_numeric(s, errors="coerce")
+        scale = dict((u, k) for _, u, k in EPOCH_UNITS)[fmt.unit]
+        if pd.api.types.is_integer_dtype(x.dtype):
+            return x.to_numpy(dtype=np.int64) * scale  # Exact: no float round trip
+        f = x.to_numpy(dtype=float)
+        out = np.full(len(f), NAT, dtype=np.int64)
+        ok = np.isfinite(f)
+        out[ok] = np.round(f[ok] * scale).astype(np.int64)
+        return out
+    if pa is not None:
+        try:
+            return _arrow_iso(s, fmt)  # Zero-copy for Arrow-backed strings, multi-threaded cast
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, TypeError):
+            pass  # Layout Arrow's cast does not accept: use pandas
+    dt = pd.to_datetime(s, format=fmt.pattern or "ISO8601", utc=fmt.tz, errors="coerce", cache=True)
+    return _datetimes_to_ns(dt)
+
+
+def to_relative(ns, origin=None):
+    """
+    (float seconds, origin) from epoch ns.  ``origin`` (epoch ns of t = 0)
+    defaults to the first valid timestamp; missing values become NaN.
+    """
+    ns = np.asarray(ns, dtype=np.int64)
+    valid = ns != NAT
+    if origin is None:
+        origin = int(ns[np.argmax(valid)]) if valid.any() else 0
+    seconds = (ns - np.int64(origin)).astype(float) / 1e9  # Subtract in int64 to keep ns precision
+    seconds[~valid] = np.nan
+    return seconds, int(origin)
+
+
+def normalize(ctx):
+    """
+    Convert an absolute time column in ``ctx.df`` to seconds from its first
+    sample and keep the clock on ``ctx.time_origin``.  Returns the TimeFormat.
+    """
+    ctx.time_origin, ctx.time_format, ctx.time_reference = None, None, "start"
+    if ctx.df is None or ctx.time_col is None:
+        return None
+    if ctx.store is not None:
+        # The out-of-core store already converted the column while it was built
+        ctx.time_origin = ctx.store.meta.get("time_origin", {}).get(ctx.time_col)
+        ctx.time_format = TimeFormat(ctx.store.meta.get("time_format", "relative"))
+        return ctx.time_format
+    fmt = detect(ctx.df[ctx.time_col])
+    ctx.time_format = fmt
+    if fmt.absolute:
+        ctx.df[ctx.time_col], ctx.time_origin = to_relative(to_epoch_ns(ctx.df[ctx.time_col], fmt))
+    return fmt
+
+
+def rereference(ctx, t_ref, label="custom"):
+    """Move t = 0 to ``t_ref`` seconds on the current axis (e.g. ignition); the clock is kept."""
+    if ctx.store is not None:
+        raise ValueError("The time reference of an out-of-core file cannot be moved")
+    ctx.df[ctx.time_col] = ctx.df[ctx.time_col].to_numpy(dtype=float) - t_ref
+    if ctx.time_origin is not None:
+        ctx.time_origin += int(round(t_ref * 1e9))
+    ctx.time_reference = label
+    ctx.revision += 1  # Cached renders / despiked channels keyed on the old axis
+    ctx.column_stats.clear()
+    ctx.quality = None
+
+
+def clock(origin, seconds=0.0):
+    """ISO string of the absolute time ``seconds`` after ``origin`` (None without a clock)."""
+    if origin is None:
+        return None
+    ns = origin + int(round(seconds * 1e9))
+    return str(np.datetime64(ns, "ns"))
@@ -0,0 +1,143 @@
+# transients.py
+"""
+Start-up and shutdown characterisation of a hotfire.
+
+Works on the analysed window only (the burn plus one burn length either
+side): ignition, 10–90 % rise times of thrust and chamber pressure, 90–10 %
+tail-off, ignition delay after a valve/command channel and steady-state
+averages between the 90 % points.  Every level crossing is found with one
+vectorised comparison and placed between samples by linear interpolation.
+"""
+
+import numpy as np
+from utils import trapz
+
+LOW, HIGH = 0.10, 0.90  # Rise / tail-off levels as fractions of the steady value
+COMMAND_LEVEL = 0.5  # Fraction of the command channel's swing that counts as "fired"
+
+
+def _interp_time(t, x, i, level):
+    """Time where x crosses ``level`` between samples i-1 and i."""
+    if i <= 0:
+        return float(t[0])
+    x0, x1 = x[i - 1], x[i]
+    frac = (level - x0) / (x1 - x0) if x1 != x0 else 1.0
+    return float(t[i - 1] + np.clip(frac, 0.0, 1.0) * (t[i] - t[i - 1]))
+
+
+def first_above(t, x, level, start=0):
+    """(index, interpolated time) of the first sample >= level at or after ``start``."""
+    above = x[start:] >= level
+    if not above.any():
+        return None, None
+    i = start + int(np.argmax(above))
+    return i, _interp_time(t, x, i, level)
+
+
+def first_below(t, x, level, start=0):
+    """(index, interpolated time) of the first sample < level at or after ``start``."""
+    below = x[start:] < level
+    if not below.any():
+        return None, None
+    i = start + int(np.argmax(below))
+    return i, _interp_time(t, x, i, level)
+
+
+def edges(t, x, steady, low=LOW, high=HIGH):
+    """
+    Rising and falling edge times of ``x`` relative to its steady value:
+    {"t_low_rise", "t_high_rise", "t_high_fall", "t_low_fall"} (None when missing).
+    """
+    out = dict.fromkeys(("t_low_rise", "t_high_rise", "t_high_fall", "t_low_fall"))
+    if not np.isfinite(steady) or steady <= 0:
+        return out
+    lo, hi = low * steady, high * steady
+    i_lo, out["t_low_rise"] = first_above(t, x, lo)
+    if i_lo is None:
+        return out
+    i_hi, out["t_high_rise"] = first_above(t, x, hi, i_lo)
+    if i_hi is None:
+        return out
+    # Falling edge: after the last sample at/above the high level
+    last_hi = len(x) - 1 - int(np.argmax(x[::-1] >= hi))
+    _, out["t_high_fall"] = first_below(t, x, hi, last_hi)
+    _, out["t_low_fall"] = first_below(t, x, lo, last_hi)
+    return out
+
+
+def _span(a, b):
+    return b - a if a is not None and b is not None else None
+
+
+def _steady_mean(t, x, t0, t1):
+    """Time-weighted mean of x over [t0, t1]."""
+    if t0 is None or t1 is None or t1 <= t0:
+        return None
+    sel = (t >= t0) & (t <= t1)
+    if sel.sum() < 2:
+        return None
+    return float(trapz(x[sel], t[sel]) / (t[sel][-1] - t[sel][0]))
+
+
+def analysis_window(mask):
+    """Row slice around the burn mask: the burn plus one burn length either side."""
+    start = int(np.argmax(mask))
+    end = len(mask) - 1 - int(np.argmax(mask[::-1]))
+    pad = end - start + 1
+    return slice(max(0, start - pad), min(len(mask), end + pad + 1))
+
+
+def characterize(time, thrust, mask, pressure=None, command=None):
+    """
+    Transient metrics from full-resolution arrays and the burn mask.
+    Returns a dict of floats/None keyed like ``ctx.metric_values``.
+    """
+    win = analysis_window(mask)
+    t, f = time[win], thrust[win]
+    burn = mask[win]
+    values = {}
+
+    # Steady thrust from the burn mask; edges are measured relative to it
+    f_steady = float(np.nanmedian(f[burn]))
+    fe = edges(t, f, f_steady)
+    values["ignition_time"] = fe["t_low_rise"]
+    values["thrust_rise_time"] = _span(fe["t_low_rise"], fe["t_high_rise"])
+    values["thrust_tail_off"] = _span(fe["t_high_fall"], fe["t_low_fall"])
+    values["steady_thrust"] = _steady_mean(t, f, fe["t_high_rise"], fe["t_high_fall"])
+
+    if pressure is not None:
+        p = pressure[win]
+        pe = edges(t, p, float(np.nanmedian(p[burn])))
+        values["pc_rise_time"] = _span(pe["t_low_rise"], pe["t_high_rise"])
+        values["pc_tail_off"] = _span(pe["t_high_fall"], pe["t_low_fall"])
+        values["steady_pressure"] = _steady_mean(t, p, fe["t_high_rise"], fe["t_high_fall"])
+
+    if command is not None and values["ignition_time"] is not None:
+        # The command fires before ignition, so search the full record up to it
+        end = int(np.searchsorted(time, values["ignition_time"], side="right"))
+        c = command[:end]
+        if len(c) > 1:
+            base, top = np.nanmin(c), np.nanmax(c)
+            level = base + COMMAND_LEVEL * (top - base)
+            _, t_cmd = first_above(time, c, level) if top > base else (None, None)
+            values["command_time"] = t_cmd
+            values["ignition_delay"] = _span(t_cmd, values["ignition_time"])
+    return values
+
+
+# Display labels and formats for the metrics panel
+LABELS = {
+    "ignition_time": ("Ignition Time (s)", "{:.4f}"),
+    "ignition_delay": ("Ignition Delay (s)", "{:.4f}"),
+    "thrust_rise_time": ("Thrust Rise 10–90% (s)", "{:.4f}"),
+    "pc_rise_time": ("Pc Rise 10–90% (s)", "{:.4f}"),
+    "thrust_tail_off": ("Thrust Tail-off 90–10% (s)", "{:.4f}"),
+    "pc_tail_off": ("Pc Tail-off 90–10% (s)", "{:.4f}"),
+    "steady_thrust": ("Steady Thrust (lbf)", "{:.2f}"),
+    "steady_pressure": ("Steady Chamber Pressure (psi)", "{:.2f}"),
+}
+
+
+def format_metrics(values):
+    """Panel entries for the transient values that could be measured."""
+    return {label: fmt.format(values[k]) for k, (label, fmt) in LABELS.items() if values.get(k) is not None}
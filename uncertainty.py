@@ -0,0 +1,132 @@
+# uncertainty.py
+"""
+Vectorised Monte Carlo uncertainty propagation for ISP, Ve and c*.
+
+Each Monte Carlo sample perturbs the measurement chain once (load cell
+gain/offset, transducer gain/offset, mass flow and throat area).  Samples are
+broadcast against the time series in chunks of ``(samples x time)`` so memory
+stays bounded, and chunks can optionally be spread over a process pool.
+Integrated metrics use a trapezoid weight vector, so every sample's burn
+average is a single dot product.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+G_FT_S2 = 32.174  # lbm → slug conversion and gravity in ft/s^2
+G_M_S2 = 9.80665  # Gravity in m/s^2
+PSI_TO_LBF_FT2 = 144.0
+FT_TO_M = 0.3048
+KINDS = ("isp", "ve", "c_star")
+PERCENTILES = (2.5, 16.0, 50.0, 84.0, 97.5)
+CHUNK_ELEMENTS = 2_000_000  # Max samples*points held per chunk
+
+# Default 1-sigma errors: relative values are fractions, offsets in lbf / psi
+DEFAULT_SIGMAS = {
+    "thrust_gain": 0.005,
+    "thrust_offset": 1.0,
+    "pc_gain": 0.0025,
+    "pc_offset": 0.5,
+    "mdot": 0.02,
+    "throat_area": 0.005,
+}
+
+
+def sample_params(n_samples, sigmas, seed=None):
+    """Draw one perturbation per sample for every error source (normal, 1-sigma)."""
+    rng = np.random.default_rng(seed)
+    full = dict(DEFAULT_SIGMAS)
+    full.update(sigmas or {})
+    return {k: rng.normal(0.0, s, n_samples) if s else np.zeros(n_samples) for k, s in full.items()}
+
+
+def _coefficients(kind, params, mdot_lbs, throat_area):
+    """
+    Every quantity is affine in its measured input x: value = a_k * x + b_k.
+    Returns (a, b) with one entry per sample.
+    """
+    mdot = mdot_lbs * (1.0 + params["mdot"])
+    if kind in ("isp", "ve"):
+        # isp = F / (mdot_slug * g) = F / mdot_lbs
+        scale = 1.0 / mdot if kind == "isp" else G_M_S2 / mdot
+        a = (1.0 + params["thrust_gain"]) * scale
+        b = params["thrust_offset"] * scale
+    elif kind == "c_star":
+        area = throat_area * (1.0 + params["throat_area"])
+        scale = PSI_TO_LBF_FT2 * area / (mdot / G_FT_S2) * FT_TO_M
+        a = (1.0 + params["pc_gain"]) * scale
+        b = params["pc_offset"] * scale
+    else:
+        raise ValueError(f"Unknown quantity '{kind}'")
+    return a, b
+
+
+def _band_chunk(args):
+    """Percentiles over samples for one time chunk (module level so it pickles)."""
+    x, a, b, percentiles = args
+    values = a[:, None] * x[None, :] + b[:, None]
+    return np.percentile(values, percentiles, axis=0)
+
+
+def trapz_weights(t):
+    """Weights w with sum(w * y) == trapezoidal integral of y over t."""
+    w = np.zeros(len(t))
+    if len(t) > 1:
+        dt = np.diff(t)
+        w[:-1] += 0.5 * dt
+        w[1:] += 0.5 * dt
+    return w
+
+
+def propagate(kind, time, x, mdot_lbs, throat_area=None, sigmas=None, n_samples=10_000,
+              burn_time=None, burn_x=None, percentiles=PERCENTILES, grid=1024, processes=None,
+              seed=None):
+    """
+    Monte Carlo bands for ``kind`` ("isp", "ve" or "c_star").
+
+    ``x`` is the measured input on the plotted time base (total thrust for
+    ISP/Ve, chamber pressure for c*).  ``burn_time``/``burn_x`` optionally give
+    the full-resolution burn window for the integrated metrics.  ``grid=None``
+    evaluates the percentiles at every time step; set ``processes`` > 1 to
+    spread the chunks over a process pool.
+
+    Returns {"percentiles", "bands" (p x n), "average" (per-sample burn means),
+    "summary" {mean, std, low, high}}.
+    """
+    x = np.asarray(x, dtype=float)
+    params = sample_params(n_samples, sigmas, seed)
+    a, b = _coefficients(kind, params, mdot_lbs, throat_area)
+
+    # Each band depends on the measured value only, so with ``grid`` set the
+    # percentiles are evaluated exactly on a grid of input levels and
+    # interpolated back onto the series instead of once per time step.
+    finite = x[np.isfinite(x)]
+    use_grid = grid and len(finite) and len(x) > grid
+    levels = np.linspace(finite.min(), finite.max(), grid) if use_grid else x
+
+    step = max(1, CHUNK_ELEMENTS // n_samples)
+    jobs = [(levels[i:i + step], a, b, percentiles) for i in range(0, len(levels), step)]
+    if processes and processes > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_band_chunk, jobs))
+    else:
+        parts = [_band_chunk(job) for job in jobs]
+    bands = np.concatenate(parts, axis=1) if parts else np.empty((len(percentiles), 0))
+    if use_grid:
+        bands = np.vstack([np.interp(x, levels, q) for q in bands])
+
+    # Burn-averaged value per sample: (a*∫x + b*T) / T, one dot product for all samples
+    t_int = np.asarray(time if burn_time is None else burn_time, dtype=float)
+    x_int = x if burn_x is None else np.asarray(burn_x, dtype=float)
+    w = trapz_weights(t_int)
+    duration = t_int[-1] - t_int[0] if len(t_int) > 1 else 0.0
+    if duration > 0:
+        average = (a * float(w @ x_int) + b * duration) / duration
+    else:
+        average = a * float(np.mean(x_int)) + b if len(x_int) else np.full(n_samples, np.nan)
+
+    low, high = np.percentile(average, [percentiles[0], percentiles[-1]])
+    summary = {"mean": float(np.mean(average)), "std": float(np.std(average)),
+               "low": float(low), "high": float(high)}
+    return {"percentiles": tuple(percentiles), "bands": bands,
+            "average": average, "summary": summary}
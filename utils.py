@@ -1,49 +1,111 @@
 # utils.py
+import re  # Import re for header name patterns
 import tkinter as tk  # Import tkinter for GUI components
 from tkinter import messagebox  # Import messagebox for displaying alerts
+from tkinter import ttk  # Import ttk for scrollable comboboxes
 import numpy as np  # Import numpy for numerical operations
 import pandas as pd  # Import pandas for data manipulation
 import matplotlib.pyplot as plt  # Import matplotlib for plotting
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk  # Import for embedding matplotlib in tkinter
+import despike  # Spike/dropout rejection used by compute_metrics
+import timestamps  # Absolute time column detection used by guess_columns
+import plot_links  # Shared cursor / x-zoom across plot windows
 
-def infer_columns(app):
-    """Infer basic columns in the loaded CSV, prompt if missing."""
-    ctx = app.ctx  # Get the application context
-    df = ctx.df  # Get the dataframe from the context
-    columns = list(df.columns)  # Get the list of column names
+trapz = getattr(np, "trapezoid", None) or np.trapz  # np.trapz was renamed in NumPy 2.0 and later removed
+
+def file_hash(paths, block=1 << 20):
+    """SHA-256 of one file (or several, in order) read in 1 MB blocks."""
+    import hashlib
+    if isinstance(paths, str):
+        paths = [paths]
+    h = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(block), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+def extract_unit(name):
+    """Unit written in parentheses in a column name, e.g. "Thrust (lbf)" → "lbf"."""
+    if "(" in name and ")" in name:
+        return name[name.find("(") + 1 : name.find(")")]
+    return None
+
+def quick_stats(ctx, col):
+    """Min/mean/max/NaN summary of one column, computed on first request and cached."""
+    if getattr(ctx, "_stats_df", None) != id(ctx.df):  # New data loaded: drop old stats
+        ctx._stats_df = id(ctx.df)
+        ctx.column_stats = {}
+    if col not in ctx.column_stats:
+        if ctx.df is None or col not in ctx.df.columns:
+            return "generated"
+        vals = pd.to_numeric(ctx.df[col], errors="coerce").to_numpy(dtype=float)
+        n_nan = int(np.count_nonzero(~np.isfinite(vals)))
+        if n_nan == len(vals):
+            ctx.column_stats[col] = "non-numeric"
+        else:
+            ctx.column_stats[col] = (f"min {np.nanmin(vals):.4g}, mean {np.nanmean(vals):.4g}, "
+                                     f"max {np.nanmax(vals):.4g}, NaN {n_nan}")
+    return ctx.column_stats[col]
+
+def guess_columns(columns):
+    """Guess column roles from header names only (no GUI, no data)."""
+    columns = list(columns)  # Accept any iterable of names
     lower_cols = [c.lower().strip() for c in columns]  # Convert column names to lowercase and strip whitespace
     col_map = dict(zip(lower_cols, columns))  # Map lowercase column names to original names
+    roles = {"time": None, "thrust": [], "chamber": None, "fuel": None, "oxidizer": None, "command": None}
 
-    # Initialize context variables for column names
-    ctx.time_col = None
-    ctx.thrust_cols = []
-    ctx.chamber_col = None
-    ctx.fuel_col = None
-    ctx.oxidizer_col = None
-
-    # Infer the time column
+    # Infer the time column: exact names first, then "Time (s)"-style, then wall-clock names
     for key in ["time", "t"]:
         if key in col_map:
-            ctx.time_col = col_map[key]
+            roles["time"] = col_map[key]
             break
+    if roles["time"] is None:
+        for low, col in zip(lower_cols, columns):
+            if re.match(r"(time|t)([\s_\[(]|$)", low) or timestamps.is_absolute_name(low):
+                roles["time"] = col
+                break
 
     # Infer thrust columns
     for col in columns:
         if "thrust" in col.lower():
-            ctx.thrust_cols.append(col)
+            roles["thrust"].append(col)
 
     # Infer chamber pressure column
     for col in columns:
         if "chamber" in col.lower() and "press" in col.lower():
-            ctx.chamber_col = col
+            roles["chamber"] = col
             break
 
     # Infer optional tank weight columns
     for col in columns:
         if "fuel" in col.lower() and "weight" in col.lower():
-            ctx.fuel_col = col
+            roles["fuel"] = col
         if ("ox" in col.lower() or "oxidizer" in col.lower()) and "weight" in col.lower():
-            ctx.oxidizer_col = col
+            roles["oxidizer"] = col
+
+    # Infer an optional valve / fire command channel (reference for ignition delay)
+    for col in columns:
+        name = col.lower()
+        if any(k in name for k in ("valve", "command", "cmd", "fire")) and "thrust" not in name:
+            roles["command"] = col
+            break
+    return roles
+
+def infer_columns(app):
+    """Infer basic columns in the loaded CSV, prompt if missing."""
+    ctx = app.ctx  # Get the application context
+    df = ctx.df  # Get the dataframe from the context
+    columns = list(df.columns)  # Get the list of column names
+
+    # Initialize context variables for column names
+    roles = guess_columns(columns)  # Guess every column role from the header
+    ctx.time_col = roles["time"]
+    ctx.thrust_cols = roles["thrust"]
+    ctx.chamber_col = roles["chamber"]
+    ctx.fuel_col = roles["fuel"]
+    ctx.oxidizer_col = roles["oxidizer"]
+    ctx.command_col = roles["command"]
 
     # If required columns are missing, prompt the user for manual selection
     if ctx.time_col is None or not ctx.thrust_cols:
@@ -51,16 +113,18 @@ def infer_columns(app):
 
 def manual_column_selection(app, columns):
     """Prompt the user to manually select columns."""
+    from channel_browser import ChannelBrowser  # Local import: channel_browser imports utils
     ctx = app.ctx  # Get the application context
     small_font = ("Arial", 12)
 
     def set_columns():
         """Set the selected columns in the context."""
         ctx.time_col = time_var.get()  # Set the time column
-        ctx.thrust_cols = [col for col, var in thrust_vars.items() if var.get()]  # Set the thrust columns
+        ctx.thrust_cols = thrust_browser.selected()  # Set the thrust columns
         ctx.chamber_col = chamber_var.get()  # Set the chamber pressure column
         ctx.fuel_col = fuel_var.get()  # Set the fuel weight column
         ctx.oxidizer_col = oxidizer_var.get()  # Set the oxidizer weight column
+        ctx.command_col = command_var.get() or None  # Set the valve/command column
         win.destroy()  # Close the selection window
 
     # Create a new window for column selection
@@ -71,33 +135,33 @@ def manual_column_selection(app, columns):
     # Dropdown for time column
     tk.Label(win, text="Time column:", font=small_font).pack(anchor="w")
     time_var = tk.StringVar(value=ctx.time_col or columns[0])  # Default to the first column
-    tk.OptionMenu(win, time_var, *columns).pack(fill=tk.X)
-    win.nametowidget(win.winfo_children()[-1]).config(font=small_font)  # Set font for OptionMenu
+    ttk.Combobox(win, textvariable=time_var, values=columns, font=small_font).pack(fill=tk.X)
 
-    # Checkboxes for thrust columns
+    # Searchable list for thrust columns (one Listbox instead of a Checkbutton per column)
     tk.Label(win, text="Thrust columns:", font=small_font).pack(anchor="w")
-    thrust_vars = {c: tk.BooleanVar(value=c in ctx.thrust_cols) for c in columns}  # Create a checkbox for each column
-    for c, var in thrust_vars.items():
-        cb = tk.Checkbutton(win, text=c, variable=var, font=small_font)
-        cb.pack(anchor="w")
+    thrust_browser = ChannelBrowser(win, columns, selected=ctx.thrust_cols,
+                                    stats_fn=lambda c: quick_stats(ctx, c), height=25, font=small_font)
+    thrust_browser.pack(fill=tk.BOTH, expand=True)
 
     # Dropdown for chamber pressure column
     tk.Label(win, text="Chamber pressure column:", font=small_font).pack(anchor="w")
     chamber_var = tk.StringVar(value=ctx.chamber_col or columns[0])  # Default to the first column
-    tk.OptionMenu(win, chamber_var, *columns).pack(fill=tk.X)
-    win.nametowidget(win.winfo_children()[-1]).config(font=small_font)
+    ttk.Combobox(win, textvariable=chamber_var, values=columns, font=small_font).pack(fill=tk.X)
 
     # Dropdown for fuel weight column
     tk.Label(win, text="Fuel weight column:", font=small_font).pack(anchor="w")
     fuel_var = tk.StringVar(value=ctx.fuel_col or "")  # Default to empty
-    tk.OptionMenu(win, fuel_var, *columns).pack(fill=tk.X)
-    win.nametowidget(win.winfo_children()[-1]).config(font=small_font)
+    ttk.Combobox(win, textvariable=fuel_var, values=columns, font=small_font).pack(fill=tk.X)
 
     # Dropdown for oxidizer weight column
     tk.Label(win, text="Oxidizer weight column:", font=small_font).pack(anchor="w")
     oxidizer_var = tk.StringVar(value=ctx.oxidizer_col or "")  # Default to empty
-    tk.OptionMenu(win, oxidizer_var, *columns).pack(fill=tk.X)
-    win.nametowidget(win.winfo_children()[-1]).config(font=small_font)
+    ttk.Combobox(win, textvariable=oxidizer_var, values=columns, font=small_font).pack(fill=tk.X)
+
+    # Dropdown for the valve / fire command column (ignition delay reference)
+    tk.Label(win, text="Valve/command column (optional):", font=small_font).pack(anchor="w")
+    command_var = tk.StringVar(value=ctx.command_col or "")  # Default to empty
+    ttk.Combobox(win, textvariable=command_var, values=columns, font=small_font).pack(fill=tk.X)
 
     # Confirm button to save selections
     tk.Button(win, text="Confirm", command=set_columns, font=small_font).pack(pady=10)
@@ -108,11 +172,27 @@ def manual_column_selection(app, columns):
 def compute_metrics(app, target_thrust):
     """Compute metrics like burn time, total impulse, and average thrust."""
     ctx = app.ctx  # Get the application context
+    ctx.metric_values = {}  # Cleared so error paths never leave stale numbers behind
+    ctx.despike_report = {}
     if ctx.df is None or ctx.time_col is None or not ctx.thrust_cols:
         ctx.metrics = {"Error": "Missing data"}  # Set error if data is missing
         return
+
+    scan = None
+    if ctx.store is not None:
+        # Out-of-core mode: stream the whole file and keep only the burn window in ctx.df
+        from ooc import refresh_window
+        try:
+            scan = refresh_window(app, target_thrust)
+        except ValueError:
+            ctx.metrics = {"Error": "Invalid custom splice time range."}
+            return
+        if scan is None and not app.custom_splice_var.get():
+            ctx.metrics = {"Error": "No data in selected window."}
+            return
+
     time = ctx.df[ctx.time_col].values  # Get time values
-    thrust_total = ctx.df[ctx.thrust_cols].sum(axis=1).values  # Sum thrust columns
+    thrust_total = despike.thrust_total(ctx)  # Sum thrust columns (spikes rejected when enabled)
 
     # --- Custom data splicing logic ---
     use_custom_splice = hasattr(app, "custom_splice_var") and app.custom_splice_var.get()
@@ -144,23 +224,54 @@ def compute_metrics(app, target_thrust):
     t_slice = time[mask]
     thrust_slice = thrust_total[mask]
     burn_dur = t_slice[-1] - t_slice[0]  # Calculate burn duration
-    total_impulse = float(np.trapz(thrust_slice, t_slice))  # Calculate total impulse
-    avg_thrust = total_impulse / burn_dur if burn_dur > 0 else 0  # Calculate average thrust
+    total_impulse = float(trapz(thrust_slice, t_slice))  # Calculate total impulse
 
-    peak_press = None
+    peak_press = avg_press = press = None
     if ctx.chamber_col:  # Check if chamber pressure column exists
-        peak_press = float(ctx.df[ctx.chamber_col].max())  # Get the peak chamber pressure
+        press = despike.channel(ctx, ctx.chamber_col)  # Cleaned so a single spike can't set the peak
+        peak_press = float(np.nanmax(press))  # Get the peak chamber pressure
+        avg_press = float(np.nanmean(press[mask]))  # Mean pressure over the burn
+    if scan is not None:  # Whole-file values streamed from the out-of-core store
+        burn_dur, total_impulse = scan["burn_time"], scan["impulse"]
+        if scan["peak_pressure"] is not None:  # Streamed through the same calibration and despike
+            peak_press = scan["peak_pressure"]
+    avg_thrust = total_impulse / burn_dur if burn_dur > 0 else 0  # Calculate average thrust
 
     # Calculate O/F ratio if fuel and oxidizer columns exist
+    avg_of = None
     if ctx.fuel_col and ctx.oxidizer_col:
         fuel_w = ctx.df[ctx.fuel_col][mask].values  # Get fuel weight values
         ox_w = ctx.df[ctx.oxidizer_col][mask].values  # Get oxidizer weight values
         ctx.of_ratio = ox_w / (fuel_w + 1e-6)  # Calculate O/F ratio
+        avg_of = float(np.nanmean(ctx.of_ratio))
+
+    # Start-up / shutdown transients from the full-resolution window around the burn
+    from transients import characterize, format_metrics
+    command = None
+    if ctx.command_col and ctx.command_col in ctx.df.columns:
+        command = pd.to_numeric(ctx.df[ctx.command_col], errors="coerce").to_numpy(dtype=float)
+    transient = characterize(np.asarray(time, dtype=float), thrust_total, mask, press, command)
 
     # Save computed metrics in the context
     ctx.metrics = {
         "Burn Time (s)": f"{burn_dur:.3f}",
         "Total Impulse (lbf·s)": f"{total_impulse:.2f}",
+        "Average Thrust (lbf)": f"{avg_thrust:.2f}",
+    }
+    if peak_press is not None:
+        ctx.metrics["Peak Chamber Pressure (psi)"] = f"{peak_press:.2f}"
+    ctx.metrics.update(format_metrics(transient))
+    if ctx.despike:
+        ctx.metrics["Rejected Samples"] = str(despike.rejected_total(ctx))
+    # Unformatted values for the campaign index and batch outputs
+    ctx.metric_values = {
+        "burn_time": float(burn_dur),
+        "total_impulse": total_impulse,
+        "avg_thrust": float(avg_thrust),
+        "peak_pressure": peak_press,
+        "avg_pressure": avg_press,
+        "avg_of": avg_of,
+        **transient,
     }
 
 def apply_extra_data(app):
@@ -197,3 +308,4 @@ def create_plot_window(app, title, x, y, xlab, ylab, legend, color, fit=None):
     canvas.draw()  # Draw the canvas
     canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)  # Pack the canvas widget
     NavigationToolbar2Tk(canvas, plot_win).update()  # Add a navigation toolbar
+    plot_links.register(plot_win, ax, canvas, x, {legend: y})  # Link cursor and zoom with the other plots
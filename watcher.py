@@ -0,0 +1,193 @@
+# watcher.py
+"""
+Watch-folder ingest daemon.
+
+Polls a folder for CSVs, waits until a file's size and mtime stop changing
+(the DAQ has finished writing), queues it once, and analyses it on a bounded
+pool of worker threads with ``batch.analyze_file``.  Results (metrics.json,
+plots) land in ``<stem>_hdaa/`` next to the data and a row goes into the
+campaign index.  Files whose content hash was already processed are skipped,
+so restarts and re-copied files are harmless.
+
+    python watcher.py /mnt/hotfire --target 250 --workers 2
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+import traceback
+
+import batch
+import calibration
+import campaign_db
+from utils import file_hash
+
+
+def _log(msg):
+    print(time.strftime("%H:%M:%S"), msg, flush=True)
+
+
+class FolderWatcher:
+    def __init__(self, folder, target_thrust=None, params=None, workers=2, interval=2.0,
+                 stable_polls=2, recursive=False, db_path=campaign_db.DEFAULT_DB, cal_set=None,
+                 despike=None, repair=False):
+        self.folder = folder
+        self.target_thrust = target_thrust
+        self.params = params or {}
+        self.workers = max(1, workers)
+        self.interval = interval
+        self.stable_polls = stable_polls  # Unchanged polls before a file counts as complete
+        self.recursive = recursive
+        self.db_path = db_path
+        self.cal_set = cal_set  # calibration.CalibrationSet applied to every file
+        self.despike = despike  # Spike rejection settings for the metrics, or None
+        self.repair = repair  # Auto-repair time/NaN problems found by the quality scan
+        self.queue = queue.Queue()  # Unbounded, but every file is queued at most once per version
+        self._seen = {}  # path -> [(size, mtime), unchanged poll count]
+        self._handled = {}  # path -> (size, mtime) version already queued/processed
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    # ---------- discovery ----------
+    def _candidates(self):
+        if self.recursive:
+            for root, dirs, files in os.walk(self.folder):
+                dirs[:] = [d for d in dirs if not d.endswith(batch.OUTPUT_SUFFIX)]
+                for f in files:
+                    if f.lower().endswith(".csv"):
+                        yield os.path.join(root, f)
+        else:
+            for f in os.listdir(self.folder):
+                if f.lower().endswith(".csv"):
+                    yield os.path.join(self.folder, f)
+
+    def poll_once(self):
+        """Scan the folder once and queue files that have become size-stable."""
+        present = set()
+        for path in self._candidates():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # Deleted or renamed between listdir and stat
+            present.add(path)
+            sig = (st.st_size, st.st_mtime)
+            entry = self._seen.get(path)
+            if entry is None or entry[0] != sig:
+                self._seen[path] = [sig, 0]
+                continue
+            entry[1] += 1
+            with self._lock:
+                ready = entry[1] >= self.stable_polls and sig[0] > 0 and self._handled.get(path) != sig
+                if ready:
+                    self._handled[path] = sig
+            if ready:
+                self.queue.put((path, sig))
+                _log(f"queued {os.path.basename(path)} ({self.queue.qsize()} waiting)")
+        for path in list(self._seen):
+            if path not in present:
+                del self._seen[path]
+
+    # ---------- processing ----------
+    def process(self, path, con):
+        digest = file_hash(path)
+        if batch.already_processed(path, digest):
+            _log(f"skip {os.path.basename(path)} (already processed)")
+            return None
+        if campaign_db.is_recorded(con, digest, "batch"):  # Same content under another name or folder
+            _log(f"skip {os.path.basename(path)} (already in the campaign index)")
+            return None
+        record = batch.analyze_file(path, self.target_thrust, self.params, digest=digest,
+                                    cal_set=self.cal_set, despike=self.despike, repair=self.repair)
+        campaign_db.record_test(con, digest, os.path.basename(path), record["values"], self.params,
+                                record["target_thrust"], path, source="batch")
+        _log(f"done {os.path.basename(path)}: " + ", ".join(f"{k} {v}" for k, v in record["metrics"].items()))
+        return record
+
+    def _worker(self):
+        con = campaign_db.connect(self.db_path)  # One connection per thread
+        try:
+            while not self._stop.is_set():
+                try:
+                    path, sig = self.queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                try:
+                    self.process(path, con)
+                except Exception as e:
+                    _log(f"failed {os.path.basename(path)}: {e}")
+                    out_dir = batch.output_dir(path)
+                    try:
+                        os.makedirs(out_dir, exist_ok=True)
+                        with open(os.path.join(out_dir, "error.txt"), "w") as fh:
+                            fh.write(traceback.format_exc())
+                    except OSError:
+                        pass
+                finally:
+                    self.queue.task_done()
+        finally:
+            con.close()
+
+    def _poller(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except OSError as e:
+                _log(f"scan failed: {e}")
+            self._stop.wait(self.interval)
+
+    # ---------- lifecycle ----------
+    def start(self):
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.workers)]
+        self._threads.append(threading.Thread(target=self._poller, daemon=True))
+        for t in self._threads:
+            t.start()
+        _log(f"watching {self.folder} with {self.workers} worker(s)")
+
+    def stop(self, wait=True):
+        self._stop.set()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse hotfire CSVs as they appear in a folder.")
+    parser.add_argument("folder")
+    parser.add_argument("--target", type=float, default=None,
+                        help="Target thrust (lbf); estimated from the data when omitted")
+    parser.add_argument("--fuel-mdot", type=float, help="Fuel mass flow (lbs/s) for ISP/c*")
+    parser.add_argument("--oxidizer-mdot", type=float, help="Oxidizer mass flow (lbs/s) for ISP/c*")
+    parser.add_argument("--throat-area", type=float, help="Throat area (ft^2) for c*")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between folder scans")
+    parser.add_argument("--stable-polls", type=int, default=2)
+    parser.add_argument("--recursive", action="store_true")
+    parser.add_argument("--db", default=campaign_db.DEFAULT_DB)
+    parser.add_argument("--calibration", help="Test stand calibration (saved stand name or JSON path)")
+    parser.add_argument("--despike", type=float, metavar="MADS",
+                        help="Reject spikes further than this many MADs from the rolling median")
+    parser.add_argument("--repair", action="store_true",
+                        help="Repair time resets, duplicates and NaN samples found by the quality scan")
+    args = parser.parse_args()
+
+    params = {k: v for k, v in (("fuel_mdot", args.fuel_mdot), ("oxidizer_mdot", args.oxidizer_mdot),
+                                ("throat_area", args.throat_area)) if v is not None}
+    watcher = FolderWatcher(args.folder, args.target, params, args.workers, args.interval,
+                            args.stable_polls, args.recursive, args.db,
+                            calibration.resolve(args.calibration) if args.calibration else None,
+                            {"threshold": args.despike} if args.despike else None, args.repair)
+    watcher.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        _log("stopping")
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
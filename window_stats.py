@@ -0,0 +1,187 @@
+# window_stats.py
+"""
+Rolling and block statistics for any set of channels.
+
+Block statistics reshape the (rows x channels) matrix into a strided
+(blocks x window x channels) view, so every statistic of every channel is a
+single numpy reduction along the window axis.  Rolling mean, std and RMS
+come from cumulative sums of x and x² (centred on the channel mean so the
+differences stay accurate); rolling min/max and percentiles reduce a
+chunked sliding-window view.  No Python loop runs per sample or per block.
+
+``steady_state`` finds the longest run of blocks that sit at the plateau
+level with low roughness, which is what the table view summarises by
+default.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+STATS = ("mean", "std", "min", "max", "rms", "roughness", "p05", "p50", "p95")
+LABELS = {
+    "mean": "Mean", "std": "Std", "min": "Min", "max": "Max", "rms": "RMS",
+    "roughness": "Roughness (%)", "p05": "P5", "p50": "Median", "p95": "P95",
+}
+PERCENTILES = {"p05": 5.0, "p50": 50.0, "p95": 95.0}
+DEFAULT_WINDOW_S = 0.1  # Block / rolling window length in seconds
+STEADY_LEVEL = 0.05  # Steady blocks sit within this fraction of the plateau level...
+STEADY_ROUGHNESS = 5.0  # ...with a block std below this percentage of the mean
+CHUNK_ELEMENTS = 1 << 22  # Matrix elements reduced per pass (bounds temporaries)
+
+
+def window_rows(time, seconds):
+    """Samples per window of ``seconds`` at the median sample rate (at least 2)."""
+    t = np.asarray(time, dtype=float)
+    dt = float(np.nanmedian(np.diff(t[:100_001]))) if len(t) > 1 else 0.0
+    return max(2, int(round(seconds / dt))) if dt > 0 else 2
+
+
+def _reduce(view, stats):
+    """Requested statistics of ``view`` along its last axis (NaN-aware only when NaNs are present)."""
+    nan = bool(np.isnan(view).any())
+    out = {}
+    if {"mean", "std", "roughness", "rms"} & set(stats):
+        mean = (np.nanmean if nan else np.mean)(view, axis=-1)
+        dev = view - mean[..., None]
+        if nan:
+            var = np.nanmean(dev * dev, axis=-1)
+        else:
+            var = np.einsum("...i,...i->...", dev, dev) / view.shape[-1]  # No squared temporary
+        out["mean"], out["std"] = mean, np.sqrt(var)
+        out["rms"] = np.sqrt(var + mean * mean)
+        with np.errstate(divide="ignore", invalid="ignore"):  # Zero-mean windows: inf / NaN
+            out["roughness"] = 100.0 * out["std"] / np.abs(mean)
+    if "min" in stats:
+        out["min"] = (np.nanmin if nan else np.min)(view, axis=-1)
+    if "max" in stats:
+        out["max"] = (np.nanmax if nan else np.max)(view, axis=-1)
+    pct = [s for s in stats if s in PERCENTILES]
+    if pct:  # One partition for every percentile
+        q = (np.nanpercentile if nan else np.percentile)(view, [PERCENTILES[s] for s in pct], axis=-1)
+        out.update(zip(pct, q))
+    unknown = set(stats) - set(out)
+    if unknown:
+        raise ValueError(f"Unknown statistic '{unknown.pop()}'")
+    return {s: out[s] for s in stats}
+
+
+def block(x, window, stats=STATS):
+    """
+    Statistics over consecutive non-overlapping windows of ``window`` rows.
+
+    ``x`` is 1-D (one channel) or 2-D (rows x channels, every channel in one
+    pass).  Returns {stat: array (blocks,) or (blocks, channels)}; a partial
+    last block is dropped.
+    """
+    x = np.asarray(x, dtype=float)
+    window = max(1, int(window))
+    n_blocks = len(x) // window
+    cols = x.shape[1:]
+    out = {s: np.empty((n_blocks,) + cols) for s in stats}
+    step = max(1, CHUNK_ELEMENTS // (window * (cols[0] if cols else 1)))  # Blocks per pass
+    for b in range(0, n_blocks, step):
+        e = min(b + step, n_blocks)
+        view = x[b * window:e * window].reshape((e - b, window) + cols)  # Strided view, no copy
+        if cols:
+            view = np.ascontiguousarray(view.transpose(0, 2, 1))  # Window axis last for the reductions
+        for s, v in _reduce(view, stats).items():
+            out[s][b:e] = v
+    return out
+
+
+def region(x, stats=STATS):
+    """Statistics over all rows of ``x`` (one block spanning the region)."""
+    x = np.asarray(x, dtype=float)
+    return {s: v[0] for s, v in block(x, len(x), stats).items()} if len(x) else \
+        {s: np.full(x.shape[1:], np.nan) for s in stats}
+
+
+def _running_extreme(x, window, op):
+    """Centred running min/max (``op`` = np.minimum / np.maximum) over an edge-padded copy."""
+    n, half = len(x), window // 2
+    n_blocks = -(-(n + window - 1) // window)
+    padded = np.pad(x, (half, n_blocks * window - n - half), mode="edge").reshape(n_blocks, window)
+    prefix = op.accumulate(padded, axis=1).ravel()
+    suffix = op.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    # Window [i, i + window) spans the suffix of one block and the prefix of the next
+    return op(suffix[:n], prefix[window - 1:window - 1 + n])
+
+
+def rolling(x, window, stats=("mean", "std", "min", "max")):
+    """
+    Centred rolling statistics of a 1-D channel (same length as ``x``, edges
+    use the partial window clipped to the data for mean/std/RMS and the
+    edge-padded window for the rest).
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    window = max(1, int(window))
+    half = window // 2
+    out = {}
+    # Cumulative sums give every window's sum in O(n): mean, std and RMS
+    if {"mean", "std", "rms", "roughness"} & set(stats):
+        offset = float(np.nanmean(x)) if n else 0.0
+        c = np.nan_to_num(x - offset)
+        s1 = np.concatenate(([0.0], np.cumsum(c)))
+        s2 = np.concatenate(([0.0], np.cumsum(c * c)))
+        lo = np.clip(np.arange(n) - half, 0, n)
+        hi = np.clip(np.arange(n) - half + window, 0, n)
+        count = hi - lo
+        m = (s1[hi] - s1[lo]) / count
+        var = np.maximum((s2[hi] - s2[lo]) / count - m * m, 0.0)
+        mean = m + offset
+        for s in stats:
+            if s == "mean":
+                out[s] = mean
+            elif s == "std":
+                out[s] = np.sqrt(var)
+            elif s == "rms":
+                out[s] = np.sqrt(var + mean * mean)
+            elif s == "roughness":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    out[s] = 100.0 * np.sqrt(var) / np.abs(mean)
+    # Running min / max in O(n): block prefix and suffix extremes (van Herk / Gil-Werman)
+    for s, op in (("min", np.minimum), ("max", np.maximum)):
+        if s in stats and s not in out:
+            out[s] = _running_extreme(x, window, op)
+    # Percentiles partition a sliding-window view in chunks (O(n * window))
+    rest = [s for s in stats if s not in out]
+    if rest:
+        padded = np.pad(x, (half, window - 1 - half), mode="edge")
+        for s in rest:
+            out[s] = np.empty(n)
+        step = max(1, CHUNK_ELEMENTS // window)
+        for i in range(0, n, step):
+            view = sliding_window_view(padded[i:i + step + window - 1], window)
+            for s, v in _reduce(view, rest).items():
+                out[s][i:i + len(view)] = v
+    return out
+
+
+def steady_state(time, x, window, level=STEADY_LEVEL, roughness=STEADY_ROUGHNESS):
+    """
+    Longest run of windows at the plateau level with low roughness.
+
+    The plateau is the median block mean of the blocks above half the
+    highest one.  Returns {"start", "stop" (rows), "t0", "t1", "level"} or
+    None when no block qualifies.
+    """
+    b = block(x, window, ("mean", "roughness"))
+    means = b["mean"]
+    if not len(means) or not np.isfinite(means).any():
+        return None
+    top = np.nanmax(means)
+    if top <= 0:
+        return None
+    plateau = float(np.nanmedian(means[means >= 0.5 * top]))
+    steady = (np.abs(means - plateau) <= level * abs(plateau)) & (b["roughness"] <= roughness)
+    if not steady.any():
+        return None
+    # Longest run of consecutive steady blocks from the run boundaries
+    edges = np.diff(np.concatenate(([0], steady.astype(np.int8), [0])))
+    starts, stops = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    k = int(np.argmax(stops - starts))
+    start, stop = int(starts[k]) * window, int(stops[k]) * window
+    time = np.asarray(time, dtype=float)
+    return {"start": start, "stop": stop, "t0": float(time[start]), "t1": float(time[stop - 1]),
+            "level": float(np.nanmean(np.asarray(x, dtype=float)[start:stop]))}